@@ -0,0 +1,384 @@
+"""
+Multi-process deployment: one writer process and many catalog readers.
+
+The writer runs the full application on a Unix socket and owns all state.
+After every write it republishes the read-mostly catalog (products,
+categories and rating aggregates) as a memory-mapped snapshot. Reader
+processes serve catalog GETs straight from the mapped snapshot and forward
+every other request to the writer over the socket. Snapshot records are
+JSON, repacked as msgpack for clients that prefer it.
+
+Catalog reads may lag a write by up to CLUSTER_PUBLISH_INTERVAL seconds plus
+the time to republish. Ids missing from the snapshot are forwarded, so a
+product is readable right after it is created.
+
+    python -m app.cluster --workers 8 --port 8000
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.wire import MSGPACK, accepts_msgpack, packb
+from app.database.db import Database
+from app.database.snapshot import GENERATION, CONTROL_FILE, SnapshotReader, SnapshotWriter
+from app.middleware.compression import CompressionMiddleware, ResponseCompressor
+from app.middleware.rate_limit import RateLimiter, RateLimitMiddleware
+from app.routers.products import _build_product_response
+from app.schemas.category import CategoryResponse
+from app.schemas.review import ProductRatingResponse
+from app.services.review_service import ReviewService, empty_rating_stats
+
+logger = logging.getLogger(__name__)
+
+WRITER_SOCKET = "writer.sock"
+# Longest wait between retries of a failing catalog publish, in seconds
+MAX_PUBLISH_BACKOFF = 5.0
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+HOP_BY_HOP = {
+    b"connection", b"keep-alive", b"transfer-encoding", b"te", b"trailer",
+    b"upgrade", b"proxy-authorization", b"proxy-authenticate", b"content-length",
+}
+
+# Keys of the "lists" section
+PRODUCT_LIST = 0
+CATEGORY_LIST = 1
+
+# (path pattern, section, key when the pattern has no id group)
+SNAPSHOT_ROUTES = [
+    (re.compile(r"/products/(\d+)"), "products", None),
+    (re.compile(r"/reviews/product/(\d+)/rating"), "ratings", None),
+    (re.compile(r"/categories/(\d+)"), "categories", None),
+    (re.compile(r"/products/"), "lists", PRODUCT_LIST),
+    (re.compile(r"/categories/"), "lists", CATEGORY_LIST),
+]
+
+
+def _json_list(bodies: List[bytes]) -> bytes:
+    return b"[" + b",".join(bodies) + b"]"
+
+
+def _product_fields(product) -> tuple:
+    return (
+        product.name, product.description, product.price, product.stock,
+        product.category, product.is_hot,
+    )
+
+
+def render_catalog(
+    db: Database, cache: Optional[Dict[Tuple[str, int], Tuple[tuple, bytes]]] = None
+) -> Dict[str, List[Tuple[int, bytes]]]:
+    """
+    Serialize the catalog into snapshot sections.
+
+    cache maps (section, id) -> (field values, body) from the previous call
+    and is updated in place, so unchanged records are not serialized again.
+    """
+    products = list(db.products.values())
+    categories = list(db.categories.values())
+    cache = {} if cache is None else cache
+    stats = ReviewService(db).get_rating_stats(product.id for product in products)
+    no_reviews = empty_rating_stats()
+
+    def render(section: str, key: int, fields: tuple, build) -> bytes:
+        cached = cache.get((section, key))
+        if cached is None or cached[0] != fields:
+            cached = cache[(section, key)] = (fields, build().model_dump_json().encode())
+        return cached[1]
+
+    product_bodies = []
+    ratings = []
+    for product in products:
+        # Hot products keep their stock in a sharded counter
+        db.stock.refresh(product)
+        product_bodies.append((product.id, render(
+            "products", product.id, _product_fields(product),
+            lambda: _build_product_response(product),
+        )))
+        product_stats = stats.get(product.id, no_reviews)
+        ratings.append((product.id, render(
+            "ratings", product.id, tuple(product_stats["rating_distribution"].values()),
+            lambda: ProductRatingResponse(product_id=product.id, **product_stats),
+        )))
+    for section, key in [entry for entry in cache if entry[1] not in db.products]:
+        del cache[(section, key)]
+
+    category_bodies = [
+        (category.id, CategoryResponse(
+            id=category.id,
+            name=category.name,
+            description=category.description,
+            parent_id=category.parent_id,
+            created_at=category.created_at,
+        ).model_dump_json().encode())
+        for category in categories
+    ]
+    return {
+        "products": product_bodies,
+        "ratings": ratings,
+        "categories": category_bodies,
+        "lists": [
+            (PRODUCT_LIST, _json_list([body for _, body in product_bodies])),
+            (CATEGORY_LIST, _json_list([body for _, body in category_bodies])),
+        ],
+    }
+
+
+class CatalogPublisher:
+    """
+    Republishes the catalog snapshot after writes.
+
+    Writes only mark the catalog dirty; a background thread republishes at
+    most once per interval, so a burst of writes costs one snapshot.
+    """
+
+    def __init__(self, db: Database, directory: str, interval: float = 0.05):
+        self.db = db
+        self.interval = interval
+        self.writer = SnapshotWriter(directory)
+        self._dirty = threading.Event()
+        self._dirty.set()
+        self._bodies: Dict[Tuple[str, int], Tuple[tuple, bytes]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="catalog-publisher", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        self._dirty.set()
+
+    def publish(self) -> int:
+        """Publish the current catalog now. Returns the new generation."""
+        return self.writer.publish(render_catalog(self.db, self._bodies))
+
+    def _run(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self._publish_pending())
+
+    def _publish_pending(self) -> float:
+        """Publish if dirty; returns how long to wait before the next try."""
+        self._dirty.clear()
+        try:
+            self.publish()
+        except Exception:
+            logger.exception("Publishing the catalog snapshot failed")
+            # Retry even if nothing else is written, backing off while it fails
+            self._dirty.set()
+            self._failures += 1
+            return min(self.interval * 2 ** self._failures, MAX_PUBLISH_BACKOFF)
+        self._failures = 0
+        return self.interval
+
+
+class WriterMiddleware:
+    """Marks the catalog dirty after every request that may have written."""
+
+    def __init__(self, app, publisher: CatalogPublisher):
+        self.app = app
+        self.publisher = publisher
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if scope["type"] == "http" and scope["method"] not in READ_METHODS:
+                self.publisher.mark_dirty()
+
+
+class ReaderApp:
+    """ASGI app of a reader process: snapshot lookups, everything else forwarded."""
+
+    def __init__(self, directory: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.snapshots = SnapshotReader(directory)
+        self._transport = transport or httpx.AsyncHTTPTransport(
+            uds=os.path.join(directory, WRITER_SOCKET)
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        found = self._from_snapshot(scope) if scope["type"] == "http" else None
+        if found is None:
+            await self._forward(scope, receive, send)
+            return
+
+        generation, body = found
+        content_type = b"application/json"
+        if accepts_msgpack(dict(scope["headers"]).get(b"accept", b"")):
+            # Snapshot records are JSON; repack them as the writer would
+            body, content_type = packb(json.loads(body)), MSGPACK.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept"),
+                (b"x-catalog-generation", str(generation).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _from_snapshot(self, scope) -> Optional[Tuple[int, bytes]]:
+        """(generation, body) if the snapshot can answer this request."""
+        if scope["method"] != "GET" or scope["query_string"]:
+            return None
+        snapshot = self.snapshots.current()
+        if snapshot is None:
+            return None
+        for pattern, section, key in SNAPSHOT_ROUTES:
+            match = pattern.fullmatch(scope["path"])
+            if match is None:
+                continue
+            record = snapshot.get(section, int(match.group(1)) if key is None else key)
+            return None if record is None else (snapshot.generation, bytes(record))
+        return None
+
+    async def _forward(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, base_url="http://writer")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        url = scope["path"]
+        if scope["query_string"]:
+            url += "?" + scope["query_string"].decode("latin-1")
+        headers = [
+            (k, v) for k, v in scope["headers"]
+            if k not in HOP_BY_HOP and k != b"x-forwarded-for"
+        ]
+        if scope.get("client"):
+            # The writer sees every request coming from the socket; pass on
+            # the client address for per-IP rate limits
+            headers.append((b"x-forwarded-for", scope["client"][0].encode()))
+        request = self._client.build_request(
+            scope["method"], url, headers=headers, content=bytes(body)
+        )
+        response = await self._client.send(request, stream=True)
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (k, v) for k, v in response.headers.raw if k.lower() not in HOP_BY_HOP
+                ],
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client is not None:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def create_reader_app() -> RateLimitMiddleware:
+    """
+    App factory for reader workers (uvicorn --factory).
+
+    Rate limits and compression are applied per reader process as well,
+    since snapshot reads never reach the writer. Forwarded responses come
+    back already compressed by the writer.
+    """
+    compressor = ResponseCompressor(
+        levels=settings.COMPRESSION_LEVELS,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+        cache_paths=settings.COMPRESSION_CACHE_PATHS,
+        cache_max_bytes=settings.COMPRESSION_CACHE_BYTES,
+    )
+    return RateLimitMiddleware(
+        CompressionMiddleware(ReaderApp(settings.CLUSTER_DIR), compressor),
+        RateLimiter(settings.RATE_LIMITS, max_keys=settings.RATE_LIMIT_MAX_KEYS),
+    )
+
+
+def _published_generation(directory: str) -> int:
+    try:
+        with open(os.path.join(directory, CONTROL_FILE), "rb") as file:
+            return GENERATION.unpack(file.read(GENERATION.size))[0]
+    except (OSError, struct.error):
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one writer and N catalog reader processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--dir", default=settings.CLUSTER_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    socket_path = os.path.join(args.dir, WRITER_SOCKET)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    environment = dict(os.environ, CLUSTER_DIR=args.dir)
+    uvicorn = [sys.executable, "-m", "uvicorn"]
+
+    previous = _published_generation(args.dir)
+    writer = subprocess.Popen(
+        # Only readers can reach the socket, so their X-Forwarded-For is trusted
+        uvicorn + [
+            "main:app", "--uds", socket_path,
+            "--proxy-headers", "--forwarded-allow-ips", "*",
+        ],
+        env=dict(environment, CLUSTER_ROLE="writer"),
+    )
+    while not os.path.exists(socket_path) or _published_generation(args.dir) <= previous:
+        if writer.poll() is not None:
+            sys.exit("writer process exited during startup")
+        time.sleep(0.05)
+
+    readers = subprocess.Popen(
+        uvicorn + [
+            "app.cluster:create_reader_app", "--factory",
+            "--host", args.host, "--port", str(args.port), "--workers", str(args.workers),
+        ],
+        env=dict(environment, CLUSTER_ROLE="reader"),
+    )
+    try:
+        readers.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in (readers, writer):
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
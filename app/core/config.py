@@ -2,6 +2,8 @@
 Application configuration using Pydantic Settings.
 """
 
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,10 +19,100 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-this-secret-key-in-prod"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REVOCATION_PRUNE_INTERVAL: float = 60.0
+    ADMIN_EMAILS: List[str] = []
+    # bcrypt cost; 0 calibrates it at startup to take PASSWORD_HASH_TARGET_SECONDS
+    PASSWORD_HASH_ROUNDS: int = 0
+    PASSWORD_HASH_TARGET_SECONDS: float = 0.25
 
     # API
     API_PREFIX: str = ""
 
+    # Catalog file (from Database.save_catalog) to serve products from,
+    # memory-mapped at startup; empty keeps products in memory only
+    CATALOG_FILE: str = ""
+
+    # Inventory
+    HOT_STOCK_SHARDS: int = 8
+
+    # Carts, orders and reviews partitioned by user id; 1 disables sharding
+    DB_SHARDS: int = 1
+    # Copy-on-write pages per orders/reviews table (power of two)
+    SNAPSHOT_PAGES: int = 256
+
+    # Ids: each thread takes ID_BLOCK_SIZE ids at a time; ID_STATE_DIR keeps
+    # high-water marks so ids aren't reused after a restart
+    ID_BLOCK_SIZE: int = 64
+    ID_STATE_DIR: str = ""
+    # Tables with time-ordered (snowflake) ids, e.g. ["order"], and this
+    # process's worker id in them
+    TIME_ORDERED_IDS: List[str] = []
+    ID_WORKER: int = 0
+
+    # Recommendations
+    RECOMMENDATION_TOP_K: int = 20
+    RECOMMENDATION_MAX_NEIGHBOURS: int = 200
+
+    # Idempotency-Key support
+    IDEMPOTENCY_MAX_KEYS: int = 10_000
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+
+    # Rate limits per "METHOD /path" ("*" for all other requests), as
+    # "<requests>/<second|minute|hour|day or seconds>"
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /auth/login": "10/minute",
+        "POST /auth/register": "5/minute",
+        "GET /products/": "120/minute",
+        "GET /products/search": "120/minute",
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # Change stream; EVENT_LOG_DIR enables on-disk segments
+    EVENT_LOG_CAPACITY: int = 65_536
+    EVENT_LOG_DIR: str = ""
+    EVENT_LOG_SEGMENT_EVENTS: int = 100_000
+    EVENT_POLL_MAX_TIMEOUT: float = 30.0
+    EVENT_STREAM_KEEPALIVE: float = 15.0
+
+    # Live product updates (GET /products/stream)
+    PRODUCT_STREAM_TICK: float = 0.1
+    PRODUCT_STREAM_MAX_IDS: int = 100
+    PRODUCT_STREAM_MAX_STALL: float = 30.0
+
+    # Response compression (gzip; br and zstd when installed). Compressed
+    # bodies of GETs on COMPRESSION_CACHE_PATHS are cached.
+    COMPRESSION_LEVELS: Dict[str, int] = {"gzip": 6, "br": 5, "zstd": 3}
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREAD_THRESHOLD: int = 256 * 1024
+    COMPRESSION_CACHE_PATHS: List[str] = ["/products/", "/categories/"]
+    COMPRESSION_CACHE_BYTES: int = 32 * 1024 * 1024
+
+    # Request profiling (GET /debug/profile). Requests are profiled at
+    # random, by path prefix, or with an "X-Profile: <secret>" header.
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_PATHS: List[str] = []
+    PROFILE_HEADER_SECRET: str = ""
+    PROFILE_INTERVAL: float = 0.005
+    PROFILE_MAX_STACKS: int = 10_000
+    PROFILE_MAX_SESSION_SECONDS: float = 60.0
+
+    # Per-stage latency histograms in /metrics. Server-Timing headers go to
+    # requests with the X-Profile secret, or to everyone if SERVER_TIMING_PUBLIC
+    TRACING_ENABLED: bool = True
+    SERVER_TIMING_PUBLIC: bool = False
+
+    # Background jobs
+    JOB_WORKERS: int = 4
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY: float = 0.1
+    JOB_DRAIN_TIMEOUT: float = 10.0
+
+    # Multi-process deployment: "single", "writer" or "reader"
+    CLUSTER_ROLE: str = "single"
+    CLUSTER_DIR: str = "/dev/shm/ecommerce"
+    CLUSTER_PUBLISH_INTERVAL: float = 0.05
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
@@ -0,0 +1,210 @@
+"""
+In-process background job queue.
+
+Endpoints submit side effects (confirmation, exports, aggregate updates) as
+jobs instead of doing them inline. Once started from the app lifespan, a
+pool of asyncio workers runs them out of band, retrying failures with
+exponential backoff and dead-lettering jobs that keep failing. Before the
+queue is started (scripts, tests without a lifespan) and after it is
+drained, submitted jobs run inline, so no work is dropped.
+
+Handlers run on the event loop, like the async endpoints, so they see the
+in-memory database in the same consistent state. Handlers registered as
+blocking (CPU-heavy work such as password hashing) run in the thread pool
+instead.
+"""
+
+import asyncio
+import inspect
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+
+@dataclass
+class Job:
+    """A unit of background work."""
+
+    kind: str
+    args: tuple
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+class JobQueue:
+    """Asyncio job queue with a worker pool, retries and a dead-letter list."""
+
+    _registry: List["JobQueue"] = []
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        retry_delay: float = 0.1,
+        dead_letter_size: int = 1000,
+    ):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.dead_letters: deque = deque(maxlen=dead_letter_size)
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self._blocking: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._unfinished = 0
+        self._idle: Optional[asyncio.Event] = None
+        self.submitted = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        JobQueue._registry.append(self)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def register(self, kind: str, handler: Callable[..., Any], blocking: bool = False):
+        """
+        Set the handler for a job kind. Handlers may be sync or async;
+        blocking sync handlers run in the thread pool.
+        """
+        self._handlers[kind] = handler
+        if blocking:
+            self._blocking.add(kind)
+
+    def submit(self, kind: str, *args):
+        """Queue a job, or run it right away if the workers are not running."""
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind {kind!r}")
+        self.submitted += 1
+        job = Job(kind, args)
+        if not self.running:
+            self._run_inline(job)
+            return
+        self._unfinished += 1
+        self._idle.clear()
+        self._queue.put_nowait(job)
+
+    async def start(self, workers: int):
+        self._queue = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"{self.name}-worker-{i}")
+            for i in range(workers)
+        ]
+
+    async def drain(self, timeout: float):
+        """
+        Wait up to timeout seconds for queued jobs, then stop the workers.
+
+        Jobs still queued at the deadline are dead-lettered.
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            self._dead_letter(self._queue.get_nowait(), "not processed before shutdown")
+            self._finish()
+
+    async def _work(self):
+        while True:
+            await self._process(await self._queue.get())
+
+    async def _process(self, job: Job):
+        if await self._attempt(job):
+            self._finish()
+            return
+        # Retry later without holding a worker
+        delay = self.retry_delay * 2 ** (job.attempts - 1)
+        asyncio.get_running_loop().call_later(delay, self._requeue, job)
+
+    def _requeue(self, job: Job):
+        if self.running:
+            self._queue.put_nowait(job)
+        else:
+            self._finish()
+            self._run_inline(job)
+
+    async def _attempt(self, job: Job) -> bool:
+        """Run a job once. False if it failed and should be retried."""
+        handler = self._handlers[job.kind]
+        try:
+            if job.kind in self._blocking:
+                await run_in_threadpool(handler, *job.args)
+            else:
+                result = handler(*job.args)
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as exc:
+            return self._failed(job, exc)
+        self.completed += 1
+        return True
+
+    def _run_inline(self, job: Job):
+        while True:
+            try:
+                result = self._handlers[job.kind](*job.args)
+                if inspect.isawaitable(result):
+                    raise TypeError("async handlers need a running queue")
+            except Exception as exc:
+                if self._failed(job, exc):
+                    return
+                continue
+            self.completed += 1
+            return
+
+    def _failed(self, job: Job, exc: Exception) -> bool:
+        """Record a failure. True if the job is finished (dead-lettered)."""
+        job.attempts += 1
+        job.error = repr(exc)
+        if job.attempts >= self.max_attempts:
+            self._dead_letter(job, job.error)
+            return True
+        self.retried += 1
+        return False
+
+    def _dead_letter(self, job: Job, error: str):
+        job.error = error
+        self.dead_letters.append(job)
+        self.dead_lettered += 1
+
+    def _finish(self):
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._idle.set()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "depth": self._queue.qsize() if self.running else 0,
+            "unfinished": self._unfinished,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, dict]:
+        """Stats of every JobQueue instance, keyed by name."""
+        return {queue.name: queue.stats() for queue in cls._registry}
+
+    @classmethod
+    async def start_all(cls, workers: int):
+        for queue in cls._registry:
+            await queue.start(workers)
+
+    @classmethod
+    async def drain_all(cls, timeout: float):
+        for queue in cls._registry:
+            await queue.drain(timeout)
@@ -1,7 +1,10 @@
 """Security utilities - password hashing, JWT token handling, OAuth2."""
 
+import math
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -9,40 +12,152 @@ from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12,
-)
+
+def _hashing_config(rounds: int) -> dict:
+    # Every hash records its scheme and cost. Unsalted SHA-256 hashes from
+    # older versions still verify but are deprecated, as are bcrypt hashes
+    # cheaper than the configured cost, so both get replaced on login.
+    return {
+        "schemes": ["bcrypt", "hex_sha256"],
+        "deprecated": ["hex_sha256"],
+        "bcrypt__default_rounds": rounds,
+        "bcrypt__min_rounds": rounds,
+    }
+
+
+pwd_context = CryptContext(**_hashing_config(settings.PASSWORD_HASH_ROUNDS or 12))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+def calibrate_bcrypt_rounds(
+    target_seconds: float, min_rounds: int = 10, max_rounds: int = 16
+) -> int:
+    """Highest bcrypt cost whose hash takes at most target_seconds here."""
+    probe_rounds = 8
+    probe = pwd_context.handler("bcrypt").using(rounds=probe_rounds)
+    elapsed = min(_time(probe.hash, "calibration") for _ in range(3))
+    # Each extra round doubles the work
+    rounds = probe_rounds + math.floor(math.log2(target_seconds / elapsed))
+    return max(min_rounds, min(max_rounds, rounds))
+
+
+def configure_password_hashing(rounds: Optional[int] = None) -> int:
+    """
+    Set the bcrypt cost for new hashes, calibrated to
+    PASSWORD_HASH_TARGET_SECONDS unless rounds is given.
+    """
+    if not rounds:
+        rounds = calibrate_bcrypt_rounds(settings.PASSWORD_HASH_TARGET_SECONDS)
+    pwd_context.load(_hashing_config(rounds))
+    return rounds
+
+
+def _time(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def _secret(password: str, hashed_password: str) -> str:
+    # bcrypt only looks at 72 bytes; legacy SHA-256 hashes cover it all
+    if pwd_context.identify(hashed_password) == "hex_sha256":
+        return password
+    return password[:72]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password[:72], hashed_password)
+    """Verify a password against its hash, whatever scheme it uses."""
+    return pwd_context.verify(_secret(plain_password, hashed_password), hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash uses a deprecated scheme or less than the current cost."""
+    return pwd_context.needs_update(hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash using bcrypt."""
+    """Generate password hash using bcrypt at the configured cost."""
     return pwd_context.hash(password[:72])
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+def _create_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (
-        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    )
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation
+    to_encode.update({
+        "exp": datetime.utcnow() + expires_delta,
+        "jti": uuid.uuid4().hex,
+        "type": token_type,
+    })
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and validate a JWT access token. Returns None if invalid."""
+def _decode_token(token: str, token_type: str) -> Optional[dict]:
     try:
-        return jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    # Tokens issued before refresh tokens existed carry no type
+    return payload if payload.get("type", ACCESS_TOKEN) == token_type else None
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a JWT access token."""
+    return _create_token(
+        data,
+        ACCESS_TOKEN,
+        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a long-lived JWT refresh token, only accepted by /auth/refresh."""
+    return _create_token(
+        data,
+        REFRESH_TOKEN,
+        expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode and validate a JWT access token. Returns None if invalid."""
+    return _decode_token(token, ACCESS_TOKEN)
+
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """Decode and validate a JWT refresh token. Returns None if invalid."""
+    return _decode_token(token, REFRESH_TOKEN)
+
+
+# token -> (subject, expiry timestamp) of recently verified tokens
+_verified_subjects: Dict[str, Tuple[Optional[str], float]] = {}
+VERIFIED_SUBJECTS_SIZE = 10_000
+
+
+def bearer_subject(headers: Iterable[Tuple[bytes, bytes]]) -> Optional[str]:
+    """
+    Subject of a valid bearer token in raw ASGI headers, if any.
+
+    Used by middleware on every request, so verified tokens are remembered
+    until they expire instead of checking the signature each time.
+    """
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            cached = _verified_subjects.get(token)
+            if cached is not None and cached[1] > time.time():
+                return cached[0]
+            payload = decode_access_token(token)
+            if payload is None:
+                return None
+            if len(_verified_subjects) >= VERIFIED_SUBJECTS_SIZE:
+                del _verified_subjects[next(iter(_verified_subjects))]
+            _verified_subjects[token] = (payload.get("sub"), payload.get("exp", 0))
+            return payload.get("sub")
+    return None
@@ -0,0 +1,62 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same key share one in-flight computation
+instead of each doing the work. The computation runs in the thread pool, so
+the event loop keeps accepting the requests that will join it.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable, List
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+
+    _registry: List["SingleFlight"] = []
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        SingleFlight._registry.append(self)
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+        """
+        Return fn(*args), sharing the result with concurrent callers of key.
+
+        The shared computation is shielded, so a disconnecting caller does not
+        cancel it for everyone else.
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(self._execute(key, fn, args))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _execute(self, key: Hashable, fn: Callable[..., Any], args) -> Any:
+        try:
+            return await run_in_threadpool(fn, *args)
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, dict]:
+        """Stats of every SingleFlight instance, keyed by name."""
+        return {flight.name: flight.stats() for flight in cls._registry}
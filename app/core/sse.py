@@ -0,0 +1,26 @@
+"""
+Server-sent events helpers.
+"""
+
+import json
+from typing import Any, Optional
+
+MEDIA_TYPE = "text/event-stream"
+# Keep proxies from buffering or caching the stream
+HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+KEEPALIVE = b": keepalive\n\n"
+
+
+def sse_message(data: Any, event: Optional[str] = None, id: Optional[int] = None) -> bytes:
+    """Encode one server-sent event with JSON data."""
+    return sse_raw(json.dumps(data, separators=(",", ":")).encode(), event, id)
+
+
+def sse_raw(data: bytes, event: Optional[str] = None, id: Optional[int] = None) -> bytes:
+    """Encode one server-sent event whose data is already serialized (one line)."""
+    head = b""
+    if id is not None:
+        head += b"id: %d\n" % id
+    if event is not None:
+        head += b"event: " + event.encode() + b"\n"
+    return head + b"data: " + data + b"\n\n"
@@ -0,0 +1,183 @@
+"""
+Per-request timing of named stages.
+
+ServerTimingMiddleware starts a Trace for each request in a context
+variable. Code running for the request times its stages with ``span`` or
+the ``traced`` decorator; the durations are sent back in the Server-Timing
+response header and added to per-stage histograms for /metrics.
+
+    @traced
+    def create_order_from_cart(self, user_id): ...   # "OrderService.create_order_from_cart"
+
+    with span("auth"):
+        payload = decode_access_token(token)
+
+Stage times are inclusive: a traced method called from another traced
+method counts towards both, and a stage entered several times in one
+request is summed. Outside a trace (tracing disabled, background jobs,
+tests calling services directly) a span is a context variable lookup.
+"""
+
+import bisect
+import functools
+import inspect
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds of histogram buckets, in milliseconds
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Trace:
+    """Total seconds spent in each stage of one request."""
+
+    __slots__ = ("stages",)
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages.items()
+        )
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_NO_SPAN = nullcontext()
+
+
+def start_trace() -> Tuple[Trace, Token]:
+    """Trace the current context; pass the token to end_trace when done."""
+    trace = Trace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token: Token):
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.trace.add(self.name, time.perf_counter() - self.start)
+
+
+def span(name: str):
+    """Context manager timing a stage of the current request, if traced."""
+    trace = _current_trace.get()
+    return _NO_SPAN if trace is None else _Span(trace, name)
+
+
+def traced(func: Optional[Callable] = None, *, name: Optional[str] = None):
+    """
+    Time every call of a function as a stage, named after its qualified name.
+
+    Works on plain and async functions, as @traced or @traced(name="...").
+    """
+    if func is None:
+        return functools.partial(traced, name=name)
+    stage = name or func.__qualname__
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                trace.add(stage, time.perf_counter() - start)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trace = _current_trace.get()
+        if trace is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            trace.add(stage, time.perf_counter() - start)
+
+    return wrapper
+
+
+class StageHistograms:
+    """Latency histograms per stage name, with fixed millisecond buckets."""
+
+    def __init__(self, buckets_ms=BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        # stage -> [count per bucket..., count above the last bucket]
+        self._counts: Dict[str, List[int]] = {}
+        self._totals: Dict[str, float] = {}
+
+    def record(self, trace: Trace):
+        for name, seconds in trace.stages.items():
+            counts = self._counts.get(name)
+            if counts is None:
+                counts = self._counts[name] = [0] * (len(self.buckets_ms) + 1)
+                self._totals[name] = 0.0
+            millis = seconds * 1000
+            counts[bisect.bisect_left(self.buckets_ms, millis)] += 1
+            self._totals[name] += millis
+
+    def percentile(self, name: str, fraction: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the given fraction of samples.
+
+        None if there are no samples, or it is above the last bucket.
+        """
+        counts = self._counts.get(name)
+        if not counts:
+            return None
+        rank = fraction * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets_ms, counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def clear(self):
+        self._counts.clear()
+        self._totals.clear()
+
+    def stats(self) -> dict:
+        stats = {}
+        for name, counts in self._counts.items():
+            count = sum(counts)
+            stats[name] = {
+                "count": count,
+                "mean_ms": round(self._totals[name] / count, 3),
+                "p50_ms": self.percentile(name, 0.5),
+                "p90_ms": self.percentile(name, 0.9),
+                "p99_ms": self.percentile(name, 0.99),
+                "buckets": {
+                    f"le_{bound:g}": n for bound, n in zip(self.buckets_ms, counts) if n
+                },
+            }
+            if counts[-1]:
+                stats[name]["buckets"]["inf"] = counts[-1]
+        return stats
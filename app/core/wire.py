@@ -0,0 +1,155 @@
+"""
+MessagePack as an alternative wire format, chosen by content negotiation.
+
+Routers use MsgPackRoute as their route class. For requests sent with
+``Content-Type: application/msgpack`` the body is decoded with msgpack
+instead of JSON, then validated against the same Pydantic schemas. Clients
+sending ``Accept: application/msgpack`` get msgpack responses:
+
+- list endpoints with a FieldSelector (see app.core.fields) pack rows read
+  straight from the dataclass models, skipping Pydantic and JSON;
+- endpoints returning ``model_response(model, build)`` pack the model's
+  ``to_dict()``;
+- other JSON responses are built as usual and repacked as msgpack.
+
+Values are the same as in JSON responses; datetimes are ISO 8601 strings.
+"""
+
+import json
+from contextvars import ContextVar
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable, Coroutine
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (b"application/msgpack", b"application/x-msgpack", b"application/vnd.msgpack")
+
+_msgpack_response: ContextVar[bool] = ContextVar("msgpack_response", default=False)
+
+
+def json_default(value):
+    """Encode the non-JSON values of models the way Pydantic does."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not serializable")
+
+
+def packb(content) -> bytes:
+    return msgpack.packb(content, default=json_default, use_bin_type=True)
+
+
+def unpackb(data: bytes):
+    return msgpack.unpackb(data, raw=False)
+
+
+def wants_msgpack() -> bool:
+    """Whether the current request negotiated a msgpack response."""
+    return _msgpack_response.get()
+
+
+def accepts_msgpack(accept: bytes) -> bool:
+    """Whether an Accept header prefers msgpack to JSON."""
+    msgpack_quality = json_quality = 0.0
+    for part in accept.lower().split(b","):
+        media_type, _, params = part.partition(b";")
+        media_type = media_type.strip()
+        params = params.strip()
+        quality = 1.0
+        if params.startswith(b"q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if media_type in MSGPACK_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type == b"application/json":
+            json_quality = max(json_quality, quality)
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK
+
+    def render(self, content) -> bytes:
+        return packb(content)
+
+
+class MsgPackRequest(Request):
+    """Request whose body is msgpack; json() decodes it."""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = unpackb(await self.body())
+        return self._json
+
+
+def model_response(model, build: Callable):
+    """The model packed from to_dict() for msgpack clients, else build(model)."""
+    if _msgpack_response.get():
+        return MsgPackResponse(model.to_dict())
+    return build(model)
+
+
+def _header(scope, name: bytes) -> bytes:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return b""
+
+
+def _as_json_request(request: Request) -> MsgPackRequest:
+    # FastAPI only parses bodies it believes are JSON
+    scope = dict(request.scope)
+    scope["headers"] = [
+        (key, b"application/json" if key == b"content-type" else value)
+        for key, value in scope["headers"]
+    ]
+    return MsgPackRequest(scope, request.receive)
+
+
+def _repack(response: Response) -> Response:
+    if response.media_type != "application/json" or not hasattr(response, "body"):
+        return response
+    body = packb(json.loads(response.body)) if response.body else b""
+    response.body = body
+    response.headers["content-type"] = MSGPACK
+    response.headers["content-length"] = str(len(body))
+    return response
+
+
+def _vary_accept(response: Response) -> Response:
+    # JSON and msgpack variants share a URL; caches must key on Accept
+    vary = response.headers.get("vary")
+    if not vary:
+        response.headers["vary"] = "Accept"
+    elif "accept" not in (value.strip().lower() for value in vary.split(",")):
+        response.headers["vary"] = f"{vary}, Accept"
+    return response
+
+
+class MsgPackRoute(APIRoute):
+    """API route that also speaks msgpack, negotiated per request."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if _header(request.scope, b"content-type").startswith(MSGPACK_TYPES):
+                request = _as_json_request(request)
+            if not accepts_msgpack(_header(request.scope, b"accept")):
+                return _vary_accept(await handler(request))
+
+            token = _msgpack_response.set(True)
+            try:
+                response = await handler(request)
+            finally:
+                _msgpack_response.reset(token)
+            return _repack(_vary_accept(response))
+
+        return route_handler
@@ -2,6 +2,52 @@
 Database module - in-memory storage for the e-commerce application.
 """
 
-from .db import Database, db
+from .db import Database, ShardedDatabase, create_database, db
+from .catalog_file import CatalogFile, write_catalog
+from .copurchase import CoPurchaseIndex
+from .event_log import Event, EventLog, Subscription
+from .facts import OrderItemFacts
+from .ids import IdAllocator, IdStore, SnowflakeIds
+from .order_index import OrderIndex
+from .prefix_index import PrefixIndex
+from .product_store import MappedProduct, ProductStore
+from .revocation import BloomFilter, RevocationList
+from .search_index import SearchIndex
+from .shards import Shard, ShardedTable
+from .snapshot import CatalogSnapshot, SnapshotReader, SnapshotWriter
+from .stock import ShardedCounter, StockLedger
+from .versioned import DatabaseSnapshot, TableSnapshot, VersionedTable
 
-__all__ = ["Database", "db"]
+__all__ = [
+    "Database",
+    "ShardedDatabase",
+    "create_database",
+    "db",
+    "CatalogFile",
+    "write_catalog",
+    "CoPurchaseIndex",
+    "Event",
+    "EventLog",
+    "Subscription",
+    "OrderIndex",
+    "OrderItemFacts",
+    "IdAllocator",
+    "IdStore",
+    "SnowflakeIds",
+    "PrefixIndex",
+    "MappedProduct",
+    "ProductStore",
+    "BloomFilter",
+    "RevocationList",
+    "SearchIndex",
+    "Shard",
+    "ShardedTable",
+    "CatalogSnapshot",
+    "SnapshotReader",
+    "SnapshotWriter",
+    "ShardedCounter",
+    "StockLedger",
+    "DatabaseSnapshot",
+    "TableSnapshot",
+    "VersionedTable",
+]
@@ -0,0 +1,141 @@
+"""
+Columnar, memory-mapped product catalog file.
+
+Layout: a header, then one fixed-width column per numeric field (ids sorted,
+so the id column doubles as the offset index), uint64 offset arrays into a
+string heap per text field, and a dictionary-encoded category column. A
+process maps the file and reads fields straight from the mapped pages.
+"""
+
+import bisect
+import mmap
+import struct
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.models.product import Product
+
+MAGIC = b"ECATCOL1"
+# magic, rows, categories, then the byte offset of every column
+HEADER = struct.Struct("<8sQQ12Q")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _offsets(strings) -> array:
+    return array("Q", accumulate((len(value) for value in strings), initial=0))
+
+
+def write_catalog(path: str, products: Iterable[Product]):
+    """Write products to a catalog file, ordered by id."""
+    rows = sorted(products, key=lambda product: product.id)
+    names = [product.name.encode() for product in rows]
+    descriptions = [product.description.encode() for product in rows]
+    category_codes = {}
+    for product in rows:
+        category_codes.setdefault(product.category, len(category_codes))
+    categories = [category.encode() for category in category_codes]
+
+    columns = [
+        array("q", (product.id for product in rows)).tobytes(),
+        array("d", (product.price for product in rows)).tobytes(),
+        array("q", (product.stock for product in rows)).tobytes(),
+        array("q", ((product.created_at - EPOCH) // MICROSECOND for product in rows)).tobytes(),
+        array("B", (product.is_hot for product in rows)).tobytes(),
+        array("I", (category_codes[product.category] for product in rows)).tobytes(),
+        _offsets(names).tobytes(),
+        b"".join(names),
+        _offsets(descriptions).tobytes(),
+        b"".join(descriptions),
+        _offsets(categories).tobytes(),
+        b"".join(categories),
+    ]
+
+    positions = []
+    position = HEADER.size
+    for column in columns:
+        positions.append(position)
+        position += (len(column) + 7) & ~7
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(rows), len(categories), *positions))
+        for column in columns:
+            file.write(column)
+            file.write(b"\0" * (-len(column) % 8))
+
+
+class CatalogFile:
+    """Read-only view of a catalog file; rows are addressed by position."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, rows, categories, *positions = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+
+        def column(index: int, size: int, fmt: str) -> memoryview:
+            start = positions[index]
+            return view[start:start + size * struct.calcsize(fmt)].cast(fmt)
+
+        self.ids = column(0, rows, "q")
+        self.prices = column(1, rows, "d")
+        self.stocks = column(2, rows, "q")
+        self.created_at = column(3, rows, "q")
+        self.is_hot = column(4, rows, "B")
+        self.category_codes = column(5, rows, "I")
+        self._name_offsets = column(6, rows + 1, "Q")
+        self._names = view[positions[7]:]
+        self._description_offsets = column(8, rows + 1, "Q")
+        self._descriptions = view[positions[9]:]
+        category_offsets = column(10, categories + 1, "Q")
+        category_heap = view[positions[11]:]
+        self.categories = [
+            str(category_heap[category_offsets[code]:category_offsets[code + 1]], "utf-8")
+            for code in range(categories)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, product_id: int) -> Optional[int]:
+        """Row of a product id, or None."""
+        row = bisect.bisect_left(self.ids, product_id)
+        if row < len(self.ids) and self.ids[row] == product_id:
+            return row
+        return None
+
+    def name(self, row: int) -> str:
+        offsets = self._name_offsets
+        return str(self._names[offsets[row]:offsets[row + 1]], "utf-8")
+
+    def description(self, row: int) -> str:
+        offsets = self._description_offsets
+        return str(self._descriptions[offsets[row]:offsets[row + 1]], "utf-8")
+
+    def category(self, row: int) -> str:
+        return self.categories[self.category_codes[row]]
+
+    def created(self, row: int) -> datetime:
+        return EPOCH + self.created_at[row] * MICROSECOND
+
+    def product(self, row: int) -> Product:
+        """Materialize a row as a regular Product."""
+        return Product(
+            id=self.ids[row],
+            name=self.name(row),
+            description=self.description(row),
+            price=self.prices[row],
+            stock=self.stocks[row],
+            category=self.category(row),
+            created_at=self.created(row),
+            is_hot=bool(self.is_hot[row]),
+        )
+
+    def names(self) -> Iterator[Tuple[int, str]]:
+        """(id, name) of every row, without reading other columns."""
+        for row in range(len(self.ids)):
+            yield self.ids[row], self.name(row)
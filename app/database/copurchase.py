@@ -0,0 +1,158 @@
+"""
+Co-purchase counts for "frequently bought together" recommendations.
+"""
+
+import heapq
+import threading
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def count_pairs(baskets: Iterable[List[int]]) -> Counter:
+    """Count unordered product pairs, once per basket. Keys are (low, high)."""
+    pairs: Counter = Counter()
+    for basket in baskets:
+        pairs.update(combinations(sorted(set(basket)), 2))
+    return pairs
+
+
+class CoPurchaseIndex:
+    """
+    Sparse product x product co-purchase counts with a bounded top-k per product.
+
+    Each product keeps a min-heap of its k strongest neighbours, so reads are
+    O(k). Neighbour maps are pruned back to ``max_neighbours`` entries by
+    dropping the weakest pairs, which keeps memory bounded on a long-tail
+    catalog at the cost of approximate counts for rare pairs.
+
+    Every recorded order bumps ``version``. Between begin_rebuild() and
+    end_rebuild() recorded orders are also journaled, so load() can replay
+    the ones newer than the version its pair counts were taken at.
+    """
+
+    def __init__(self, top_k: int = 10, max_neighbours: int = 200):
+        self.top_k = top_k
+        self.max_neighbours = max_neighbours
+        self._lock = threading.Lock()
+        self._counts: Dict[int, Dict[int, int]] = {}
+        self._top: Dict[int, List[Tuple[int, int]]] = {}
+        self.version = 0
+        # (version, product ids, delta) of orders recorded during rebuilds
+        self._journal: List[Tuple[int, List[int], int]] = []
+        self._rebuilds = 0
+
+    def record_order(self, order, delta: int = 1):
+        """Add (or with delta=-1, remove) one order's product pairs."""
+        product_ids = sorted({item.product_id for item in order.items})
+        with self._lock:
+            self.version += 1
+            if self._rebuilds:
+                self._journal.append((self.version, product_ids, delta))
+            self._apply(product_ids, delta)
+
+    def _apply(self, product_ids: List[int], delta: int):
+        for a, b in combinations(product_ids, 2):
+            self._bump(a, b, delta)
+            self._bump(b, a, delta)
+
+    def _bump(self, product_id: int, neighbour: int, delta: int):
+        counts = self._counts.setdefault(product_id, {})
+        count = counts.get(neighbour, 0) + delta
+        if count > 0:
+            counts[neighbour] = count
+        else:
+            counts.pop(neighbour, None)
+
+        heap = self._top.setdefault(product_id, [])
+        position = next(
+            (i for i, (_, member) in enumerate(heap) if member == neighbour), None
+        )
+        if position is not None:
+            if delta < 0:
+                # A member got weaker: an outsider may now belong in the top-k
+                self._rebuild_top(product_id)
+                return
+            heap[position] = (count, neighbour)
+            heapq.heapify(heap)
+        elif count > 0:
+            if len(heap) < self.top_k:
+                heapq.heappush(heap, (count, neighbour))
+            elif (count, neighbour) > heap[0]:
+                heapq.heapreplace(heap, (count, neighbour))
+
+        if len(counts) > self.max_neighbours:
+            self._prune(product_id)
+
+    def _rebuild_top(self, product_id: int):
+        counts = self._counts.get(product_id, {})
+        top = heapq.nlargest(
+            self.top_k, ((count, neighbour) for neighbour, count in counts.items())
+        )
+        heapq.heapify(top)
+        self._top[product_id] = top
+
+    def _prune(self, product_id: int):
+        """Drop the weakest pairs, keeping 3/4 of max_neighbours."""
+        counts = self._counts[product_id]
+        keep = heapq.nlargest(
+            self.max_neighbours * 3 // 4, counts.items(), key=lambda entry: entry[1]
+        )
+        self._counts[product_id] = dict(keep)
+        self._rebuild_top(product_id)
+
+    def top(self, product_id: int, limit: int) -> List[Tuple[int, int]]:
+        """Strongest neighbours as (product_id, count), best first."""
+        heap = self._top.get(product_id, ())
+        ranked = sorted(heap, reverse=True)[:limit]
+        return [(neighbour, count) for count, neighbour in ranked]
+
+    def forget(self, product_id: int):
+        """Drop a deleted product's own neighbour lists."""
+        with self._lock:
+            self._counts.pop(product_id, None)
+            self._top.pop(product_id, None)
+
+    def begin_rebuild(self):
+        """Start journaling recorded orders; call before taking the snapshot."""
+        with self._lock:
+            self._rebuilds += 1
+
+    def end_rebuild(self):
+        with self._lock:
+            self._rebuilds -= 1
+            if not self._rebuilds:
+                self._journal = []
+
+    def load(self, pairs: Counter, since_version: Optional[int] = None):
+        """
+        Replace all counts with precomputed pair counts.
+
+        With since_version, the pairs were counted as of that version; orders
+        journaled after it are applied on top.
+        """
+        counts: Dict[int, Dict[int, int]] = {}
+        for (a, b), count in pairs.items():
+            counts.setdefault(a, {})[b] = count
+            counts.setdefault(b, {})[a] = count
+        with self._lock:
+            self._counts = counts
+            self._top = {}
+            for product_id in list(counts):
+                if len(counts[product_id]) > self.max_neighbours:
+                    self._prune(product_id)
+                else:
+                    self._rebuild_top(product_id)
+            if since_version is not None:
+                for version, product_ids, delta in self._journal:
+                    if version > since_version:
+                        self._apply(product_ids, delta)
+
+    def pair_count(self) -> int:
+        return sum(len(counts) for counts in self._counts.values()) // 2
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._top.clear()
+            self._journal = []
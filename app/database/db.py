@@ -2,7 +2,24 @@
 In-memory database implementation for the e-commerce application.
 """
 
-from typing import Dict
+import os
+import threading
+from typing import Dict, MutableMapping, Set, Union
+
+from app.core.config import settings
+from app.database.catalog_file import CatalogFile, write_catalog
+from app.database.copurchase import CoPurchaseIndex
+from app.database.event_log import EventLog
+from app.database.facts import OrderItemFacts
+from app.database.ids import IdAllocator, IdStore, SnowflakeIds
+from app.database.order_index import OrderIndex
+from app.database.prefix_index import PrefixIndex, category_ref, product_ref
+from app.database.product_store import ProductStore
+from app.database.revocation import RevocationList
+from app.database.search_index import SearchIndex
+from app.database.shards import Shard, ShardedTable
+from app.database.versioned import DatabaseSnapshot, VersionedTable
+from app.database.stock import StockLedger
 
 
 class Database:
@@ -12,56 +29,215 @@ class Database:
 
     def __init__(self):
         self.users: Dict[int, dict] = {}
-        self.products: Dict[int, dict] = {}
+        self.products: MutableMapping[int, dict] = {}
         self.carts: Dict[int, dict] = {}
-        self.orders: Dict[int, dict] = {}
+        # Copy-on-write, for snapshot() readers
+        self.orders: MutableMapping[int, dict] = VersionedTable(settings.SNAPSHOT_PAGES)
         self.categories: Dict[int, dict] = {}
-        self.reviews: Dict[int, dict] = {}
+        self.reviews: MutableMapping[int, dict] = VersionedTable(settings.SNAPSHOT_PAGES)
+        # Derived order state maintained by background jobs
+        self.order_exports: Dict[int, str] = {}
+        self.aggregated_orders: Set[int] = set()
+
+        self.stock = StockLedger(shards=settings.HOT_STOCK_SHARDS)
+        self.order_index = OrderIndex()
+        self.facts = OrderItemFacts()
+        self.names = PrefixIndex()
+        self.search = SearchIndex()
+        self.copurchases = CoPurchaseIndex(
+            top_k=settings.RECOMMENDATION_TOP_K,
+            max_neighbours=settings.RECOMMENDATION_MAX_NEIGHBOURS,
+        )
+        self.revoked_tokens = RevocationList(
+            prune_interval=settings.REVOCATION_PRUNE_INTERVAL
+        )
+        self.events = EventLog(
+            capacity=settings.EVENT_LOG_CAPACITY,
+            segment_dir=settings.EVENT_LOG_DIR or None,
+            segment_events=settings.EVENT_LOG_SEGMENT_EVENTS,
+        )
+
+        # Held for writes to a user's cart, orders and reviews
+        self._user_lock = threading.RLock()
+        self.id_store = (
+            IdStore(os.path.join(settings.ID_STATE_DIR, "ids.json"))
+            if settings.ID_STATE_DIR else None
+        )
+        self._user_ids = self._id_allocator("user")
+        self._product_ids = self._id_allocator("product")
+        self._order_ids = self._id_allocator("order")
+        self._category_ids = self._id_allocator("category")
+        self._review_ids = self._id_allocator("review")
 
-        self._user_id_counter: int = 1
-        self._product_id_counter: int = 1
-        self._order_id_counter: int = 1
-        self._category_id_counter: int = 1
-        self._review_id_counter: int = 1
+    def _id_allocator(self, name: str) -> Union[IdAllocator, SnowflakeIds]:
+        if name in settings.TIME_ORDERED_IDS:
+            return SnowflakeIds(settings.ID_WORKER)
+        return IdAllocator(name, settings.ID_BLOCK_SIZE, store=self.id_store)
+
+    def snapshot(self) -> DatabaseSnapshot:
+        """
+        Consistent read-only view of orders, reviews and order item facts.
+
+        For exports and reports that scan whole tables while checkouts go
+        on. Pinning is O(pages) under the user lock, so it sees no half-done
+        write; after that, readers never block writers. Close the snapshot
+        (or use it in a with block) when done, and don't take one while
+        holding a user lock.
+        """
+        with self.user_lock(0):
+            orders = self.orders.snapshot()
+            reviews = self.reviews.snapshot()
+            facts = self.facts.columns()
+            aggregated = frozenset(self.aggregated_orders)
+            version = self.copurchases.version
+        return DatabaseSnapshot(
+            orders, reviews, facts, pinned=(orders, reviews),
+            aggregated_orders=aggregated, copurchases_version=version,
+        )
 
     def get_next_user_id(self) -> int:
-        user_id = self._user_id_counter
-        self._user_id_counter += 1
-        return user_id
+        return self._user_ids.next_id()
 
     def get_next_product_id(self) -> int:
-        product_id = self._product_id_counter
-        self._product_id_counter += 1
-        return product_id
+        return self._product_ids.next_id()
+
+    def user_lock(self, user_id: int) -> threading.RLock:
+        """Lock serializing writes to one user's cart, orders and reviews."""
+        return self._user_lock
 
-    def get_next_order_id(self) -> int:
-        order_id = self._order_id_counter
-        self._order_id_counter += 1
-        return order_id
+    def get_next_order_id(self, user_id: int = 0) -> int:
+        return self._order_ids.next_id()
 
     def get_next_category_id(self) -> int:
-        category_id = self._category_id_counter
-        self._category_id_counter += 1
-        return category_id
+        return self._category_ids.next_id()
 
-    def get_next_review_id(self) -> int:
-        review_id = self._review_id_counter
-        self._review_id_counter += 1
-        return review_id
+    def get_next_review_id(self, user_id: int = 0) -> int:
+        return self._review_ids.next_id()
+
+    def load_catalog(self, path: str):
+        """
+        Serve products from a catalog file written by save_catalog.
+
+        The file is memory-mapped rather than loaded; only the name indexes
+        and the stock ledger of hot products are built up front. Meant for
+        startup: name popularity scores start again from zero.
+        """
+        catalog = CatalogFile(path)
+        self.products = ProductStore(catalog)
+        self.names.load([
+            *((product_ref(product_id), name, 0.0) for product_id, name in catalog.names()),
+            *((category_ref(category.id), category.name, 0.0)
+              for category in self.categories.values()),
+        ])
+        self.search.reset()
+        for product_id, name in catalog.names():
+            self.search.add(product_id, name)
+        for row in range(len(catalog)):
+            if catalog.is_hot[row]:
+                self.stock.make_hot(self.products[catalog.ids[row]])
+        if len(catalog):
+            self._product_ids.advance_to(catalog.ids[-1] + 1)
+
+    def save_catalog(self, path: str):
+        """Write all products, including unsaved changes, to a catalog file."""
+        write_catalog(path, list(self.products.values()))
 
     def reset(self):
         """Reset database - useful for testing."""
         self.users.clear()
-        self.products.clear()
+        self.products = {}
         self.carts.clear()
         self.orders.clear()
         self.categories.clear()
         self.reviews.clear()
-        self._user_id_counter = 1
-        self._product_id_counter = 1
-        self._order_id_counter = 1
-        self._category_id_counter = 1
-        self._review_id_counter = 1
+        self.order_exports.clear()
+        self.aggregated_orders.clear()
+        self.stock.reset()
+        self.order_index.reset()
+        self.facts.reset()
+        self.names.reset()
+        self.search.reset()
+        self.copurchases.reset()
+        self.events.reset()
+        self.revoked_tokens.reset()
+        self._user_ids.reset()
+        self._product_ids.reset()
+        self._order_ids.reset()
+        self._category_ids.reset()
+        self._review_ids.reset()
+
+
+class ShardedDatabase(Database):
+    """
+    Database with carts, orders and reviews partitioned by user id.
+
+    See app.database.shards. Order and review ids are allocated in the
+    user's shard, so pass the user id to get_next_order_id/get_next_review_id.
+    """
+
+    def __init__(self, shards: int):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        if {"order", "review"} & set(settings.TIME_ORDERED_IDS):
+            raise ValueError("Sharded order and review ids are shard-prefixed, not time-ordered")
+        super().__init__()
+        self.shards = [
+            Shard(
+                index,
+                IdAllocator(f"order.{index}", settings.ID_BLOCK_SIZE, store=self.id_store),
+                IdAllocator(f"review.{index}", settings.ID_BLOCK_SIZE, store=self.id_store),
+                settings.SNAPSHOT_PAGES,
+            )
+            for index in range(shards)
+        ]
+        self.carts = ShardedTable([shard.carts for shard in self.shards], by_id=False)
+        self.orders = ShardedTable([shard.orders for shard in self.shards], by_id=True)
+        self.reviews = ShardedTable([shard.reviews for shard in self.shards], by_id=True)
+
+    def snapshot(self) -> DatabaseSnapshot:
+        # Every shard lock at once (in index order), for a cut consistent across shards
+        locks = [shard.lock for shard in self.shards]
+        for lock in locks:
+            lock.acquire()
+        try:
+            orders = [shard.orders.snapshot() for shard in self.shards]
+            reviews = [shard.reviews.snapshot() for shard in self.shards]
+            facts = self.facts.columns()
+            aggregated = frozenset(self.aggregated_orders)
+            version = self.copurchases.version
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        return DatabaseSnapshot(
+            ShardedTable(orders, by_id=True),
+            ShardedTable(reviews, by_id=True),
+            facts,
+            pinned=orders + reviews,
+            aggregated_orders=aggregated,
+            copurchases_version=version,
+        )
+
+    def shard_for_user(self, user_id: int) -> Shard:
+        return self.shards[user_id % len(self.shards)]
+
+    def user_lock(self, user_id: int) -> threading.RLock:
+        return self.shard_for_user(user_id).lock
+
+    def get_next_order_id(self, user_id: int = 0) -> int:
+        return self.shard_for_user(user_id).next_order_id()
+
+    def get_next_review_id(self, user_id: int = 0) -> int:
+        return self.shard_for_user(user_id).next_review_id()
+
+    def reset(self):
+        super().reset()
+        for shard in self.shards:
+            shard.reset_ids()
+
+
+def create_database(shards: int) -> Database:
+    """The unsharded database, or a ShardedDatabase for shards > 1."""
+    return ShardedDatabase(shards) if shards > 1 else Database()
 
 
-db = Database()
+db = create_database(settings.DB_SHARDS)
@@ -0,0 +1,270 @@
+"""
+Change stream of entity mutations.
+
+Services append an event for every change they make: product, order, cart,
+category, review and user creations, updates and deletions. Events get a
+global sequence number and are kept in a fixed-size ring buffer. Consumers
+tail the log from a cursor (the last sequence number they saw), either
+in-process through a ``Subscription`` or over HTTP via ``GET /events``.
+
+With a segment directory configured, every event is also appended to JSON
+lines segment files, so consumers whose cursor fell out of the ring buffer
+can still catch up, and sequence numbers survive restarts.
+"""
+
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TextIO
+
+SEGMENT_PATTERN = "events-*.jsonl"
+
+
+@dataclass
+class Event:
+    """One entity mutation."""
+
+    seq: int
+    entity: str
+    action: str
+    entity_id: int
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = 0.0
+
+    @property
+    def type(self) -> str:
+        return f"{self.entity}.{self.action}"
+
+    def to_dict(self) -> dict:
+        return {
+            "seq": self.seq,
+            "type": self.type,
+            "entity_id": self.entity_id,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Event":
+        entity, _, action = data["type"].partition(".")
+        return cls(
+            data["seq"], entity, action, data["entity_id"], data["data"], data["timestamp"]
+        )
+
+
+class Subscription:
+    """A consumer's cursor into the log."""
+
+    def __init__(self, log: "EventLog", name: str, cursor: int):
+        self.log = log
+        self.name = name
+        self.cursor = cursor
+        self.missed = 0
+
+    @property
+    def lag(self) -> int:
+        return self.log.last_seq - self.cursor
+
+    def poll(self, limit: int = 1000) -> List[Event]:
+        """Events after the cursor, advancing it past them."""
+        events = self.log.read(self.cursor, limit)
+        if events:
+            self.missed += events[0].seq - self.cursor - 1
+            self.cursor = events[-1].seq
+        return events
+
+    async def next(self, timeout: float, limit: int = 1000) -> List[Event]:
+        """Like poll, but waits up to timeout seconds for new events."""
+        events = self.poll(limit)
+        if not events and await self.log.wait(self.cursor, timeout):
+            events = self.poll(limit)
+        return events
+
+    def close(self):
+        self.log._subscriptions.pop(id(self), None)
+
+
+class EventLog:
+    """Sequence-numbered ring buffer of events with optional segment files."""
+
+    def __init__(
+        self,
+        capacity: int = 65_536,
+        segment_dir: Optional[str] = None,
+        segment_events: int = 100_000,
+    ):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.segment_dir = segment_dir
+        self.segment_events = segment_events
+        self._lock = threading.Lock()
+        self._ring: List[Optional[Event]] = [None] * capacity
+        self._last_seq = 0
+        self._ring_start = 1
+        self._segment: Optional[TextIO] = None
+        self._segment_count = 0
+        self._waiters: Dict[asyncio.Future, asyncio.AbstractEventLoop] = {}
+        self._subscriptions: Dict[int, Subscription] = {}
+        if segment_dir:
+            os.makedirs(segment_dir, exist_ok=True)
+            self._last_seq = self._resume_seq()
+            self._ring_start = self._last_seq + 1
+
+    @property
+    def last_seq(self) -> int:
+        return self._last_seq
+
+    @property
+    def oldest_seq(self) -> int:
+        """Sequence number of the oldest event still in the ring buffer."""
+        return max(self._ring_start, self._last_seq - self.capacity + 1)
+
+    def append(
+        self, entity: str, action: str, entity_id: int, data: Optional[dict] = None
+    ) -> Event:
+        """Record a mutation and wake consumers waiting for new events."""
+        with self._lock:
+            self._last_seq += 1
+            event = Event(
+                self._last_seq, entity, action, entity_id, data or {}, time.time()
+            )
+            self._ring[event.seq % self.capacity] = event
+            if self.segment_dir:
+                self._write_segment(event)
+            waiters, self._waiters = self._waiters, {}
+        if waiters:
+            # One cross-thread wakeup per event loop, not per waiter
+            by_loop: Dict[asyncio.AbstractEventLoop, List[asyncio.Future]] = {}
+            for future, loop in waiters.items():
+                by_loop.setdefault(loop, []).append(future)
+            for loop, futures in by_loop.items():
+                loop.call_soon_threadsafe(_wake, futures)
+        return event
+
+    def read(self, after: int, limit: int = 1000) -> List[Event]:
+        """
+        Up to limit events with a sequence number greater than after.
+
+        Events that already left the ring buffer are read from the segment
+        files, or skipped when there are none.
+        """
+        with self._lock:
+            first = max(after + 1, self.oldest_seq)
+            if first > after + 1 and self.segment_dir:
+                if self._segment:
+                    self._segment.flush()
+            else:
+                end = min(self._last_seq, first + limit - 1)
+                return [self._ring[seq % self.capacity] for seq in range(first, end + 1)]
+        return self._read_segments(after, limit)
+
+    def subscribe(self, name: str, after: Optional[int] = None) -> Subscription:
+        """Start tailing the log after the given cursor, by default from now."""
+        subscription = Subscription(self, name, self._last_seq if after is None else after)
+        self._subscriptions[id(subscription)] = subscription
+        return subscription
+
+    async def wait(self, after: int, timeout: float) -> bool:
+        """Wait up to timeout seconds for an event after the cursor."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._last_seq > after:
+                return True
+            self._waiters[future] = loop
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.pop(future, None)
+
+    def stats(self) -> dict:
+        return {
+            "last_seq": self._last_seq,
+            "oldest_seq": self.oldest_seq,
+            "capacity": self.capacity,
+            "waiters": len(self._waiters),
+            "subscribers": {
+                subscription.name: subscription.lag
+                for subscription in list(self._subscriptions.values())
+            },
+        }
+
+    def close(self):
+        with self._lock:
+            if self._segment:
+                self._segment.close()
+                self._segment = None
+
+    def reset(self):
+        """Drop all events, including segment files."""
+        self.close()
+        with self._lock:
+            self._ring = [None] * self.capacity
+            self._last_seq = 0
+            self._ring_start = 1
+            self._segment_count = 0
+            if self.segment_dir:
+                for path in self._segment_paths():
+                    os.remove(path)
+
+    def _segment_paths(self) -> List[str]:
+        # Names embed the zero-padded first sequence number, so they sort by it
+        return sorted(glob.glob(os.path.join(self.segment_dir, SEGMENT_PATTERN)))
+
+    def _write_segment(self, event: Event):
+        if self._segment is None or self._segment_count >= self.segment_events:
+            if self._segment:
+                self._segment.close()
+            path = os.path.join(self.segment_dir, f"events-{event.seq:020d}.jsonl")
+            self._segment = open(path, "a", encoding="utf-8")
+            self._segment_count = 0
+        self._segment.write(json.dumps(event.to_dict(), separators=(",", ":")) + "\n")
+        self._segment_count += 1
+
+    def _read_segments(self, after: int, limit: int) -> List[Event]:
+        paths = self._segment_paths()
+        firsts = [_segment_first_seq(path) for path in paths]
+        events: List[Event] = []
+        for i, path in enumerate(paths):
+            if i + 1 < len(firsts) and firsts[i + 1] <= after + 1:
+                continue
+            with open(path, encoding="utf-8") as segment:
+                for line in segment:
+                    if not line.endswith("\n"):
+                        break  # partially written
+                    event = Event.from_dict(json.loads(line))
+                    if event.seq > after:
+                        events.append(event)
+                        if len(events) == limit:
+                            return events
+        return events
+
+    def _resume_seq(self) -> int:
+        paths = self._segment_paths()
+        if not paths:
+            return 0
+        last = _segment_first_seq(paths[-1]) - 1
+        with open(paths[-1], encoding="utf-8") as segment:
+            for line in segment:
+                if line.endswith("\n"):
+                    last = json.loads(line)["seq"]
+        return last
+
+
+def _segment_first_seq(path: str) -> int:
+    return int(os.path.basename(path)[len("events-"):-len(".jsonl")])
+
+
+def _wake(futures: List[asyncio.Future]):
+    for future in futures:
+        if not future.done():
+            future.set_result(None)
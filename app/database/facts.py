@@ -0,0 +1,89 @@
+"""
+Columnar, append-only fact table of order items for analytics.
+
+Every order line becomes one row; cancelling an order appends the same rows
+with negated quantities, so rows are never updated in place and a report is
+just a vectorized pass over the columns.
+"""
+
+import threading
+from typing import Dict
+
+import numpy as np
+
+COLUMNS = {
+    "timestamp": np.float64,   # order created_at, seconds since epoch
+    "order_id": np.int64,
+    "user_id": np.int64,
+    "product_id": np.int64,
+    "quantity": np.int64,      # negative for cancellation reversals
+    "unit_price": np.float64,
+}
+
+
+class OrderItemFacts:
+    """Growable NumPy columns, doubled in capacity when full."""
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int):
+        capacity = len(self._columns["timestamp"])
+        needed = self._size + extra
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def record_order(self, order, reverse: bool = False):
+        """Append one row per order item (negated for a cancellation)."""
+        items = order.items
+        if not items:
+            return
+        sign = -1 if reverse else 1
+        timestamp = order.created_at.timestamp()
+        with self._lock:
+            self._reserve(len(items))
+            start, end = self._size, self._size + len(items)
+            columns = self._columns
+            columns["timestamp"][start:end] = timestamp
+            columns["order_id"][start:end] = order.id
+            columns["user_id"][start:end] = order.user_id
+            columns["product_id"][start:end] = [item.product_id for item in items]
+            columns["quantity"][start:end] = [sign * item.quantity for item in items]
+            columns["unit_price"][start:end] = [item.unit_price for item in items]
+            self._size = end
+
+    def append_columns(self, **values: np.ndarray):
+        """Bulk-append already columnar data (used for loading and benchmarks)."""
+        count = len(values["timestamp"])
+        with self._lock:
+            self._reserve(count)
+            start, end = self._size, self._size + count
+            for name in COLUMNS:
+                self._columns[name][start:end] = values[name]
+            self._size = end
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Read-only views of the filled part of every column."""
+        with self._lock:
+            size = self._size
+            views = {name: column[:size] for name, column in self._columns.items()}
+        for view in views.values():
+            view.flags.writeable = False
+        return views
+
+    def reset(self):
+        with self._lock:
+            self._size = 0
@@ -0,0 +1,178 @@
+"""
+Id allocation for the in-memory database.
+
+IdAllocator hands out sequential ids. Each thread takes a block of
+``block_size`` ids under the allocator's lock and then numbers from it
+without locking, so concurrent inserts never share a counter and only
+meet once per block. Ids are unique but, across threads, not in
+allocation order; a single thread (the event loop) still gets 1, 2, 3...
+
+With an IdStore, the allocator records a high-water mark before handing
+out ids below it, ``reserve`` ids at a time. After a restart it continues
+from the mark, skipping what the old process reserved but never used, so
+ids kept elsewhere (catalog files, event log segments) are never reused.
+
+SnowflakeIds are time-ordered 63-bit ids: milliseconds since EPOCH_MS,
+a worker id and a per-millisecond sequence,
+
+    id = (ms << 22) | (worker << 12) | sequence
+
+so they sort by creation time, e.g. for keyset pagination. They exceed
+2**53 and lose precision as JavaScript numbers.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+
+class IdStore:
+    """High-water marks of id allocators, kept in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._marks: Dict[str, int] = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path):
+            with open(path) as file:
+                self._marks = json.load(file)
+
+    def get(self, name: str, default: int = 0) -> int:
+        return self._marks.get(name, default)
+
+    def set(self, name: str, mark: int):
+        with self._lock:
+            self._marks[name] = mark
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as file:
+                json.dump(self._marks, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+
+
+class IdAllocator:
+    """Sequential ids, handed to each thread in blocks."""
+
+    def __init__(
+        self,
+        name: str,
+        block_size: int = 64,
+        start: int = 1,
+        store: Optional[IdStore] = None,
+        reserve: int = 10_000,
+    ):
+        if block_size < 1:
+            raise ValueError("block_size must be >= 1")
+        self.name = name
+        self.block_size = block_size
+        self.start = start
+        self.store = store
+        self.reserve = max(reserve, block_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next = self._mark = store.get(name, start) if store else start
+        self.blocks = 0
+
+    def next_id(self) -> int:
+        try:
+            return next(self._local.ids)
+        except (AttributeError, StopIteration):
+            return self._next_block()
+
+    def _next_block(self) -> int:
+        local = self._local
+        with self._lock:
+            first = self._next
+            self._next = end = first + self.block_size
+            if self.store is not None and end > self._mark:
+                self._mark = end + self.reserve
+                self.store.set(self.name, self._mark)
+            self.blocks += 1
+        local.ids = iter(range(first + 1, end))
+        return first
+
+    def advance_to(self, next_id: int):
+        """Never hand out ids below next_id, e.g. after loading stored rows."""
+        with self._lock:
+            if next_id > self._next:
+                self._next = next_id
+                # Blocks taken before this may hold ids below next_id
+                self._local = threading.local()
+                if self.store is not None and next_id > self._mark:
+                    self._mark = next_id + self.reserve
+                    self.store.set(self.name, self._mark)
+
+    def reset(self):
+        """Start again from start, also in the store."""
+        with self._lock:
+            self._next = self._mark = self.start
+            self._local = threading.local()
+            if self.store is not None:
+                self.store.set(self.name, self.start)
+
+    def stats(self) -> dict:
+        return {"next_block": self._next, "blocks": self.blocks, "high_water": self._mark}
+
+
+class SnowflakeIds:
+    """Time-ordered 63-bit ids: milliseconds, worker id and sequence."""
+
+    def __init__(self, worker_id: int = 0, clock=time.time):
+        if not 0 <= worker_id <= MAX_WORKER:
+            raise ValueError(f"worker_id must be in 0..{MAX_WORKER}")
+        self.worker_id = worker_id
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_id(self) -> int:
+        with self._lock:
+            ms = int(self._clock() * 1000) - EPOCH_MS
+            if ms > self._last_ms:
+                self._last_ms = ms
+                self._sequence = 0
+            else:
+                # Same millisecond, or the clock went back: keep counting
+                # from the last one so ids stay unique and increasing
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+            return (
+                (self._last_ms << (WORKER_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+    def advance_to(self, next_id: int):
+        """Never hand out ids below next_id."""
+        with self._lock:
+            last_ms = next_id >> (WORKER_BITS + SEQUENCE_BITS)
+            if last_ms > self._last_ms:
+                self._last_ms, self._sequence = last_ms, MAX_SEQUENCE
+
+    def reset(self):
+        with self._lock:
+            self._last_ms = 0
+            self._sequence = 0
+
+    @staticmethod
+    def created_at(snowflake_id: int) -> datetime:
+        """When an id was generated, to the millisecond."""
+        ms = (snowflake_id >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS
+        return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+    def stats(self) -> dict:
+        return {"worker_id": self.worker_id, "last_ms": self._last_ms}
@@ -0,0 +1,128 @@
+"""
+Secondary indexes over orders.
+
+Kept up to date by ``OrderService`` so per-user lookups and admin queries
+don't have to scan every order in the database.
+"""
+
+import bisect
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class OrderIndex:
+    """
+    Order indexes maintained at order creation, status change and cancellation.
+
+    - ``by_user``: user_id -> order ids in creation order (append-only)
+    - ``by_product``: product_id -> ids of orders containing the product
+    - ``by_status``: status -> ids of orders currently in that status
+    - created_at: order ids sorted by creation time, searchable by range
+    - purchases: (user_id, product_id) -> number of live orders containing it
+    """
+
+    def __init__(self):
+        self.by_user: Dict[int, List[int]] = {}
+        self.by_product: Dict[int, List[int]] = {}
+        self.by_status: Dict[str, Set[int]] = {}
+        self._created_at: List[datetime] = []
+        self._created_ids: List[int] = []
+        self._purchases: Dict[Tuple[int, int], int] = {}
+        # Orders of different users may be written concurrently (sharded db)
+        self._lock = threading.Lock()
+
+    def add(self, order):
+        """Index a newly created order."""
+        with self._lock:
+            self._add(order)
+
+    def _add(self, order):
+        self.by_user.setdefault(order.user_id, []).append(order.id)
+        self.by_status.setdefault(order.status, set()).add(order.id)
+
+        if not self._created_at or order.created_at >= self._created_at[-1]:
+            self._created_at.append(order.created_at)
+            self._created_ids.append(order.id)
+        else:
+            position = bisect.bisect_right(self._created_at, order.created_at)
+            self._created_at.insert(position, order.created_at)
+            self._created_ids.insert(position, order.id)
+
+        for item in order.items:
+            self.by_product.setdefault(item.product_id, []).append(order.id)
+            key = (order.user_id, item.product_id)
+            self._purchases[key] = self._purchases.get(key, 0) + 1
+
+    def set_status(self, order, old_status):
+        """Move an order between status buckets after order.status changed."""
+        with self._lock:
+            self.by_status.get(old_status, set()).discard(order.id)
+            self.by_status.setdefault(order.status, set()).add(order.id)
+
+    def _created_range(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect.bisect_left(self._created_at, start)
+        hi = (
+            len(self._created_at) if end is None
+            else bisect.bisect_right(self._created_at, end)
+        )
+        return lo, max(lo, hi)
+
+    def created_between(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> List[int]:
+        """Ids of orders created in [start, end], oldest first."""
+        with self._lock:
+            lo, hi = self._created_range(start, end)
+            return self._created_ids[lo:hi]
+
+    def count_created_between(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> int:
+        """Number of orders created in [start, end] without building the list."""
+        lo, hi = self._created_range(start, end)
+        return hi - lo
+
+    def cancel(self, order):
+        """Drop a cancelled order's purchases. It stays in the user's history."""
+        with self._lock:
+            for item in order.items:
+                key = (order.user_id, item.product_id)
+                count = self._purchases.get(key, 0) - 1
+                if count > 0:
+                    self._purchases[key] = count
+                else:
+                    self._purchases.pop(key, None)
+
+    def has_purchased(self, user_id: int, product_id: int) -> bool:
+        return (user_id, product_id) in self._purchases
+
+    def user_order_ids(self, user_id: int) -> List[int]:
+        """All of a user's order ids, newest first."""
+        return self.by_user.get(user_id, [])[::-1]
+
+    def user_order_page(
+        self, user_id: int, cursor: Optional[int], limit: int
+    ) -> Tuple[List[int], Optional[int]]:
+        """
+        One page of a user's order ids, newest first.
+
+        The cursor is a position in the user's append-only order list, so it
+        stays valid while new orders arrive. Returns (ids, next_cursor).
+        """
+        ids = self.by_user.get(user_id, [])
+        end = len(ids) if cursor is None else max(0, min(cursor, len(ids)))
+        start = max(0, end - limit)
+        next_cursor = start if start > 0 else None
+        return ids[start:end][::-1], next_cursor
+
+    def reset(self):
+        with self._lock:
+            self.by_user.clear()
+            self.by_product.clear()
+            self.by_status.clear()
+            self._created_at.clear()
+            self._created_ids.clear()
+            self._purchases.clear()
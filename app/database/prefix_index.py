@@ -0,0 +1,171 @@
+"""
+Prefix index over product and category names for search-as-you-type.
+"""
+
+import bisect
+import heapq
+import threading
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+# Prefixes matching more entries than this are answered from a cache
+SCAN_LIMIT = 256
+CACHED_TOP = 20
+
+
+def normalize(name: str) -> str:
+    """Case- and whitespace-insensitive form of a name."""
+    return " ".join(name.casefold().split())
+
+
+def product_ref(product_id: int) -> int:
+    return product_id
+
+
+def category_ref(category_id: int) -> int:
+    return -category_id
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalized names with popularity scores.
+
+    Entries are kept in two parallel arrays sorted by (name, ref), where a ref
+    is a product id or a negated category id. A prefix query is two bisects
+    plus a top-k over the matching range. Short prefixes that match large
+    ranges keep a cached top list, patched in place as entries are added or
+    gain popularity and dropped only when one of its members is removed or
+    loses popularity.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._refs = array("q")
+        self._key_of: Dict[int, str] = {}
+        self._scores: Dict[int, float] = {}
+        self._top_cache: Dict[str, List[Tuple[float, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _position(self, key: str, ref: int) -> int:
+        position = bisect.bisect_left(self._keys, key)
+        while self._refs[position] != ref:
+            position += 1
+        return position
+
+    def _cache_offer(self, key: str, ref: int, score: float):
+        """Entry was added or gained score: patch the cached top lists above it."""
+        for length in range(len(key) + 1):
+            top = self._top_cache.get(key[:length])
+            if top is None:
+                continue
+            top = [entry for entry in top if entry[1] != ref]
+            top.append((score, ref))
+            top.sort(key=lambda entry: (-entry[0], entry[1]))
+            self._top_cache[key[:length]] = top[:CACHED_TOP]
+
+    def _cache_discard(self, key: str, ref: int):
+        """Entry was removed or lost score: drop cached lists that contain it."""
+        for length in range(len(key) + 1):
+            top = self._top_cache.get(key[:length])
+            if top is not None and any(entry[1] == ref for entry in top):
+                del self._top_cache[key[:length]]
+
+    def add(self, ref: int, name: str, score: float = 0.0):
+        """Index a name. Re-adding a ref replaces its name."""
+        key = normalize(name)
+        with self._lock:
+            if ref in self._key_of:
+                self._remove(ref)
+            lo = bisect.bisect_left(self._keys, key)
+            hi = bisect.bisect_right(self._keys, key)
+            position = lo + bisect.bisect_left(self._refs[lo:hi], ref)
+            self._keys.insert(position, key)
+            self._refs.insert(position, ref)
+            self._key_of[ref] = key
+            self._scores[ref] = score
+            self._cache_offer(key, ref, score)
+
+    def rename(self, ref: int, name: str):
+        """Change the indexed name, keeping the score."""
+        self.add(ref, name, self._scores.get(ref, 0.0))
+
+    def remove(self, ref: int):
+        with self._lock:
+            if ref in self._key_of:
+                self._remove(ref)
+
+    def _remove(self, ref: int):
+        key = self._key_of.pop(ref)
+        position = self._position(key, ref)
+        del self._keys[position]
+        del self._refs[position]
+        self._scores.pop(ref, None)
+        self._cache_discard(key, ref)
+
+    def bump(self, ref: int, delta: float):
+        """Adjust an entry's popularity score."""
+        with self._lock:
+            key = self._key_of.get(ref)
+            if key is None:
+                return
+            score = self._scores[ref] + delta
+            self._scores[ref] = score
+            if delta < 0:
+                self._cache_discard(key, ref)
+            else:
+                self._cache_offer(key, ref, score)
+
+    def find(self, name: str) -> List[int]:
+        """Refs whose name matches exactly (after normalization)."""
+        key = normalize(name)
+        lo = bisect.bisect_left(self._keys, key)
+        hi = bisect.bisect_right(self._keys, key)
+        return list(self._refs[lo:hi])
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Most popular (ref, score) entries whose name starts with prefix."""
+        key = normalize(prefix)
+        cached = self._top_cache.get(key)
+        if cached is not None and limit <= CACHED_TOP:
+            return [(ref, score) for score, ref in cached[:limit]]
+
+        with self._lock:
+            lo = bisect.bisect_left(self._keys, key)
+            hi = bisect.bisect_left(self._keys, key + "\U0010ffff", lo)
+            scores = self._scores
+            wanted = limit if hi - lo <= SCAN_LIMIT else max(limit, CACHED_TOP)
+            top = heapq.nlargest(
+                wanted,
+                ((scores[ref], ref) for ref in self._refs[lo:hi]),
+                key=lambda entry: (entry[0], -entry[1]),
+            )
+            if hi - lo > SCAN_LIMIT:
+                self._top_cache[key] = top
+        return [(ref, score) for score, ref in top[:limit]]
+
+    def load(self, entries: Iterable[Tuple[int, str, float]]):
+        """Replace the index with (ref, name, score) entries, sorted once."""
+        rows = sorted((normalize(name), ref, score) for ref, name, score in entries)
+        with self._lock:
+            self._keys = [key for key, _, _ in rows]
+            self._refs = array("q", (ref for _, ref, _ in rows))
+            self._key_of = {ref: key for key, ref, _ in rows}
+            self._scores = {ref: score for _, ref, score in rows}
+            self._top_cache.clear()
+        self._warm({key[:length] for key in self._keys for length in (1, 2, 3, 4)})
+
+    def _warm(self, prefixes):
+        """Precompute cached top lists so the first short query is cheap."""
+        for prefix in prefixes:
+            self.suggest(prefix, CACHED_TOP)
+
+    def reset(self):
+        with self._lock:
+            self._keys.clear()
+            self._refs = array("q")
+            self._key_of.clear()
+            self._scores.clear()
+            self._top_cache.clear()
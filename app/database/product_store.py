@@ -0,0 +1,143 @@
+"""
+Product mapping backed by a memory-mapped catalog file.
+"""
+
+import threading
+import weakref
+from typing import Any, Dict, Iterator, MutableMapping, Optional, Set
+
+from app.database.catalog_file import CatalogFile
+from app.models.product import Product
+
+
+def _mapped_field(name: str, read):
+    def get(self):
+        overrides = self.__dict__
+        if name in overrides:
+            return overrides[name]
+        return read(self._file, self._row)
+
+    def set(self, value):
+        self.__dict__[name] = value
+        self._store._modified(self)
+
+    return property(get, set)
+
+
+class MappedProduct(Product):
+    """
+    A Product whose fields are read from a catalog file on access.
+
+    Assigning a field stores it on the instance (copy-on-write) and pins the
+    instance in the store's overlay, so later lookups see the change.
+    """
+
+    id = _mapped_field("id", lambda file, row: file.ids[row])
+    name = _mapped_field("name", CatalogFile.name)
+    description = _mapped_field("description", CatalogFile.description)
+    price = _mapped_field("price", lambda file, row: file.prices[row])
+    stock = _mapped_field("stock", lambda file, row: file.stocks[row])
+    category = _mapped_field("category", CatalogFile.category)
+    created_at = _mapped_field("created_at", CatalogFile.created)
+    is_hot = _mapped_field("is_hot", lambda file, row: bool(file.is_hot[row]))
+
+    def __init__(self, store: "ProductStore", file: CatalogFile, row: int):
+        object.__setattr__(self, "_store", store)
+        object.__setattr__(self, "_file", file)
+        object.__setattr__(self, "_row", row)
+
+
+class ProductStore(MutableMapping):
+    """
+    id -> Product mapping over a catalog file plus an in-memory overlay.
+
+    Rows of the file are never copied into memory: lookups hand out
+    MappedProduct views. Products created or modified since the file was
+    written live in the overlay, and deleted rows are tombstoned. While a
+    view is referenced, lookups of the same id return that same object, so
+    in-place updates (such as stock reservations under a lock) are never
+    split across two copies.
+    """
+
+    def __init__(self, file: Optional[CatalogFile] = None):
+        self._file = file
+        self._overlay: Dict[int, Product] = {}
+        self._deleted: Set[int] = set()
+        self._added = 0
+        self._views: "weakref.WeakValueDictionary[int, MappedProduct]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _row(self, product_id: int) -> Optional[int]:
+        if self._file is None or product_id in self._deleted:
+            return None
+        return self._file.position(product_id)
+
+    def _in_file(self, product_id: int) -> bool:
+        return self._file is not None and self._file.position(product_id) is not None
+
+    def _modified(self, product: MappedProduct):
+        self._overlay[product.id] = product
+
+    def __getitem__(self, product_id: int) -> Product:
+        product = self.get(product_id)
+        if product is None:
+            raise KeyError(product_id)
+        return product
+
+    def get(self, product_id: int, default: Any = None) -> Any:
+        product = self._overlay.get(product_id)
+        if product is not None:
+            return product
+        row = self._row(product_id)
+        if row is None:
+            return default
+        with self._lock:
+            product = self._views.get(product_id)
+            if product is None:
+                product = self._views[product_id] = MappedProduct(self, self._file, row)
+        return product
+
+    def __setitem__(self, product_id: int, product: Product):
+        with self._lock:
+            if product_id not in self:
+                self._added += not self._in_file(product_id)
+            self._deleted.discard(product_id)
+            self._overlay[product_id] = product
+
+    def __delitem__(self, product_id: int):
+        with self._lock:
+            if product_id not in self:
+                raise KeyError(product_id)
+            self._overlay.pop(product_id, None)
+            self._views.pop(product_id, None)
+            if self._in_file(product_id):
+                self._deleted.add(product_id)
+            else:
+                self._added -= 1
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._overlay or self._row(product_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        if self._file is not None:
+            deleted = self._deleted
+            for product_id in self._file.ids:
+                if product_id not in deleted:
+                    yield product_id
+        for product_id in list(self._overlay):
+            if not self._in_file(product_id):
+                yield product_id
+
+    def __len__(self) -> int:
+        file_rows = len(self._file) if self._file is not None else 0
+        return file_rows - len(self._deleted) + self._added
+
+    def clear(self):
+        with self._lock:
+            self._file = None
+            self._overlay.clear()
+            self._deleted.clear()
+            self._views.clear()
+            self._added = 0
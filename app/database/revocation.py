@@ -0,0 +1,125 @@
+"""
+Revoked token ids (JWT ``jti`` claims).
+
+Every authenticated request asks whether its token was revoked, and almost
+never is. A Bloom filter answers "definitely not" without touching the
+exact set; only its rare positives, true or false, are checked against the
+exact jti -> expiry map.
+
+Revoked tokens only need remembering until they expire. Expired entries are
+pruned at most every prune_interval seconds, and since a Bloom filter
+can't forget, the filter is rebuilt from the remaining entries each time.
+It is also rebuilt larger when it fills up, to keep the error rate.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class BloomFilter:
+    """Set membership with no false negatives and about error_rate false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, key: str) -> Tuple[int, int]:
+        # Double hashing: k positions from two hashes of the key. str hashes
+        # are salted per process, which is fine for a filter kept in memory.
+        return hash(key) % self.size, hash((key, self.size)) | 1
+
+    def add(self, key: str):
+        bits, size = self._bits, self.size
+        position, step = self._hashes(key)
+        for _ in range(self.hashes):
+            bits[position >> 3] |= 1 << (position & 7)
+            position = (position + step) % size
+
+    def __contains__(self, key: str) -> bool:
+        bits, size = self._bits, self.size
+        position, step = self._hashes(key)
+        for _ in range(self.hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position = (position + step) % size
+        return True
+
+
+class RevocationList:
+    """Revoked token ids until they expire, behind a Bloom filter."""
+
+    def __init__(
+        self,
+        capacity: int = 10_000,
+        error_rate: float = 0.001,
+        prune_interval: float = 60.0,
+    ):
+        self.initial_capacity = capacity
+        self.error_rate = error_rate
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._expiry: Dict[str, float] = {}
+        self._filter = BloomFilter(capacity, error_rate)
+        self._next_prune = time.time() + prune_interval
+        self.checks = 0
+        self.filter_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def revoke(self, jti: str, expires_at: float, now: Optional[float] = None):
+        """Deny a token id until its expiry timestamp."""
+        now = time.time() if now is None else now
+        if expires_at <= now:
+            return  # Already unusable
+        with self._lock:
+            self._expiry[jti] = expires_at
+            if now >= self._next_prune or len(self._expiry) > self._filter.capacity:
+                self._prune(now)
+            else:
+                self._filter.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        self.checks += 1
+        if not self._expiry or jti not in self._filter:
+            return False
+        self.filter_hits += 1
+        return jti in self._expiry
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget expired token ids. Returns how many were dropped."""
+        with self._lock:
+            return self._prune(time.time() if now is None else now)
+
+    def _prune(self, now: float) -> int:
+        before = len(self._expiry)
+        self._expiry = {
+            jti: expires_at for jti, expires_at in self._expiry.items() if expires_at > now
+        }
+        capacity = self.initial_capacity
+        while capacity < 2 * len(self._expiry):
+            capacity *= 2
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._expiry:
+            bloom.add(jti)
+        self._filter = bloom
+        self._next_prune = now + self.prune_interval
+        return before - len(self._expiry)
+
+    def reset(self):
+        with self._lock:
+            self._expiry = {}
+            self._filter = BloomFilter(self.initial_capacity, self.error_rate)
+            self._next_prune = time.time() + self.prune_interval
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._expiry),
+            "filter_capacity": self._filter.capacity,
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+        }
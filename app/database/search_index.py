@@ -0,0 +1,194 @@
+"""
+Token index over product names for (typo-tolerant) search.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def deletions(token: str, depth: int) -> Set[str]:
+    """The token and every string made by deleting up to depth characters."""
+    variants = {token}
+    frontier = {token}
+    for _ in range(depth):
+        frontier = {
+            variant[:i] + variant[i + 1:]
+            for variant in frontier
+            for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def max_edits(token: str) -> int:
+    """Typos tolerated for a query token of this length."""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 7:
+        return 1
+    return 2
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """
+    Edit distance (with adjacent transpositions) if it is <= limit, else None.
+
+    Only the diagonal band of width 2 * limit + 1 is computed, and the loop
+    stops as soon as a whole row of the band exceeds the limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if a == b:
+        return 0
+    over = limit + 1
+    width = len(b) + 1
+    before_previous: List[int] = []
+    previous = [j if j <= limit else over for j in range(width)]
+    for i in range(1, len(a) + 1):
+        current = [over] * width
+        current[0] = i if i <= limit else over
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before_previous[j - 2] + 1)
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return None
+        before_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class SearchIndex:
+    """
+    Inverted index: token -> product ids, plus deletion variant -> token.
+
+    Two tokens within k edits (counting an adjacent transposition as one)
+    always share a variant made by deleting at most k characters from each,
+    so fuzzy lookups use the query token's deletion variants to generate
+    candidates and verify them with a bounded edit distance. Working on
+    the vocabulary rather than on products keeps candidate sets small on
+    large catalogs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens_of: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._variant_tokens: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens_of)
+
+    def add(self, product_id: int, name: str):
+        """Index a product name, replacing any previous one."""
+        with self._lock:
+            self._remove(product_id)
+            tokens = set(tokenize(name))
+            self._tokens_of[product_id] = tokens
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    for variant in deletions(token, max_edits(token)):
+                        self._variant_tokens.setdefault(variant, set()).add(token)
+                postings.add(product_id)
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def _remove(self, product_id: int):
+        for token in self._tokens_of.pop(product_id, ()):
+            postings = self._postings[token]
+            postings.discard(product_id)
+            if postings:
+                continue
+            del self._postings[token]
+            for variant in deletions(token, max_edits(token)):
+                bucket = self._variant_tokens[variant]
+                bucket.discard(token)
+                if not bucket:
+                    del self._variant_tokens[variant]
+
+    def _matching_tokens(self, token: str, fuzzy: bool) -> Dict[str, int]:
+        """Vocabulary tokens matching a query token, with their edit distance."""
+        limit = max_edits(token) if fuzzy else 0
+        if limit == 0:
+            return {token: 0} if token in self._postings else {}
+
+        # Vocabulary tokens are indexed with max_edits(candidate) deletions,
+        # which covers the deletions any match within limit edits needs
+        candidates: Set[str] = set()
+        for variant in deletions(token, limit):
+            candidates.update(self._variant_tokens.get(variant, ()))
+
+        matches = {}
+        for candidate in candidates:
+            distance = bounded_edit_distance(token, candidate, limit)
+            if distance is not None:
+                matches[candidate] = distance
+        return matches
+
+    def search(
+        self, query: str, fuzzy: bool = False, limit: int = 20
+    ) -> List[Tuple[int, int]]:
+        """
+        Products whose names match every query token.
+
+        Returns (product_id, total edit distance), closest first.
+        """
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            matched = []
+            for token in query_tokens:
+                matches = self._matching_tokens(token, fuzzy)
+                if not matches:
+                    return []
+                matched.append(matches)
+
+            # Expand the most selective token; only probe postings for the rest
+            postings = self._postings
+            matched.sort(key=lambda matches: sum(len(postings[t]) for t in matches))
+            results: Dict[int, int] = {}
+            for match, distance in matched[0].items():
+                for product_id in postings[match]:
+                    if distance < results.get(product_id, distance + 1):
+                        results[product_id] = distance
+
+            for matches in matched[1:]:
+                closest_first = sorted(matches.items(), key=lambda entry: entry[1])
+                narrowed = {}
+                for match, distance in closest_first:
+                    # Set intersection runs in C and iterates the smaller side
+                    for product_id in results.keys() & postings[match]:
+                        if product_id not in narrowed:
+                            narrowed[product_id] = results[product_id] + distance
+                results = narrowed
+                if not results:
+                    return []
+
+        ranked = sorted(results.items(), key=lambda entry: (entry[1], entry[0]))
+        return ranked[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._tokens_of.clear()
+            self._postings.clear()
+            self._variant_tokens.clear()
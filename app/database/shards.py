@@ -0,0 +1,115 @@
+"""
+User-sharded storage for carts, orders and reviews.
+
+A ShardedDatabase (see app.database.db) keeps the user-scoped tables in
+``shards`` partitions. User u lives in shard ``u % shards``; each shard has
+its own lock and its own order and review id counters. Ids carry their
+shard in the high bits,
+
+    id = (shard << SHARD_ID_BITS) | local_id
+
+so a lookup by id goes straight to the right shard without a directory.
+Shard 0 numbers from 1 like the unsharded database.
+
+``db.carts``, ``db.orders`` and ``db.reviews`` stay mappings (ShardedTable
+views over the shards), so services and routers use them unchanged. A
+ShardedTable over the shards' table snapshots is a read-only snapshot. The
+catalog, users and the shared indexes stay global; those structures have
+their own locks.
+"""
+
+import threading
+from collections.abc import Mapping, MutableMapping, ValuesView
+from typing import Dict, List
+
+from app.database.ids import IdAllocator
+from app.database.versioned import VersionedTable
+
+SHARD_ID_BITS = 32
+
+
+class Shard:
+    """One partition of the user-scoped tables."""
+
+    def __init__(
+        self, index: int, order_ids: IdAllocator, review_ids: IdAllocator, pages: int = 256
+    ):
+        self.index = index
+        self.lock = threading.RLock()
+        self.carts: Dict[int, object] = {}
+        self.orders = VersionedTable(pages)
+        self.reviews = VersionedTable(pages)
+        self.order_ids = order_ids
+        self.review_ids = review_ids
+        self._id_base = index << SHARD_ID_BITS
+
+    def next_order_id(self) -> int:
+        return self._id_base | self.order_ids.next_id()
+
+    def next_review_id(self) -> int:
+        return self._id_base | self.review_ids.next_id()
+
+    def reset_ids(self):
+        self.order_ids.reset()
+        self.review_ids.reset()
+
+
+class _ShardedValues(ValuesView):
+    def __iter__(self):
+        for table in self._mapping._tables:
+            yield from table.values()
+
+
+class ShardedTable(MutableMapping):
+    """Mapping view of one table across all shards."""
+
+    def __init__(self, tables: List[Mapping], by_id: bool):
+        self._tables = tables
+        # Keys are shard-prefixed ids, or user ids taken modulo the shard count
+        self._by_id = by_id
+
+    def _table(self, key: int):
+        if not self._by_id:
+            return self._tables[key % len(self._tables)]
+        shard = key >> SHARD_ID_BITS
+        return self._tables[shard] if 0 <= shard < len(self._tables) else None
+
+    def get(self, key, default=None):
+        table = self._table(key)
+        return default if table is None else table.get(key, default)
+
+    def __getitem__(self, key):
+        table = self._table(key)
+        if table is None:
+            raise KeyError(key)
+        return table[key]
+
+    def __setitem__(self, key, value):
+        table = self._table(key)
+        if table is None:
+            raise KeyError(f"{key} is not an id of any shard")
+        table[key] = value
+
+    def __delitem__(self, key):
+        table = self._table(key)
+        if table is None:
+            raise KeyError(key)
+        del table[key]
+
+    def __contains__(self, key):
+        table = self._table(key)
+        return table is not None and key in table
+
+    def __iter__(self):
+        for table in self._tables:
+            yield from table
+
+    def __len__(self):
+        return sum(len(table) for table in self._tables)
+
+    def values(self):
+        return _ShardedValues(self)
+
+    def clear(self):
+        for table in self._tables:
+            table.clear()
@@ -0,0 +1,155 @@
+"""
+Memory-mapped catalog snapshots shared between worker processes.
+
+A snapshot file holds named sections of pre-serialized records keyed by an
+integer id. Each section is a sorted int64 key array, a uint64 offset array
+and a blob area, so a lookup is a bisect over the mapped keys and a slice of
+the mapped blob - nothing is parsed or copied when a reader maps a file.
+
+The writer publishes every generation as a new file and then bumps the
+generation number in a small shared control file. Readers compare that
+number on each lookup and remap when it changes.
+"""
+
+import bisect
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Optional, Tuple
+
+MAGIC = b"ECATSNP1"
+HEADER = struct.Struct("<8sQQ")  # magic, generation, section count
+SECTION = struct.Struct("<16sQQ")  # name, offset, record count
+GENERATION = struct.Struct("<Q")
+CONTROL_FILE = "current"
+KEEP_GENERATIONS = 2
+RETRIES = 5
+
+
+def _snapshot_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"catalog-{generation}.bin")
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class CatalogSnapshot:
+    """One read-only, memory-mapped snapshot generation."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, self.generation, count = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        self._sections: Dict[str, Tuple[memoryview, memoryview, int]] = {}
+        for index in range(count):
+            raw_name, offset, records = SECTION.unpack_from(
+                view, HEADER.size + index * SECTION.size
+            )
+            keys_end = offset + records * 8
+            offsets_end = keys_end + (records + 1) * 8
+            self._sections[raw_name.rstrip(b"\0").decode()] = (
+                view[offset:keys_end].cast("q"),
+                view[keys_end:offsets_end].cast("Q"),
+                offsets_end,
+            )
+        self._view = view
+
+    def get(self, section: str, key: int) -> Optional[memoryview]:
+        """The record stored under key, as a view into the mapping."""
+        entry = self._sections.get(section)
+        if entry is None:
+            return None
+        keys, offsets, blob = entry
+        position = bisect.bisect_left(keys, key)
+        if position == len(keys) or keys[position] != key:
+            return None
+        return self._view[blob + offsets[position]:blob + offsets[position + 1]]
+
+    def count(self, section: str) -> int:
+        entry = self._sections.get(section)
+        return len(entry[0]) if entry else 0
+
+
+class SnapshotWriter:
+    """Publishes catalog generations into a directory shared with readers."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        control_path = os.path.join(directory, CONTROL_FILE)
+        if not os.path.exists(control_path):
+            with open(control_path, "wb") as file:
+                file.write(GENERATION.pack(0))
+        with open(control_path, "r+b") as file:
+            self._control = mmap.mmap(file.fileno(), GENERATION.size)
+        (self.generation,) = GENERATION.unpack_from(self._control, 0)
+
+    def publish(self, sections: Dict[str, Iterable[Tuple[int, bytes]]]) -> int:
+        """Write a new generation and make it current. Returns its number."""
+        generation = self.generation + 1
+        path = _snapshot_path(self.directory, generation)
+        temporary = f"{path}.tmp"
+
+        with open(temporary, "wb") as file:
+            table_end = HEADER.size + len(sections) * SECTION.size
+            file.write(b"\0" * table_end)
+            table = []
+            offset = table_end
+            for name, records in sections.items():
+                records = sorted(records, key=lambda record: record[0])
+                keys = struct.pack(f"<{len(records)}q", *(key for key, _ in records))
+                positions = [0]
+                for _, body in records:
+                    positions.append(positions[-1] + len(body))
+                file.write(keys)
+                file.write(struct.pack(f"<{len(positions)}Q", *positions))
+                file.write(b"".join(body for _, body in records))
+                size = len(keys) + len(positions) * 8 + positions[-1]
+                file.write(b"\0" * (_align(size) - size))
+                table.append(SECTION.pack(name.encode(), offset, len(records)))
+                offset += _align(size)
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, generation, len(sections)))
+            file.write(b"".join(table))
+
+        os.replace(temporary, path)
+        GENERATION.pack_into(self._control, 0, generation)
+        self.generation = generation
+
+        # Readers still mapping an unlinked generation keep their pages
+        stale = _snapshot_path(self.directory, generation - KEEP_GENERATIONS)
+        if os.path.exists(stale):
+            os.unlink(stale)
+        return generation
+
+
+class SnapshotReader:
+    """Follows the current generation published by a SnapshotWriter."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, CONTROL_FILE), "rb") as file:
+            self._control = mmap.mmap(file.fileno(), GENERATION.size, access=mmap.ACCESS_READ)
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The newest published snapshot, or None before the first one."""
+        for _ in range(RETRIES):
+            (generation,) = GENERATION.unpack_from(self._control, 0)
+            if generation == 0:
+                return None
+            if self._snapshot is not None and self._snapshot.generation == generation:
+                return self._snapshot
+            try:
+                self._snapshot = CatalogSnapshot(_snapshot_path(self.directory, generation))
+            except FileNotFoundError:
+                # Superseded and pruned between reading the control file and
+                # opening it; the control file already names a newer one.
+                continue
+            return self._snapshot
+        raise FileNotFoundError(f"no readable snapshot in {self.directory}")
@@ -0,0 +1,239 @@
+"""
+Stock accounting for the in-memory database.
+
+All stock mutations go through the ``StockLedger`` so they are serialized
+per product. Regular products share a small table of striped locks; products
+flagged as hot keep their stock in a ``ShardedCounter`` so concurrent
+checkouts don't all queue on one lock.
+"""
+
+import itertools
+import threading
+from typing import Dict, List
+
+_thread_slots = itertools.count()
+_thread_local = threading.local()
+
+
+def _thread_slot() -> int:
+    """Return a small, stable number for the calling thread."""
+    slot = getattr(_thread_local, "slot", None)
+    if slot is None:
+        slot = _thread_local.slot = next(_thread_slots)
+    return slot
+
+
+class CounterRetired(Exception):
+    """The counter was retired; its total has moved elsewhere."""
+
+
+class ShardedCounter:
+    """
+    Non-negative counter split into independently locked shards.
+
+    Each thread works against its own shard. When that shard can't cover a
+    decrement, the counter borrows from the others: it takes every lock in
+    index order and spreads what is left evenly across shards again.
+
+    Once retired, updates raise CounterRetired instead of being applied to a
+    total nobody reads any more.
+    """
+
+    def __init__(self, value: int = 0, shards: int = 8):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._counts: List[int] = [0] * shards
+        self.retired = False
+        self.set(value)
+
+    @property
+    def shards(self) -> int:
+        return len(self._counts)
+
+    def _local_index(self) -> int:
+        return _thread_slot() % len(self._counts)
+
+    def _acquire_all(self):
+        for lock in self._locks:
+            lock.acquire()
+
+    def _release_all(self):
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def _spread(self, total: int):
+        """Distribute total evenly across shards. Caller holds all locks."""
+        per_shard, remainder = divmod(total, len(self._counts))
+        for i in range(len(self._counts)):
+            self._counts[i] = per_shard + (1 if i < remainder else 0)
+
+    def value(self) -> int:
+        """Exact total across all shards."""
+        self._acquire_all()
+        try:
+            return sum(self._counts)
+        finally:
+            self._release_all()
+
+    def approximate_value(self) -> int:
+        """Lock-free total; may miss in-flight updates on other shards."""
+        return sum(self._counts)
+
+    def set(self, value: int):
+        """Replace the total."""
+        if value < 0:
+            raise ValueError("value must be >= 0")
+        self._acquire_all()
+        try:
+            self._check_live()
+            self._spread(value)
+        finally:
+            self._release_all()
+
+    def retire(self) -> int:
+        """Refuse all further updates and return the final total."""
+        self._acquire_all()
+        try:
+            self.retired = True
+            return sum(self._counts)
+        finally:
+            self._release_all()
+
+    def _check_live(self):
+        # Caller holds at least one shard lock, and retire() takes them all
+        if self.retired:
+            raise CounterRetired()
+
+    def add(self, amount: int):
+        """Increase the total by amount."""
+        i = self._local_index()
+        with self._locks[i]:
+            self._check_live()
+            self._counts[i] += amount
+
+    def try_take(self, amount: int) -> bool:
+        """Decrease the total by amount if enough is available."""
+        i = self._local_index()
+        with self._locks[i]:
+            self._check_live()
+            if self._counts[i] >= amount:
+                self._counts[i] -= amount
+                return True
+        return self._borrow(amount)
+
+    def _borrow(self, amount: int) -> bool:
+        """Slow path: take from all shards and rebalance the remainder."""
+        self._acquire_all()
+        try:
+            self._check_live()
+            total = sum(self._counts)
+            if total < amount:
+                return False
+            self._spread(total - amount)
+            return True
+        finally:
+            self._release_all()
+
+
+class StockLedger:
+    """
+    Serializes stock changes for products.
+
+    ``product.stock`` stays the value exposed to the rest of the app. For hot
+    products it is a copy of the sharded total, refreshed via ``refresh()``.
+
+    Hot updates run without the product lock. make_cold retires the counter,
+    so an update racing with it fails with CounterRetired and is redone on
+    product.stock; cold updates look for a counter again under the lock, in
+    case make_hot ran in between.
+    """
+
+    def __init__(self, stripes: int = 64, shards: int = 8):
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._hot: Dict[int, ShardedCounter] = {}
+        self.shards = shards
+
+    def _lock_for(self, product_id: int) -> threading.Lock:
+        return self._stripes[product_id % len(self._stripes)]
+
+    def is_hot(self, product_id: int) -> bool:
+        return product_id in self._hot
+
+    def make_hot(self, product):
+        """Move the product's stock into a sharded counter."""
+        with self._lock_for(product.id):
+            if product.id not in self._hot:
+                self._hot[product.id] = ShardedCounter(product.stock, self.shards)
+            product.is_hot = True
+
+    def make_cold(self, product):
+        """Fold a sharded counter back into ``product.stock``."""
+        with self._lock_for(product.id):
+            counter = self._hot.pop(product.id, None)
+            if counter is not None:
+                product.stock = counter.retire()
+            product.is_hot = False
+
+    def available(self, product, exact: bool = True) -> int:
+        """Current stock; ``exact=False`` skips locking for hot products."""
+        counter = self._hot.get(product.id)
+        if counter is None:
+            return product.stock
+        return counter.value() if exact else counter.approximate_value()
+
+    def reserve(self, product, quantity: int) -> bool:
+        """Take quantity from stock. Returns False if not enough is left."""
+        counter = self._hot.get(product.id)
+        if counter is not None:
+            try:
+                return counter.try_take(quantity)
+            except CounterRetired:
+                pass
+        with self._lock_for(product.id):
+            # Counters can't retire while the product lock is held
+            counter = self._hot.get(product.id)
+            if counter is not None:
+                return counter.try_take(quantity)
+            if product.stock < quantity:
+                return False
+            product.stock -= quantity
+            return True
+
+    def release(self, product, quantity: int):
+        """Return quantity to stock."""
+        counter = self._hot.get(product.id)
+        if counter is not None:
+            try:
+                counter.add(quantity)
+                return
+            except CounterRetired:
+                pass
+        with self._lock_for(product.id):
+            counter = self._hot.get(product.id)
+            if counter is not None:
+                counter.add(quantity)
+                return
+            product.stock += quantity
+
+    def set(self, product, quantity: int):
+        """Overwrite the stock level."""
+        with self._lock_for(product.id):
+            counter = self._hot.get(product.id)
+            if counter is not None:
+                counter.set(quantity)
+            product.stock = quantity
+
+    def refresh(self, product):
+        """Copy the exact hot total into ``product.stock``."""
+        counter = self._hot.get(product.id)
+        if counter is not None:
+            product.stock = counter.value()
+        return product
+
+    def forget(self, product_id: int):
+        """Drop ledger state for a deleted product."""
+        self._hot.pop(product_id, None)
+
+    def reset(self):
+        self._hot.clear()
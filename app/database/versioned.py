@@ -0,0 +1,210 @@
+"""
+Copy-on-write tables with consistent read snapshots.
+
+A VersionedTable spreads its rows over a fixed number of pages (plain
+dicts, by key hash). ``snapshot()`` pins the current tuple of pages, an
+O(pages) operation, and returns a read-only TableSnapshot of the table at
+that moment. A writer about to change a page that a live snapshot still
+shares copies the page first, so snapshots never change underneath their
+readers, and writers never wait for them. Without live snapshots, writes
+go straight into the pages.
+
+Pages are tagged with the epoch they were created in; taking a snapshot
+starts a new epoch. A page is shared with some live snapshot exactly when
+its epoch is at most the newest pinned epoch.
+
+Only the key -> row mapping is versioned. Rows must be replaced, not
+mutated in place (``dataclasses.replace``), for snapshots to see them as
+they were. Iterating the live table goes through a temporary snapshot, so
+it never fails with "dictionary changed size during iteration".
+"""
+
+import threading
+import weakref
+from collections.abc import Mapping, MutableMapping, ValuesView
+from typing import Dict, FrozenSet, List, Tuple
+
+
+class TableSnapshot(Mapping):
+    """Read-only view of a VersionedTable at one point in time."""
+
+    def __init__(self, table: "VersionedTable", pages: Tuple[dict, ...], size: int, epoch: int):
+        self._pages = pages
+        self._mask = len(pages) - 1
+        self._size = size
+        self.epoch = epoch
+        self._release = weakref.finalize(self, table._unpin, epoch)
+
+    def get(self, key, default=None):
+        return self._pages[hash(key) & self._mask].get(key, default)
+
+    def __getitem__(self, key):
+        return self._pages[hash(key) & self._mask][key]
+
+    def __contains__(self, key):
+        return key in self._pages[hash(key) & self._mask]
+
+    def __iter__(self):
+        for page in self._pages:
+            yield from page
+
+    def __len__(self):
+        return self._size
+
+    def values(self):
+        return _SnapshotValues(self)
+
+    def close(self):
+        """Release the pinned pages; writers stop copying them."""
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _SnapshotValues(ValuesView):
+    def __iter__(self):
+        for page in self._mapping._pages:
+            yield from page.values()
+
+
+class _TableValues(ValuesView):
+    def __iter__(self):
+        with self._mapping.snapshot() as snapshot:
+            yield from snapshot.values()
+
+
+class VersionedTable(MutableMapping):
+    """Mapping with copy-on-write pages and O(pages) snapshots."""
+
+    def __init__(self, pages: int = 256):
+        if pages < 1 or pages & (pages - 1):
+            raise ValueError("pages must be a power of two")
+        # Reentrant: a snapshot's finalizer may run on GC while it is held
+        self._lock = threading.RLock()
+        self._pages: List[dict] = [{} for _ in range(pages)]
+        self._page_epochs: List[int] = [0] * pages
+        self._mask = pages - 1
+        self._size = 0
+        self._epoch = 0
+        # Pinned epoch -> number of live snapshots taken in it
+        self._pinned: Dict[int, int] = {}
+        self._newest_pinned = -1
+        self.snapshots = 0
+        self.pages_copied = 0
+
+    def snapshot(self) -> TableSnapshot:
+        """Pin the current rows; close the snapshot when done reading."""
+        with self._lock:
+            epoch = self._epoch
+            self._epoch += 1
+            self._pinned[epoch] = self._pinned.get(epoch, 0) + 1
+            self._newest_pinned = epoch
+            self.snapshots += 1
+            return TableSnapshot(self, tuple(self._pages), self._size, epoch)
+
+    def _unpin(self, epoch: int):
+        with self._lock:
+            count = self._pinned[epoch] - 1
+            if count:
+                self._pinned[epoch] = count
+            else:
+                del self._pinned[epoch]
+                self._newest_pinned = max(self._pinned, default=-1)
+
+    def _writable_page(self, key) -> dict:
+        index = hash(key) & self._mask
+        if self._page_epochs[index] <= self._newest_pinned:
+            self._pages[index] = dict(self._pages[index])
+            self._page_epochs[index] = self._epoch
+            self.pages_copied += 1
+        return self._pages[index]
+
+    def get(self, key, default=None):
+        return self._pages[hash(key) & self._mask].get(key, default)
+
+    def __getitem__(self, key):
+        return self._pages[hash(key) & self._mask][key]
+
+    def __contains__(self, key):
+        return key in self._pages[hash(key) & self._mask]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            page = self._writable_page(key)
+            if key not in page:
+                self._size += 1
+            page[key] = value
+
+    def __delitem__(self, key):
+        with self._lock:
+            if key not in self._pages[hash(key) & self._mask]:
+                raise KeyError(key)
+            del self._writable_page(key)[key]
+            self._size -= 1
+
+    def __iter__(self):
+        with self.snapshot() as snapshot:
+            yield from snapshot
+
+    def __len__(self):
+        return self._size
+
+    def values(self):
+        return _TableValues(self)
+
+    def clear(self):
+        with self._lock:
+            # Pinned pages stay as they are; start from fresh ones
+            self._pages = [{} for _ in self._pages]
+            self._page_epochs = [self._epoch] * len(self._pages)
+            self._size = 0
+
+    def stats(self) -> dict:
+        return {
+            "rows": self._size,
+            "live_snapshots": sum(self._pinned.values()),
+            "snapshots": self.snapshots,
+            "pages_copied": self.pages_copied,
+        }
+
+
+class DatabaseSnapshot:
+    """
+    Consistent read-only view of orders, reviews and order item facts.
+
+    Use as a context manager, or close() it, to release the pinned pages.
+    """
+
+    def __init__(
+        self,
+        orders: Mapping,
+        reviews: Mapping,
+        facts: Dict,
+        pinned=(),
+        aggregated_orders: FrozenSet[int] = frozenset(),
+        copurchases_version: int = 0,
+    ):
+        self.orders = orders
+        self.reviews = reviews
+        # Fact columns are append-only; views of the filled part never change
+        self.facts = facts
+        # Orders counted in the aggregates, and the co-purchase index
+        # version, as of the snapshot
+        self.aggregated_orders = aggregated_orders
+        self.copurchases_version = copurchases_version
+        self._pinned = list(pinned)
+
+    def close(self):
+        for snapshot in self._pinned:
+            snapshot.close()
+        self._pinned.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
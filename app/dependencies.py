@@ -4,7 +4,9 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 
+from app.core.config import settings
 from app.core.security import oauth2_scheme, decode_access_token
+from app.core.tracing import span
 from app.database.db import db
 from app.models.user import User
 from app.services.user_service import UserService
@@ -18,16 +20,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
+    with span("auth"):
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
 
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+        user_id: Optional[int] = payload.get("sub")
+        if user_id is None:
+            raise credentials_exception
+        jti = payload.get("jti")
+        if jti is not None and db.revoked_tokens.is_revoked(jti):
+            raise credentials_exception
 
-    user_service = UserService(db)
-    user = user_service.get_user(int(user_id))
+        user_service = UserService(db)
+        user = user_service.get_user(int(user_id))
 
     if user is None:
         raise credentials_exception
@@ -45,3 +51,15 @@ async def get_current_active_user(
             detail="Inactive user",
         )
     return current_user
+
+
+async def get_current_admin_user(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    """Get the current user if they are an operator listed in ADMIN_EMAILS."""
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
@@ -0,0 +1,22 @@
+"""
+ASGI middleware for cross-cutting request handling.
+"""
+
+from .compression import CompressionMiddleware, ResponseCompressor
+from .idempotency import IdempotencyMiddleware, IdempotencyStore
+from .profiling import ProfilingMiddleware, SamplingProfiler
+from .rate_limit import RateLimiter, RateLimitMiddleware, RatePolicy
+from .timing import ServerTimingMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "IdempotencyMiddleware",
+    "IdempotencyStore",
+    "ProfilingMiddleware",
+    "RateLimiter",
+    "RateLimitMiddleware",
+    "RatePolicy",
+    "ResponseCompressor",
+    "SamplingProfiler",
+    "ServerTimingMiddleware",
+]
@@ -0,0 +1,239 @@
+"""
+Response compression negotiated with Accept-Encoding.
+
+Supports gzip, plus brotli ("br") and zstd when the ``brotli`` and
+``zstandard`` packages are installed. Among the encodings a client accepts,
+the server prefers zstd, then br, then gzip.
+
+Only complete, compressible responses (JSON, msgpack, XML, text) of at least
+min_size bytes are compressed; streamed responses such as server-sent
+events pass through. Bodies of thread_threshold bytes or more are
+compressed in the threadpool so the event loop keeps serving requests.
+
+Successful GETs of cache_paths, the catalog listings, return the same bytes
+to every client until the catalog changes. Their compressed bodies are kept
+in an LRU keyed by a digest of the uncompressed body, so each version of a
+listing is compressed once per encoding rather than once per request.
+"""
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (b"application/json", b"application/msgpack", b"application/xml", b"text/")
+PREFERENCE = ("zstd", "br", "gzip")
+
+
+def available_encoders(levels: Dict[str, int]) -> Dict[str, Callable[[bytes], bytes]]:
+    """Compression functions for the installed encodings, at the given levels."""
+    gzip_level = levels.get("gzip", 6)
+    encoders = {"gzip": lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        br_level = levels.get("br", 5)
+        encoders["br"] = lambda data: brotli.compress(data, quality=br_level)
+    if zstandard is not None:
+        zstd_level = levels.get("zstd", 3)
+        # Compressor objects aren't thread-safe, so one per call
+        encoders["zstd"] = lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data)
+    return encoders
+
+
+def negotiate(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """The preferred available encoding the Accept-Encoding header allows."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        params = params.strip()
+        quality = 1.0
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in PREFERENCE:
+        if encoding in available and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+class ResponseCompressor:
+    """Encodings, thresholds and the compressed body cache."""
+
+    def __init__(
+        self,
+        levels: Optional[Dict[str, int]] = None,
+        min_size: int = 1024,
+        thread_threshold: int = 256 * 1024,
+        cache_paths: Sequence[str] = (),
+        cache_max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.encoders = available_encoders(levels or {})
+        self.min_size = min_size
+        self.thread_threshold = thread_threshold
+        self.cache_paths = frozenset(cache_paths)
+        self.cache_max_bytes = cache_max_bytes
+        # (encoding, digest of uncompressed body) -> compressed body
+        self._cache: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._cache_size = 0
+        self._negotiated: Dict[bytes, Optional[str]] = {}
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cache_hits = 0
+
+    def encoding_for(self, accept_encoding: bytes) -> Optional[str]:
+        encoding = self._negotiated.get(accept_encoding, False)
+        if encoding is False:
+            encoding = negotiate(accept_encoding.decode("latin-1"), self.encoders)
+            # Clients send a handful of distinct headers; don't let junk grow this
+            if len(self._negotiated) < 1000:
+                self._negotiated[accept_encoding] = encoding
+        return encoding
+
+    async def compress(self, encoding: str, body: bytes, cacheable: bool = False) -> bytes:
+        if cacheable:
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = self._cache.get(key)
+            if compressed is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                self._count(body, compressed)
+                return compressed
+
+        compress = self.encoders[encoding]
+        if len(body) >= self.thread_threshold:
+            compressed = await run_in_threadpool(compress, body)
+        else:
+            compressed = compress(body)
+        if cacheable:
+            self._cache_put(key, compressed)
+        self._count(body, compressed)
+        return compressed
+
+    def _count(self, body: bytes, compressed: bytes):
+        self.compressed += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+
+    def _cache_put(self, key: Tuple[str, bytes], compressed: bytes):
+        if len(compressed) > self.cache_max_bytes:
+            return
+        previous = self._cache.pop(key, None)
+        if previous is not None:
+            self._cache_size -= len(previous)
+        self._cache[key] = compressed
+        self._cache_size += len(compressed)
+        while self._cache_size > self.cache_max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_size -= len(evicted)
+
+    def clear(self):
+        self._cache.clear()
+        self._cache_size = 0
+
+    def stats(self) -> dict:
+        return {
+            "encodings": list(self.encoders),
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "cache_entries": len(self._cache),
+            "cache_bytes": self._cache_size,
+            "cache_hits": self.cache_hits,
+        }
+
+
+def _accept_encoding(scope) -> Optional[bytes]:
+    for name, value in scope["headers"]:
+        if name == b"accept-encoding":
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses for clients that accept it."""
+
+    def __init__(self, app, compressor: ResponseCompressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = _accept_encoding(scope)
+        encoding = accept_encoding and self.compressor.encoding_for(accept_encoding)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start_message = message
+                headers = dict(message.get("headers", []))
+                if (
+                    b"content-encoding" in headers
+                    or not headers.get(b"content-type", b"").startswith(COMPRESSIBLE_TYPES)
+                    or b"no-transform" in headers.get(b"cache-control", b"")
+                ):
+                    passthrough = True
+                    await send(message)
+            elif message.get("more_body"):
+                # Streamed response: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+            else:
+                await self._send_body(
+                    scope, encoding, start_message, message.get("body", b""), send
+                )
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_body(self, scope, encoding: str, start_message, body: bytes, send):
+        if len(body) < self.compressor.min_size:
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        cacheable = (
+            scope["method"] == "GET"
+            and start_message["status"] == 200
+            and scope["path"] in self.compressor.cache_paths
+        )
+        compressed = await self.compressor.compress(encoding, body, cacheable)
+        headers = []
+        vary = b"Accept-Encoding"
+        for name, value in start_message.get("headers", []):
+            if name == b"vary":
+                vary = value + b", " + vary
+            elif name != b"content-length":
+                headers.append((name, value))
+        headers += [
+            (b"content-encoding", encoding.encode()),
+            (b"content-length", str(len(compressed)).encode()),
+            (b"vary", vary),
+        ]
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": compressed})
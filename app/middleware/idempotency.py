@@ -0,0 +1,215 @@
+"""
+Idempotency-Key support for non-idempotent POST endpoints.
+
+The first request with a given key runs normally and its response is stored.
+Retries with the same key and the same request are answered from the store
+without running the endpoint again; retries that arrive while the first
+request is still running wait for it. Reusing a key for a different request
+is rejected with 422.
+
+Keys are scoped to the authenticated user. Responses with a 5xx status are
+not stored, so the request can be retried for real.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from app.core.security import bearer_subject
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class StoredResponse:
+    """A response recorded for an idempotency key."""
+
+    fingerprint: str
+    expires_at: float
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    status: int = 0
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+
+class IdempotencyStore:
+    """Bounded LRU of idempotency keys whose entries expire after ttl seconds."""
+
+    def __init__(self, max_keys: int = 10_000, ttl: float = 86_400):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, StoredResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic() and entry.done.is_set():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def begin(self, key: tuple, fingerprint: str) -> StoredResponse:
+        """Register an in-flight request for key."""
+        entry = StoredResponse(fingerprint, time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        self._evict()
+        return entry
+
+    def discard(self, key: tuple, entry: StoredResponse):
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        entry.done.set()
+
+    def _evict(self):
+        excess = len(self._entries) - self.max_keys
+        if excess <= 0:
+            return
+        # Oldest first; in-flight entries are skipped, not evicted
+        victims = []
+        for key, entry in self._entries.items():
+            if entry.done.is_set():
+                victims.append(key)
+                if len(victims) == excess:
+                    break
+        for key in victims:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware applying Idempotency-Key semantics to some POST routes."""
+
+    def __init__(self, app, store: IdempotencyStore, paths: Iterable[str]):
+        self.app = app
+        self.store = store
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        raw_key = headers.get(HEADER)
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            await _send_error(
+                send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+            )
+            return
+        subject = bearer_subject(scope["headers"])
+        if subject is None:
+            # Unauthenticated: let the endpoint reject it
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(
+            b"\0".join([scope["path"].encode(), scope["query_string"], body])
+        ).hexdigest()
+        key = (subject, scope["path"], raw_key)
+
+        while True:
+            entry = self.store.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                await _send_error(
+                    send, 422, "Idempotency-Key was already used for a different request"
+                )
+                return
+            await entry.done.wait()
+            if entry.status:
+                await _replay(send, entry)
+                return
+            # The first attempt failed and was discarded: try again ourselves
+
+        entry = self.store.begin(key, fingerprint)
+        await self._execute(scope, body, receive, send, key, entry)
+
+    async def _execute(
+        self, scope, body: bytes, receive, send, key: tuple, entry: StoredResponse
+    ):
+        body_sent = False
+        status = 0
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+
+        async def receive_body():
+            # The body was already read for the fingerprint; hand it over once
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def record(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, record)
+        except BaseException:
+            self.store.discard(key, entry)
+            raise
+        if status >= 500 or status == 0:
+            self.store.discard(key, entry)
+            return
+        entry.status = status
+        entry.headers = headers
+        entry.body = b"".join(chunks)
+        entry.done.set()
+
+
+async def _read_body(receive) -> bytes:
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return bytes(body)
+
+
+async def _replay(send, entry: StoredResponse):
+    await send({
+        "type": "http.response.start",
+        "status": entry.status,
+        "headers": entry.headers + [(b"idempotent-replayed", b"true")],
+    })
+    await send({"type": "http.response.body", "body": entry.body})
+
+
+async def _send_error(send, status: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,212 @@
+"""
+Sampling profiler for live requests.
+
+A background thread wakes every ``interval`` seconds while profiled
+requests are in flight and reads the current stack of every thread. Stacks
+running inside a profiled request are cut at the middleware frame and
+charged to that request. When the request finishes they are added to the
+totals for its route template, e.g. ``GET /products/{product_id}``.
+
+The totals are exported as collapsed stacks, one ``route;frame;...;frame
+count`` line per distinct stack. flamegraph.pl and speedscope read this
+format directly.
+
+Which requests are profiled:
+
+- a random ``sample_rate`` fraction of all requests;
+- requests whose path starts with one of ``paths``;
+- requests sending ``X-Profile: <header_secret>``, when a secret is set;
+- every request during an on-demand session (see ``session``).
+
+When nothing is profiled the middleware costs a few attribute checks per
+request, and the sampler thread sleeps.
+
+Only the thread running the request is sampled. Work handed to the
+threadpool shows up as time spent in the awaiting frame. While a request
+holds the GIL the sampler can't run more often than sys.getswitchinterval().
+"""
+
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PROFILE_HEADER = b"x-profile"
+
+
+class SamplingProfiler:
+    """Aggregates sampled stacks of in-flight requests per route."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        paths: Sequence[str] = (),
+        header_secret: str = "",
+        interval: float = 0.005,
+        max_stacks: int = 10_000,
+    ):
+        self.sample_rate = sample_rate
+        self.paths = tuple(paths)
+        self.header_secret = header_secret.encode()
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._session_until = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Middleware frame of each profiled request -> its sampled stacks
+        self._requests: Dict[object, List[Tuple[str, ...]]] = {}
+        self._stacks: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._cwd = os.getcwd() + os.sep
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.samples = 0
+        self.dropped = 0
+
+    @property
+    def session_active(self) -> bool:
+        return self._session_until > time.monotonic()
+
+    def wants(self, scope) -> bool:
+        """Whether to profile this request."""
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if self.paths and scope["path"].startswith(self.paths):
+            return True
+        sent = self._secret_header(scope)
+        if sent is not None:
+            return sent
+        return self._session_until > 0 and self.session_active
+
+    def has_secret_header(self, scope) -> bool:
+        """Whether the request sends X-Profile with the configured secret."""
+        return bool(self._secret_header(scope))
+
+    def _secret_header(self, scope) -> Optional[bool]:
+        # None when no secret is set or no X-Profile header was sent
+        if self.header_secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.header_secret)
+        return None
+
+    def session(self, seconds: float):
+        """Profile every request for the next seconds."""
+        self._session_until = max(self._session_until, time.monotonic() + seconds)
+
+    def begin(self, frame):
+        with self._lock:
+            self._requests[frame] = []
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sample_loop, name="profiler", daemon=True
+                )
+                self._thread.start()
+            self._wakeup.notify()
+
+    def end(self, frame, route: str):
+        with self._lock:
+            stacks = self._requests.pop(frame)
+            for stack in stacks:
+                key = (route,) + stack
+                if key in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[key] += 1
+                else:
+                    self.dropped += 1
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename.rsplit("site-packages/", 1)[-1]
+            if filename.startswith(self._cwd):
+                filename = filename[len(self._cwd):]
+            label = self._labels[code] = (
+                f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+            )
+        return label
+
+    def _sample_loop(self):
+        own_thread = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self._requests:
+                    self._wakeup.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                requests = self._requests
+                for thread_id, frame in frames.items():
+                    if thread_id == own_thread:
+                        continue
+                    codes = []
+                    while frame is not None and frame not in requests:
+                        codes.append(frame.f_code)
+                        frame = frame.f_back
+                    if frame is None:
+                        continue
+                    requests[frame].append(tuple(self._label(code) for code in reversed(codes)))
+                    self.samples += 1
+
+    def collapsed(self, route: Optional[str] = None, since: Optional[Counter] = None) -> str:
+        """Collapsed stacks, busiest first, optionally for one route."""
+        stacks = self.snapshot()
+        if since is not None:
+            stacks.subtract(since)
+        lines = [
+            f"{';'.join(stack)} {count}"
+            for stack, count in stacks.most_common()
+            if count > 0 and (route is None or stack[0] == route)
+        ]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self._stacks)
+
+    def clear(self):
+        with self._lock:
+            self._stacks.clear()
+            self._session_until = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "profiled_requests": self.requests,
+            "in_flight": len(self._requests),
+            "samples": self.samples,
+            "stacks": len(self._stacks),
+            "dropped": self.dropped,
+            "session_active": self.session_active,
+        }
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', None) or scope['path']}"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles the requests a SamplingProfiler wants."""
+
+    def __init__(self, app, profiler: SamplingProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.wants(scope):
+            await self.app(scope, receive, send)
+            return
+        await self._profiled(scope, receive, send)
+
+    async def _profiled(self, scope, receive, send):
+        # Samples are cut at this frame; everything below it is the request
+        frame = sys._getframe()
+        self.profiler.begin(frame)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(frame, _route_label(scope))
@@ -0,0 +1,181 @@
+"""
+Token-bucket rate limiting.
+
+Each policy allows ``limit`` requests per ``period`` seconds, refilled
+continuously, with bursts of up to ``limit``. Clients are keyed by the user
+id in their bearer token, or by IP address when there is no valid token, so
+users behind one NAT don't share a bucket once logged in.
+
+Policies apply to exact ``"METHOD /path"`` routes, with ``"*"`` as an
+optional default for every other request. Checks are a dict lookup and a
+little arithmetic. Buckets live in an LRU table: a bucket that has been idle
+long enough to refill completely carries no state and is evicted, and the
+table never grows past max_keys.
+
+Responses carry the RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset
+and RateLimit-Policy headers; rejected requests get 429 with Retry-After.
+"""
+
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.core.security import bearer_subject
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """limit requests per period seconds."""
+
+    name: str
+    limit: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RatePolicy":
+        """Parse a spec like "10/minute" or "5/30" (seconds)."""
+        count, _, period = spec.partition("/")
+        seconds = PERIODS.get(period.strip())
+        if seconds is None:
+            seconds = float(period)
+        limit = int(count)
+        if limit < 1 or seconds <= 0:
+            raise ValueError(f"Invalid rate limit {spec!r} for {name!r}")
+        return cls(name, limit, seconds)
+
+
+class RateLimiter:
+    """Token buckets per (policy, client) in a bounded LRU table."""
+
+    def __init__(self, policies: Dict[str, str], max_keys: int = 100_000):
+        self.policies = {
+            route: RatePolicy.parse(route, spec) for route, spec in policies.items()
+        }
+        self.max_keys = max_keys
+        # (policy name, client) -> [tokens, last refill time]
+        self._buckets: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def policy_for(self, method: str, path: str) -> Optional[RatePolicy]:
+        return self.policies.get(f"{method} {path}") or self.policies.get("*")
+
+    def hit(
+        self, policy: RatePolicy, client: str, now: Optional[float] = None
+    ) -> Tuple[bool, float]:
+        """
+        Take a token from the client's bucket.
+
+        Returns whether the request is allowed and the tokens left.
+        """
+        now = time.monotonic() if now is None else now
+        key = (policy.name, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._evict(now)
+            bucket = self._buckets[key] = [float(policy.limit), now]
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(policy.limit, bucket[0] + (now - bucket[1]) * policy.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            self.allowed += 1
+            return True, bucket[0]
+        self.limited += 1
+        return False, bucket[0]
+
+    def _evict(self, now: float):
+        """Drop least recently used buckets that refilled, or to make room."""
+        buckets = self._buckets
+        while buckets:
+            (name, _), (tokens, last) = next(iter(buckets.items()))
+            policy = self.policies[name]
+            refilled = tokens + (now - last) * policy.rate >= policy.limit
+            if len(buckets) < self.max_keys and not refilled:
+                return
+            buckets.popitem(last=False)
+            self.evicted += 1
+
+    def clear(self):
+        self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {
+            "buckets": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evicted": self.evicted,
+        }
+
+
+def _client_key(scope) -> str:
+    subject = bearer_subject(scope["headers"])
+    if subject is not None:
+        return f"user:{subject}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def _headers(policy: RatePolicy, tokens: float) -> List[Tuple[bytes, bytes]]:
+    reset = math.ceil((policy.limit - tokens) / policy.rate)
+    return [
+        (b"ratelimit-limit", str(policy.limit).encode()),
+        (b"ratelimit-remaining", str(int(tokens)).encode()),
+        (b"ratelimit-reset", str(reset).encode()),
+        (b"ratelimit-policy", f"{policy.limit};w={policy.period:g}".encode()),
+    ]
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying a RateLimiter to HTTP requests."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        policy = self.limiter.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, tokens = self.limiter.hit(policy, _client_key(scope))
+        headers = _headers(policy, tokens)
+        if not allowed:
+            retry_after = math.ceil((1 - tokens) / policy.rate)
+            body = json.dumps({"detail": "Too many requests"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,66 @@
+"""
+Server-Timing headers from per-request stage traces.
+
+Each request runs with a fresh Trace (see app.core.tracing). When the
+response starts, the stages timed so far plus a ``total`` stage are sent in
+the Server-Timing header, which browser dev tools show next to the request.
+When the request is done, its stages are added to the stage histograms.
+
+Stage timings reveal how long auth and token checks took, so the header is
+only sent to requests carrying the profiler's ``X-Profile`` secret, unless
+``public`` is set. The histograms cover every request either way.
+"""
+
+import time
+from typing import Optional
+
+from app.core.tracing import StageHistograms, end_trace, start_trace
+from app.middleware.profiling import SamplingProfiler
+
+SERVER_TIMING_HEADER = b"server-timing"
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware tracing each HTTP request's stages."""
+
+    def __init__(
+        self,
+        app,
+        histograms: StageHistograms,
+        enabled: bool = True,
+        profiler: Optional[SamplingProfiler] = None,
+        public: bool = False,
+    ):
+        self.app = app
+        self.histograms = histograms
+        self.enabled = enabled
+        self.profiler = profiler
+        self.public = public
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace, token = start_trace()
+        start = time.perf_counter()
+        send_header = self.public or (
+            self.profiler is not None and self.profiler.has_secret_header(scope)
+        )
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                trace.add("total", time.perf_counter() - start)
+                if send_header:
+                    message = {
+                        **message,
+                        "headers": list(message.get("headers", []))
+                        + [(SERVER_TIMING_HEADER, trace.server_timing().encode())],
+                    }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_trace(token)
+            self.histograms.record(trace)
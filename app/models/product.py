@@ -17,6 +17,7 @@ class Product:
     stock: int
     category: str
     created_at: datetime = field(default_factory=datetime.now)
+    is_hot: bool = False
 
     def to_dict(self) -> dict:
         """Convert product to dictionary."""
@@ -28,4 +29,5 @@ class Product:
             "stock": self.stock,
             "category": self.category,
             "created_at": self.created_at.isoformat(),
+            "is_hot": self.is_hot,
         }
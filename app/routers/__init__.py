@@ -7,6 +7,12 @@ from .users import router as users_router
 from .products import router as products_router
 from .cart import router as cart_router
 from .orders import router as orders_router
+from .categories import router as categories_router
+from .reviews import router as reviews_router
+from .admin import router as admin_router
+from .reports import router as reports_router
+from .events import router as events_router
+from .debug import router as debug_router
 
 __all__ = [
     "auth_router",
@@ -14,4 +20,10 @@ __all__ = [
     "products_router",
     "cart_router",
     "orders_router",
+    "categories_router",
+    "reviews_router",
+    "admin_router",
+    "reports_router",
+    "events_router",
+    "debug_router",
 ]
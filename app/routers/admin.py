@@ -0,0 +1,112 @@
+"""
+Admin router - operator-facing endpoints.
+Requires an authenticated user listed in ADMIN_EMAILS.
+"""
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.security import decode_access_token, decode_refresh_token
+from app.core.wire import MsgPackRoute
+from app.database.db import db
+from app.dependencies import get_current_admin_user
+from app.models.order import OrderStatus
+from app.routers.auth import revoke_token_payload
+from app.routers.orders import _build_order_response
+from app.schemas.auth import RevokeTokenRequest
+from app.schemas.order import (
+    OrderAggregateResponse,
+    OrderFilter,
+    OrderQueryResponse,
+)
+from app.services.order_service import OrderService
+from app.services.recommendation_service import RecommendationService
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin_user)],
+    route_class=MsgPackRoute,
+)
+order_service = OrderService(db)
+recommendation_service = RecommendationService(db)
+
+
+@router.get("/orders", response_model=OrderQueryResponse)
+async def query_orders(
+    status_values: Optional[List[str]] = Query(None, alias="status"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    min_total: Optional[float] = Query(None, ge=0),
+    max_total: Optional[float] = Query(None, ge=0),
+    product_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    sort_by: Literal["created_at", "total", "id"] = "created_at",
+    descending: bool = True,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=0, le=1000),
+    group_by: Optional[Literal["status", "day"]] = None,
+):
+    """
+    Query orders with filters, sorting and aggregates.
+
+    - **status**: repeat to match several statuses
+    - **created_from** / **created_to**: creation date range (inclusive)
+    - **min_total** / **max_total**: order total range
+    - **product_id** / **user_id**: orders containing a product / placed by a user
+    - **group_by**: `status` or `day` for grouped count, revenue and average
+    """
+    valid_statuses = {s.value for s in OrderStatus}
+    if status_values and not set(status_values) <= valid_statuses:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status. Valid values: {[s.value for s in OrderStatus]}",
+        )
+
+    order_filter = OrderFilter(
+        statuses=status_values,
+        created_from=created_from,
+        created_to=created_to,
+        min_total=min_total,
+        max_total=max_total,
+        product_id=product_id,
+        user_id=user_id,
+        sort_by=sort_by,
+        descending=descending,
+        offset=offset,
+        limit=limit,
+        group_by=group_by,
+    )
+    orders, total_count, aggregates = order_service.query_orders(order_filter)
+
+    return OrderQueryResponse(
+        total_count=total_count,
+        orders=[_build_order_response(order) for order in orders],
+        summary=OrderAggregateResponse(**aggregates["summary"]),
+        groups=[OrderAggregateResponse(**group) for group in aggregates["groups"]],
+    )
+
+
+@router.post("/recommendations/rebuild")
+async def rebuild_recommendations(workers: Optional[int] = Query(None, ge=1)):
+    """Recount co-purchases from order history using multiple processes."""
+    orders = await run_in_threadpool(recommendation_service.rebuild, workers)
+    return {"orders_processed": orders}
+
+
+@router.post("/tokens/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_token(revoke_data: RevokeTokenRequest):
+    """Revoke a compromised access or refresh token until it expires."""
+    payload = decode_access_token(revoke_data.token) or decode_refresh_token(
+        revoke_data.token
+    )
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired token",
+        )
+    revoke_token_payload(payload)
+    return None
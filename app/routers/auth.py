@@ -3,21 +3,68 @@ Authentication router - login, register, token management.
 """
 
 from datetime import timedelta
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.jobs import JobQueue
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_access_token,
+    decode_refresh_token,
+    get_password_hash,
+    oauth2_scheme,
+    password_needs_rehash,
+    verify_password,
+)
+from app.core.wire import MsgPackRoute
 from app.database.db import db
 from app.dependencies import get_current_active_user
 from app.models.user import User
-from app.schemas.auth import Token
+from app.schemas.auth import LogoutRequest, RefreshRequest, Token
 from app.schemas.user import UserCreate, UserResponse
 from app.services.user_service import UserService
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=MsgPackRoute)
 user_service = UserService(db)
+auth_jobs = JobQueue(
+    "auth",
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_delay=settings.JOB_RETRY_DELAY,
+)
+auth_jobs.register("password.rehash", user_service.upgrade_password_hash)
+
+
+def _issue_tokens(user: User) -> Token:
+    """Helper to create an access and refresh token pair for a user."""
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return Token(
+        access_token=create_access_token(
+            data={"sub": str(user.id)},
+            expires_delta=access_token_expires,
+        ),
+        refresh_token=create_refresh_token(data={"sub": str(user.id)}),
+        token_type="bearer",
+    )
+
+
+def _check_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and, if its hash is outdated, hash it again."""
+    if not verify_password(password, hashed_password):
+        return False, None
+    if password_needs_rehash(hashed_password):
+        return True, get_password_hash(password)
+    return True, None
+
+
+def revoke_token_payload(payload: dict):
+    """Deny a decoded token until it expires."""
+    if payload.get("jti"):
+        db.revoked_tokens.revoke(payload["jti"], payload["exp"])
 
 
 @router.post(
@@ -31,23 +78,21 @@ async def register(user_data: UserCreate):
     - **full_name**: User's full name
     - **password**: Password (min 6 characters)
     """
-    # Check if email already exists
-    existing_user = user_service.get_user_by_email(user_data.email)
-    if existing_user:
+    # Fail fast before hashing; checked again when the user is inserted
+    if user_service.get_user_by_email(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    # Create user with bcrypt hashed password
-    user_id = db.get_next_user_id()
-    user = User(
-        id=user_id,
-        email=user_data.email,
-        full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
-    )
-    db.users[user_id] = user
+    # bcrypt takes a while by design; keep the event loop free meanwhile
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
+    user = user_service.create_user(user_data, hashed_password)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
 
     return UserResponse(
         id=user.id,
@@ -66,12 +111,19 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     - **username**: User's email address
     - **password**: User's password
 
-    Returns JWT access token.
+    Returns a short-lived JWT access token and a refresh token for
+    POST /auth/refresh.
     """
     # Find user by email (OAuth2 uses 'username' field)
     user = user_service.get_user_by_email(form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # bcrypt takes a while by design; keep the event loop free meanwhile
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await run_in_threadpool(
+            _check_password, form_data.password, user.hashed_password
+        )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -84,14 +136,54 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             detail="User account is inactive",
         )
 
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=access_token_expires,
-    )
+    if new_hash:
+        # Legacy scheme or outdated cost: the job only swaps in the new hash,
+        # so the password itself never reaches the queue
+        auth_jobs.submit("password.rehash", user.id, new_hash, user.hashed_password)
+
+    return _issue_tokens(user)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(refresh_data: RefreshRequest):
+    """
+    Exchange a refresh token for a new access and refresh token.
+
+    Refresh tokens are single use: the one sent is revoked.
+    """
+    payload = decode_refresh_token(refresh_data.refresh_token)
+    if payload is None or db.revoked_tokens.is_revoked(payload.get("jti", "")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user = user_service.get_user(int(payload["sub"]))
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
-    return Token(access_token=access_token, token_type="bearer")
+    revoke_token_payload(payload)
+    return _issue_tokens(user)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_data: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Revoke the current access token and, if given, the refresh token."""
+    revoke_token_payload(decode_access_token(token))
+    if logout_data and logout_data.refresh_token:
+        payload = decode_refresh_token(logout_data.refresh_token)
+        if payload and payload.get("sub") == str(current_user.id):
+            revoke_token_payload(payload)
+    return None
 
 
 @router.get("/me", response_model=UserResponse)
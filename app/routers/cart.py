@@ -5,13 +5,14 @@ Requires authentication - users can only access their own cart.
 
 from fastapi import APIRouter, Depends, HTTPException, status
 
+from app.core.wire import MsgPackRoute, model_response
 from app.database.db import db
 from app.dependencies import get_current_active_user
 from app.models.user import User
 from app.schemas.cart import CartItemCreate, CartResponse, CartItemResponse
 from app.services.cart_service import CartService
 
-router = APIRouter(prefix="/cart", tags=["cart"])
+router = APIRouter(prefix="/cart", tags=["cart"], route_class=MsgPackRoute)
 cart_service = CartService(db)
 
 
@@ -37,7 +38,7 @@ def _build_cart_response(cart) -> CartResponse:
 async def get_my_cart(current_user: User = Depends(get_current_active_user)):
     """Get current user's cart."""
     cart = cart_service.get_cart(current_user.id)
-    return _build_cart_response(cart)
+    return model_response(cart, _build_cart_response)
 
 
 @router.post("/items", response_model=CartResponse)
@@ -52,7 +53,7 @@ async def add_item_to_cart(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Product not found or insufficient stock",
         )
-    return _build_cart_response(cart)
+    return model_response(cart, _build_cart_response)
 
 
 @router.delete("/items/{product_id}", response_model=CartResponse)
@@ -67,7 +68,7 @@ async def remove_item_from_cart(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found in cart",
         )
-    return _build_cart_response(cart)
+    return model_response(cart, _build_cart_response)
 
 
 @router.put("/items/{product_id}", response_model=CartResponse)
@@ -85,7 +86,7 @@ async def update_cart_item(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Item not found or insufficient stock",
         )
-    return _build_cart_response(cart)
+    return model_response(cart, _build_cart_response)
 
 
 @router.delete("/", response_model=CartResponse)
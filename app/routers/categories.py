@@ -6,11 +6,12 @@ from typing import List
 
 from fastapi import APIRouter, HTTPException, status
 
+from app.core.wire import MsgPackRoute
 from app.database.db import db
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.services.category_service import CategoryService
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(prefix="/categories", tags=["categories"], route_class=MsgPackRoute)
 category_service = CategoryService(db)
 
 
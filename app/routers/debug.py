@@ -0,0 +1,55 @@
+"""
+Debug router - request profiles for diagnosing latency.
+Requires an authenticated user listed in ADMIN_EMAILS.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.wire import MsgPackRoute
+from app.dependencies import get_current_admin_user
+from app.middleware.profiling import SamplingProfiler
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Depends(get_current_admin_user)],
+    route_class=MsgPackRoute,
+)
+profiler = SamplingProfiler(
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    paths=settings.PROFILE_PATHS,
+    header_secret=settings.PROFILE_HEADER_SECRET,
+    interval=settings.PROFILE_INTERVAL,
+    max_stacks=settings.PROFILE_MAX_STACKS,
+)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(
+    route: Optional[str] = Query(None, description='Route template, e.g. "GET /products/{product_id}"'),
+    seconds: float = Query(0, ge=0, le=settings.PROFILE_MAX_SESSION_SECONDS),
+):
+    """
+    Sampled stacks of profiled requests, in collapsed (flamegraph) format.
+
+    With seconds, profiles every request for that long and returns only
+    the stacks sampled meanwhile.
+    """
+    if not seconds:
+        return profiler.collapsed(route)
+    before = profiler.snapshot()
+    profiler.session(seconds)
+    await asyncio.sleep(seconds)
+    return profiler.collapsed(route, since=before)
+
+
+@router.delete("/profile", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_profile():
+    """Discard collected stacks and end any profiling session."""
+    profiler.clear()
+    return None
@@ -0,0 +1,78 @@
+"""
+Events router - the change stream of entity mutations.
+Requires an authenticated user listed in ADMIN_EMAILS.
+"""
+
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+
+from app.core import sse
+from app.core.config import settings
+from app.core.wire import MsgPackRoute
+from app.database.db import db
+from app.dependencies import get_current_admin_user
+from app.schemas.event import EventResponse
+
+router = APIRouter(
+    prefix="/events",
+    tags=["events"],
+    dependencies=[Depends(get_current_admin_user)],
+    route_class=MsgPackRoute,
+)
+
+
+@router.get("/", response_model=List[EventResponse])
+async def get_events(
+    response: Response,
+    after: int = Query(0, ge=0, description="Last sequence number already seen"),
+    limit: int = Query(100, ge=1, le=1000),
+    timeout: float = Query(0, ge=0, le=settings.EVENT_POLL_MAX_TIMEOUT),
+):
+    """
+    Events after a sequence number, oldest first.
+
+    With a timeout, waits up to that many seconds for new events when there
+    are none yet (long polling). The cursor for the next call is returned
+    in the X-Next-Cursor header.
+    """
+    events = db.events.read(after, limit)
+    if not events and timeout and await db.events.wait(after, timeout):
+        events = db.events.read(after, limit)
+    response.headers["X-Next-Cursor"] = str(events[-1].seq if events else after)
+    return [event.to_dict() for event in events]
+
+
+@router.get("/stream")
+async def stream_events(
+    after: Optional[int] = Query(None, ge=0, description="Defaults to now"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """
+    Server-sent events for every mutation after a sequence number.
+
+    Reconnecting clients resume from their Last-Event-ID.
+    """
+    if last_event_id is not None:
+        after = last_event_id
+    elif after is None:
+        after = db.events.last_seq
+    return StreamingResponse(
+        event_stream(after), media_type=sse.MEDIA_TYPE, headers=sse.HEADERS
+    )
+
+
+async def event_stream(
+    after: int, keepalive: float = settings.EVENT_STREAM_KEEPALIVE
+) -> AsyncIterator[bytes]:
+    cursor = after
+    while True:
+        events = db.events.read(cursor)
+        if not events:
+            if not await db.events.wait(cursor, keepalive):
+                yield sse.KEEPALIVE
+            continue
+        for event in events:
+            yield sse.sse_message(event.to_dict(), event=event.type, id=event.seq)
+        cursor = events[-1].seq
@@ -3,11 +3,16 @@ Orders router - API endpoints for order management.
 Requires authentication for most operations.
 """
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import Response
 
+from app.core.config import settings
+from app.core.fields import FieldSelector
+from app.core.jobs import JobQueue
+from app.core.tracing import traced
+from app.core.wire import MsgPackRoute, model_response
 from app.database.db import db
 from app.dependencies import get_current_active_user
 from app.models.order import OrderStatus
@@ -15,10 +20,30 @@ from app.models.user import User
 from app.schemas.order import OrderResponse, OrderItemResponse
 from app.services.order_service import OrderService
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=MsgPackRoute)
 order_service = OrderService(db)
-
-
+order_jobs = JobQueue(
+    "orders",
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_delay=settings.JOB_RETRY_DELAY,
+)
+order_jobs.register("order.placed", order_service.process_placed_order)
+order_fields = FieldSelector(OrderResponse, computed={
+    "items": lambda order: [
+        {
+            "product_id": item.product_id,
+            "product_name": item.product_name,
+            "quantity": item.quantity,
+            "unit_price": item.unit_price,
+            "total_price": item.get_total(),
+        }
+        for item in order.items
+    ],
+    "status": lambda order: order.status.value,
+})
+
+
+@traced(name="serialize")
 def _build_order_response(order) -> OrderResponse:
     """Helper to build OrderResponse from order model."""
     return OrderResponse(
@@ -42,20 +67,45 @@ def _build_order_response(order) -> OrderResponse:
 
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(current_user: User = Depends(get_current_active_user)):
-    """Create order from current user's cart."""
+    """
+    Create order from current user's cart.
+
+    Only stock reservation and order creation happen here; confirmation,
+    the XML export and sales aggregates are handled by a background job.
+    """
     order = order_service.create_order_from_cart(current_user.id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cart is empty or insufficient stock",
         )
-    return _build_order_response(order)
+    response = _build_order_response(order)
+    order_jobs.submit("order.placed", order.id)
+    return response
 
 
 @router.get("/", response_model=List[OrderResponse])
-async def get_my_orders(current_user: User = Depends(get_current_active_user)):
-    """Get current user's orders."""
-    orders = order_service.get_orders_by_user(current_user.id)
+async def get_my_orders(
+    response: Response,
+    cursor: Optional[int] = Query(None, ge=0, description="Cursor from X-Next-Cursor"),
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,total,status"),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Get current user's orders, newest first.
+
+    When more orders exist, the cursor for the next page is returned
+    in the X-Next-Cursor header.
+    """
+    field_set = order_fields.parse(fields)
+    orders, next_cursor = order_service.get_orders_page(
+        current_user.id, cursor, limit
+    )
+    headers = {} if next_cursor is None else {"X-Next-Cursor": str(next_cursor)}
+    response.headers.update(headers)
+    if field_set:
+        return order_fields.response(orders, field_set, headers=headers)
     return [_build_order_response(order) for order in orders]
 
 
@@ -77,7 +127,7 @@ async def get_order(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied",
         )
-    return _build_order_response(order)
+    return model_response(order, _build_order_response)
 
 
 @router.get("/{order_id}/xml")
@@ -130,7 +180,7 @@ async def update_order_status(
         )
 
     updated_order = order_service.update_order_status(order_id, new_status)
-    return _build_order_response(updated_order)
+    return model_response(updated_order, _build_order_response)
 
 
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
@@ -157,4 +207,4 @@ async def cancel_order(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Order cannot be cancelled (already shipped/delivered)",
         )
-    return _build_order_response(cancelled_order)
+    return model_response(cancelled_order, _build_order_response)
@@ -2,22 +2,42 @@
 Products router - API endpoints for product management.
 """
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Set
 
 from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 
+from app.core import sse
+from app.core.config import settings
+from app.core.fields import FieldSelector
+from app.core.singleflight import SingleFlight
+from app.core.wire import MsgPackRoute
 from app.database.db import db
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.schemas.product import (
+    ProductCreate,
+    ProductUpdate,
+    ProductResponse,
+    ProductRecommendationResponse,
+    SuggestionResponse,
+)
 from app.services.product_service import ProductService
+from app.services.product_stream_service import ProductStreamService
+from app.services.recommendation_service import RecommendationService
 
-router = APIRouter(prefix="/products", tags=["products"])
+router = APIRouter(prefix="/products", tags=["products"], route_class=MsgPackRoute)
 product_service = ProductService(db)
+recommendation_service = RecommendationService(db)
+product_flight = SingleFlight("products.get")
+product_fields = FieldSelector(ProductResponse)
+product_stream = ProductStreamService(
+    db,
+    tick=settings.PRODUCT_STREAM_TICK,
+    max_stall=settings.PRODUCT_STREAM_MAX_STALL,
+)
 
 
-@router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-async def create_product(product_data: ProductCreate):
-    """Create a new product."""
-    product = product_service.create_product(product_data)
+def _build_product_response(product) -> ProductResponse:
+    """Helper to build ProductResponse from product model."""
     return ProductResponse(
         id=product.id,
         name=product.name,
@@ -26,51 +46,149 @@ async def create_product(product_data: ProductCreate):
         stock=product.stock,
         category=product.category,
         created_at=product.created_at,
+        is_hot=product.is_hot,
     )
 
 
+def _render_product(product_id: int) -> Optional[bytes]:
+    """Serialized product JSON, or None if it doesn't exist."""
+    product = product_service.get_product(product_id)
+    if not product:
+        return None
+    return _build_product_response(product).model_dump_json().encode()
+
+
+@router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
+async def create_product(product_data: ProductCreate):
+    """Create a new product."""
+    product = product_service.create_product(product_data)
+    return _build_product_response(product)
+
+
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
-    category: Optional[str] = Query(None, description="Filter by category")
+    category: Optional[str] = Query(None, description="Filter by category"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price"),
 ):
-    """Get all products, optionally filtered by category."""
+    """Get all products, optionally filtered by category and with only some fields."""
+    field_set = product_fields.parse(fields)
     if category:
         products = product_service.get_products_by_category(category)
     else:
         products = product_service.get_all_products()
 
-    return [
-        ProductResponse(
-            id=product.id,
-            name=product.name,
-            description=product.description,
-            price=product.price,
-            stock=product.stock,
-            category=product.category,
-            created_at=product.created_at,
+    if field_set:
+        return product_fields.response(products, field_set)
+    return [_build_product_response(product) for product in products]
+
+
+@router.get("/suggest", response_model=List[SuggestionResponse])
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Typed prefix"),
+    limit: int = Query(10, ge=1, le=20, description="Number of suggestions"),
+):
+    """Autocomplete product and category names, most popular first."""
+    return product_service.suggest(prefix, limit)
+
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200, description="Search words"),
+    fuzzy: bool = Query(False, description="Tolerate typos in the search words"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Search products by name; with fuzzy=true, misspelled words still match."""
+    products = product_service.search_products(q, fuzzy, limit)
+    return [_build_product_response(product) for product in products]
+
+
+@router.get("/stream")
+async def stream_products(
+    ids: str = Query(..., description="Comma-separated product IDs"),
+):
+    """
+    Server-sent events with price and stock changes of the given products.
+
+    The first event holds their current price and stock; later events only
+    the products that changed, e.g. {"3": {"stock": 2}}. Deleted or unknown
+    products are sent as {"deleted": true}.
+    """
+    try:
+        product_ids = {int(product_id) for product_id in ids.split(",")}
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers",
         )
-        for product in products
-    ]
+    if len(product_ids) > settings.PRODUCT_STREAM_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PRODUCT_STREAM_MAX_IDS} products per stream",
+        )
+    return StreamingResponse(
+        product_updates(product_ids), media_type=sse.MEDIA_TYPE, headers=sse.HEADERS
+    )
+
+
+async def product_updates(
+    product_ids: Set[int], keepalive: float = settings.EVENT_STREAM_KEEPALIVE
+) -> AsyncIterator[bytes]:
+    # Connect once streaming starts, so the finally below always disconnects
+    connection = product_stream.connect(product_ids)
+    try:
+        while True:
+            batch = await connection.next_batch(keepalive)
+            if connection.closed:
+                return
+            if batch is None:
+                yield sse.KEEPALIVE
+            else:
+                yield sse.sse_raw(batch, event="update", id=connection.seq)
+    finally:
+        product_stream.disconnect(connection)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(product_id: int):
-    """Get product by ID."""
-    product = product_service.get_product(product_id)
-    if not product:
+    """
+    Get product by ID.
+
+    Concurrent requests for the same product share one lookup and one
+    serialized body.
+    """
+    body = await product_flight.run(product_id, _render_product, product_id)
+    if body is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found",
         )
-    return ProductResponse(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        stock=product.stock,
-        category=product.category,
-        created_at=product.created_at,
-    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/{product_id}/recommendations",
+    response_model=List[ProductRecommendationResponse],
+)
+async def get_product_recommendations(
+    product_id: int,
+    limit: int = Query(5, ge=1, le=20, description="Number of recommendations"),
+):
+    """Get products frequently bought together with this one."""
+    if not product_service.get_product(product_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found",
+        )
+    recommendations = recommendation_service.get_recommendations(product_id, limit)
+    return [
+        ProductRecommendationResponse(
+            product_id=product.id,
+            name=product.name,
+            price=product.price,
+            times_bought_together=count,
+        )
+        for product, count in recommendations
+    ]
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
@@ -82,15 +200,7 @@ async def update_product(product_id: int, product_data: ProductUpdate):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found",
         )
-    return ProductResponse(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        stock=product.stock,
-        category=product.category,
-        created_at=product.created_at,
-    )
+    return _build_product_response(product)
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,65 @@
+"""
+Reports router - sales analytics endpoints.
+Requires an authenticated user listed in ADMIN_EMAILS.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.wire import MsgPackRoute
+from app.database.db import db
+from app.dependencies import get_current_admin_user
+from app.schemas.report import (
+    CohortRevenueResponse,
+    DailyRevenueResponse,
+    ProductSalesResponse,
+    TopSellersResponse,
+)
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter(
+    prefix="/reports",
+    tags=["reports"],
+    dependencies=[Depends(get_current_admin_user)],
+    route_class=MsgPackRoute,
+)
+analytics_service = AnalyticsService(db)
+
+
+@router.get("/daily-revenue", response_model=List[DailyRevenueResponse])
+async def get_daily_revenue(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Net revenue and units per day in [start, end)."""
+    return analytics_service.daily_revenue(start, end)
+
+
+@router.get("/product-sales", response_model=List[ProductSalesResponse])
+async def get_product_sales(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=10_000),
+):
+    """Net units sold and revenue per product, best sellers first."""
+    return analytics_service.units_by_product(start, end, limit)
+
+
+@router.get("/top-sellers", response_model=TopSellersResponse)
+async def get_top_sellers(
+    per_category: int = Query(5, ge=1, le=100),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Top selling products within each category."""
+    return TopSellersResponse(
+        categories=analytics_service.top_sellers_by_category(per_category, start, end)
+    )
+
+
+@router.get("/cohorts", response_model=List[CohortRevenueResponse])
+async def get_cohort_revenue():
+    """Net revenue by signup-week cohort and weeks since signup."""
+    return analytics_service.cohort_revenue()
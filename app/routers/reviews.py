@@ -1,9 +1,13 @@
 """Reviews router - API endpoints for product reviews."""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
 
+from app.core.fields import FieldSelector
+from app.core.singleflight import SingleFlight
+from app.core.wire import MsgPackRoute
 from app.database.db import db
 from app.dependencies import get_current_active_user
 from app.models.user import User
@@ -16,9 +20,11 @@ from app.schemas.review import (
 from app.services.review_service import ReviewService
 from app.services.product_service import ProductService
 
-router = APIRouter(prefix="/reviews", tags=["reviews"])
+router = APIRouter(prefix="/reviews", tags=["reviews"], route_class=MsgPackRoute)
 review_service = ReviewService(db)
 product_service = ProductService(db)
+rating_flight = SingleFlight("reviews.rating")
+review_fields = FieldSelector(ReviewResponse)
 
 
 def _build_review_response(review) -> ReviewResponse:
@@ -35,6 +41,19 @@ def _build_review_response(review) -> ReviewResponse:
     )
 
 
+def _render_product_rating(product_id: int) -> Optional[bytes]:
+    """Serialized rating statistics, or None if the product doesn't exist."""
+    if not product_service.get_product(product_id):
+        return None
+    stats = review_service.get_product_rating_stats(product_id)
+    return ProductRatingResponse(
+        product_id=product_id,
+        average_rating=stats["average_rating"],
+        review_count=stats["review_count"],
+        rating_distribution=stats["rating_distribution"],
+    ).model_dump_json().encode()
+
+
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 async def create_review(
     review_data: ReviewCreate,
@@ -70,8 +89,12 @@ async def create_review(
 
 
 @router.get("/product/{product_id}", response_model=List[ReviewResponse])
-async def get_product_reviews(product_id: int):
-    """Get all reviews for a product."""
+async def get_product_reviews(
+    product_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. rating,title"),
+):
+    """Get all reviews for a product, optionally with only some fields."""
+    field_set = review_fields.parse(fields)
     # Check if product exists
     product = product_service.get_product(product_id)
     if not product:
@@ -81,27 +104,25 @@ async def get_product_reviews(product_id: int):
         )
 
     reviews = review_service.get_product_reviews(product_id)
+    if field_set:
+        return review_fields.response(reviews, field_set)
     return [_build_review_response(review) for review in reviews]
 
 
 @router.get("/product/{product_id}/rating", response_model=ProductRatingResponse)
 async def get_product_rating(product_id: int):
-    """Get rating statistics for a product."""
-    # Check if product exists
-    product = product_service.get_product(product_id)
-    if not product:
+    """
+    Get rating statistics for a product.
+
+    Concurrent requests for the same product share one computation.
+    """
+    body = await rating_flight.run(product_id, _render_product_rating, product_id)
+    if body is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found",
         )
-
-    stats = review_service.get_product_rating_stats(product_id)
-    return ProductRatingResponse(
-        product_id=product_id,
-        average_rating=stats["average_rating"],
-        review_count=stats["review_count"],
-        rating_distribution=stats["rating_distribution"],
-    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/my", response_model=List[ReviewResponse])
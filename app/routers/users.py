@@ -2,29 +2,40 @@
 Users router - API endpoints for user management.
 """
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 
+from app.core.fields import FieldSelector
+from app.core.security import get_password_hash
+from app.core.wire import MsgPackRoute
 from app.database.db import db
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.services.user_service import UserService
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=MsgPackRoute)
 user_service = UserService(db)
+user_fields = FieldSelector(UserResponse)
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(user_data: UserCreate):
     """Create a new user."""
-    # Check if email already exists
-    existing_user = user_service.get_user_by_email(user_data.email)
-    if existing_user:
+    # Fail fast before hashing; checked again when the user is inserted
+    if user_service.get_user_by_email(user_data.email):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+    # bcrypt takes a while by design; keep the event loop free meanwhile
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
+    user = user_service.create_user(user_data, hashed_password)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    user = user_service.create_user(user_data)
     return UserResponse(
         id=user.id,
         email=user.email,
@@ -35,9 +46,14 @@ async def create_user(user_data: UserCreate):
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users():
-    """Get all users."""
+async def get_users(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,email"),
+):
+    """Get all users, optionally with only some fields."""
+    field_set = user_fields.parse(fields)
     users = user_service.get_all_users()
+    if field_set:
+        return user_fields.response(users, field_set)
     return [
         UserResponse(
             id=user.id,
@@ -71,7 +87,8 @@ async def get_user(user_id: int):
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(user_id: int, user_data: UserUpdate):
     """Update user data."""
-    user = user_service.update_user(user_id, user_data)
+    # May hash a new password with bcrypt; keep the event loop free meanwhile
+    user = await run_in_threadpool(user_service.update_user, user_id, user_data)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -2,6 +2,8 @@
 Pydantic schemas for authentication.
 """
 
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -10,6 +12,25 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token for new tokens."""
+
+    refresh_token: str = Field(..., description="Refresh token from login or refresh")
+
+
+class LogoutRequest(BaseModel):
+    """Schema for logout; the refresh token is revoked along with the access token."""
+
+    refresh_token: Optional[str] = Field(None, description="Refresh token to revoke")
+
+
+class RevokeTokenRequest(BaseModel):
+    """Schema for revoking a compromised access or refresh token."""
+
+    token: str = Field(..., description="Access or refresh token")
 
 
 class TokenData(BaseModel):
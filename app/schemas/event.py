@@ -0,0 +1,17 @@
+"""
+Pydantic schemas for the change stream.
+"""
+
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+
+class EventResponse(BaseModel):
+    """Schema for one entity mutation."""
+
+    seq: int
+    type: str
+    entity_id: int
+    data: Dict[str, Any]
+    timestamp: float
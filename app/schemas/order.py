@@ -3,9 +3,9 @@ Pydantic schemas for Order.
 """
 
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class OrderItemResponse(BaseModel):
@@ -37,3 +37,46 @@ class OrderResponse(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class OrderFilter(BaseModel):
+    """Schema for admin order queries."""
+
+    statuses: Optional[List[str]] = Field(None, description="Match any of these statuses")
+    created_from: Optional[datetime] = Field(None, description="Created at or after")
+    created_to: Optional[datetime] = Field(None, description="Created at or before")
+    min_total: Optional[float] = Field(None, ge=0, description="Minimum order total")
+    max_total: Optional[float] = Field(None, ge=0, description="Maximum order total")
+    product_id: Optional[int] = Field(None, description="Orders containing this product")
+    user_id: Optional[int] = Field(None, description="Orders placed by this user")
+    sort_by: Literal["created_at", "total", "id"] = "created_at"
+    descending: bool = True
+    offset: int = Field(0, ge=0)
+    limit: int = Field(50, ge=0, le=1000)
+    group_by: Optional[Literal["status", "day"]] = None
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def to_naive_local(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Stored created_at values are naive local time; compare like with like."""
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value
+
+
+class OrderAggregateResponse(BaseModel):
+    """Schema for aggregate figures over a group of orders."""
+
+    key: Optional[str] = None
+    count: int
+    revenue: float
+    average_order_value: float
+
+
+class OrderQueryResponse(BaseModel):
+    """Schema for admin order query results."""
+
+    total_count: int
+    orders: List[OrderResponse]
+    summary: OrderAggregateResponse
+    groups: List[OrderAggregateResponse] = []
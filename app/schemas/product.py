@@ -3,7 +3,7 @@ Pydantic schemas for Product.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -16,6 +16,7 @@ class ProductBase(BaseModel):
     price: float = Field(..., gt=0, description="Product price")
     stock: int = Field(..., ge=0, description="Available stock quantity")
     category: str = Field(..., min_length=1, description="Product category")
+    is_hot: bool = Field(False, description="Use sharded stock counters")
 
 
 class ProductCreate(ProductBase):
@@ -32,6 +33,7 @@ class ProductUpdate(BaseModel):
     price: Optional[float] = Field(None, gt=0, description="Product price")
     stock: Optional[int] = Field(None, ge=0, description="Available stock quantity")
     category: Optional[str] = Field(None, min_length=1, description="Product category")
+    is_hot: Optional[bool] = Field(None, description="Use sharded stock counters")
 
 
 class ProductResponse(ProductBase):
@@ -41,3 +43,21 @@ class ProductResponse(ProductBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ProductRecommendationResponse(BaseModel):
+    """Schema for a product frequently bought together with another."""
+
+    product_id: int
+    name: str
+    price: float
+    times_bought_together: int
+
+
+class SuggestionResponse(BaseModel):
+    """Schema for an autocomplete suggestion."""
+
+    kind: Literal["product", "category"]
+    id: int
+    name: str
+    score: float
@@ -0,0 +1,38 @@
+"""
+Pydantic schemas for sales reports.
+"""
+
+from datetime import date
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class DailyRevenueResponse(BaseModel):
+    """Schema for one day of revenue."""
+
+    day: date
+    revenue: float
+    units: int
+
+
+class ProductSalesResponse(BaseModel):
+    """Schema for units sold and revenue of one product."""
+
+    product_id: int
+    units: int
+    revenue: float
+
+
+class CohortRevenueResponse(BaseModel):
+    """Schema for revenue of a signup-week cohort in a given week."""
+
+    cohort_week: date
+    weeks_since_signup: int
+    revenue: float
+
+
+class TopSellersResponse(BaseModel):
+    """Schema for top sellers grouped by category."""
+
+    categories: Dict[str, List[ProductSalesResponse]]
@@ -6,10 +6,14 @@ from .user_service import UserService
 from .product_service import ProductService
 from .cart_service import CartService
 from .order_service import OrderService
+from .analytics_service import AnalyticsService
+from .recommendation_service import RecommendationService
 
 __all__ = [
     "UserService",
     "ProductService",
     "CartService",
     "OrderService",
+    "AnalyticsService",
+    "RecommendationService",
 ]
@@ -0,0 +1,198 @@
+"""
+Analytics service - sales reports computed over the order item fact table.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.database.db import Database
+
+SECONDS_PER_DAY = 86_400
+QUARTER_HOUR = 900
+
+
+def _local_days(timestamps: np.ndarray) -> np.ndarray:
+    """Local calendar day number (days since 1970-01-01) for each timestamp."""
+    # The UTC offset of each timestamp's own date (DST changes included).
+    # Offsets change on quarter-hour boundaries, so look them up once per
+    # quarter hour present rather than once per timestamp.
+    quarters, inverse = _group((timestamps // QUARTER_HOUR).astype(np.int64))
+    offsets = np.array([
+        datetime.fromtimestamp(int(quarter) * QUARTER_HOUR, timezone.utc)
+        .astimezone().utcoffset().total_seconds()
+        for quarter in quarters
+    ], dtype=np.float64)
+    return ((timestamps + offsets[inverse]) // SECONDS_PER_DAY).astype(np.int64)
+
+
+def _weeks(days: np.ndarray) -> np.ndarray:
+    """Monday-based week number; 1970-01-01 was a Thursday."""
+    return (days + 3) // 7
+
+
+def _week_start(week: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=int(week) * 7 - 3)
+
+
+def _group(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Like ``np.unique(keys, return_inverse=True)``.
+
+    Dense integer keys (ids, day numbers) are grouped with a lookup table in
+    O(n) instead of a sort.
+    """
+    if not len(keys):
+        return keys, keys
+    low, high = int(keys.min()), int(keys.max())
+    if high - low > 4 * len(keys) + 1024:
+        return np.unique(keys, return_inverse=True)
+    shifted = keys - low
+    present = np.flatnonzero(np.bincount(shifted))
+    lookup = np.empty(high - low + 1, dtype=np.int64)
+    lookup[present] = np.arange(len(present))
+    return present + low, lookup[shifted]
+
+
+class AnalyticsService:
+    """Service for sales analytics over the columnar order item facts."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def _facts(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Dict[str, np.ndarray]:
+        """Fact columns as of a snapshot, optionally restricted to [start, end)."""
+        with self.db.snapshot() as snapshot:
+            columns = snapshot.facts
+        if start is None and end is None:
+            return columns
+        timestamps = columns["timestamp"]
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start.timestamp()
+        if end is not None:
+            mask &= timestamps < end.timestamp()
+        return {name: column[mask] for name, column in columns.items()}
+
+    def daily_revenue(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[Dict]:
+        """Net revenue and units per calendar day."""
+        facts = self._facts(start, end)
+        days = _local_days(facts["timestamp"])
+        buckets, inverse = _group(days)
+        revenue = np.bincount(
+            inverse, weights=facts["quantity"] * facts["unit_price"],
+            minlength=len(buckets),
+        )
+        units = np.bincount(inverse, weights=facts["quantity"], minlength=len(buckets))
+        return [
+            {
+                "day": date(1970, 1, 1) + timedelta(days=int(day)),
+                "revenue": round(float(day_revenue), 2),
+                "units": int(day_units),
+            }
+            for day, day_revenue, day_units in zip(buckets, revenue, units)
+        ]
+
+    def units_by_product(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Net units sold and revenue per product, best sellers first."""
+        facts = self._facts(start, end)
+        product_ids, inverse = _group(facts["product_id"])
+        units = np.bincount(inverse, weights=facts["quantity"], minlength=len(product_ids))
+        revenue = np.bincount(
+            inverse, weights=facts["quantity"] * facts["unit_price"],
+            minlength=len(product_ids),
+        )
+        order = np.argsort(-units, kind="stable")[:limit]
+        return [
+            {
+                "product_id": int(product_ids[i]),
+                "units": int(units[i]),
+                "revenue": round(float(revenue[i]), 2),
+            }
+            for i in order
+        ]
+
+    def top_sellers_by_category(
+        self,
+        per_category: int = 5,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict[str, List[Dict]]:
+        """Top products by net units within each product category."""
+        per_product = self.units_by_product(start, end)
+        if not per_product:
+            return {}
+
+        product_ids = np.array([row["product_id"] for row in per_product])
+        units = np.array([row["units"] for row in per_product])
+        category_names = sorted({p.category for p in self.db.products.values()})
+        category_codes = {name: code for code, name in enumerate(category_names)}
+        codes = np.array([
+            category_codes[self.db.products[pid].category]
+            if pid in self.db.products else -1
+            for pid in product_ids.tolist()
+        ])
+
+        # Sort by category, then units descending; keep the first k per category
+        order = np.lexsort((-units, codes))
+        codes_sorted = codes[order]
+        starts = np.flatnonzero(np.r_[True, codes_sorted[1:] != codes_sorted[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        keep = order[(rank < per_category) & (codes_sorted >= 0)]
+
+        result: Dict[str, List[Dict]] = {}
+        for i in keep:
+            result.setdefault(category_names[codes[i]], []).append(per_product[i])
+        return result
+
+    def cohort_revenue(self) -> List[Dict]:
+        """Net revenue by user signup week and weeks since signup."""
+        facts = self._facts()
+        users = self.db.users
+        if not len(facts["user_id"]) or not users:
+            return []
+
+        user_ids = np.fromiter(users.keys(), dtype=np.int64, count=len(users))
+        signups = np.fromiter(
+            (user.created_at.timestamp() for user in users.values()),
+            dtype=np.float64, count=len(users),
+        )
+        by_id = np.argsort(user_ids)
+        user_ids, signups = user_ids[by_id], signups[by_id]
+
+        position = np.searchsorted(user_ids, facts["user_id"])
+        position = np.clip(position, 0, len(user_ids) - 1)
+        known = user_ids[position] == facts["user_id"]
+
+        cohort = _weeks(_local_days(signups[position]))
+        order_week = _weeks(_local_days(facts["timestamp"]))
+        cohort, offset = cohort[known], (order_week - cohort)[known]
+        revenue = (facts["quantity"] * facts["unit_price"])[known]
+
+        if not len(cohort):
+            return []
+
+        # Pack (cohort, offset) into one int64 key so grouping is a 1-D unique
+        min_offset = offset.min()
+        span = int(offset.max() - min_offset) + 1
+        keys = cohort * span + (offset - min_offset)
+        groups, inverse = _group(keys)
+        totals = np.bincount(inverse, weights=revenue, minlength=len(groups))
+        return [
+            {
+                "cohort_week": _week_start(key // span),
+                "weeks_since_signup": int(key % span + min_offset),
+                "revenue": round(float(total), 2),
+            }
+            for key, total in zip(groups, totals)
+        ]
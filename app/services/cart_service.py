@@ -4,6 +4,7 @@ Cart service - business logic for shopping cart management.
 
 from typing import Optional
 
+from app.core.tracing import traced
 from app.database.db import Database
 from app.models.cart import Cart, CartItem
 
@@ -16,10 +17,15 @@ class CartService:
 
     def get_cart(self, user_id: int) -> Cart:
         """Get or create cart for user."""
-        if user_id not in self.db.carts:
-            self.db.carts[user_id] = Cart(user_id=user_id)
-        return self.db.carts[user_id]
+        cart = self.db.carts.get(user_id)
+        if cart is None:
+            with self.db.user_lock(user_id):
+                cart = self.db.carts.get(user_id)
+                if cart is None:
+                    cart = self.db.carts[user_id] = Cart(user_id=user_id)
+        return cart
 
+    @traced
     def add_item(self, user_id: int, product_id: int, quantity: int) -> Optional[Cart]:
         """Add item to cart."""
         # Check if product exists
@@ -27,19 +33,26 @@ class CartService:
         if not product:
             return None
 
-        # Check stock availability
-        if product.stock < quantity:
+        # Check stock availability (checkout re-validates, so a cheap read is enough)
+        available = self.db.stock.available(product, exact=False)
+        if available < quantity:
             return None
 
+        with self.db.user_lock(user_id):
+            return self._add_item(user_id, product, quantity, available)
+
+    def _add_item(self, user_id: int, product, quantity: int, available: int) -> Optional[Cart]:
+        product_id = product.id
         cart = self.get_cart(user_id)
 
         # Check if item already in cart
         for item in cart.items:
             if item.product_id == product_id:
                 # Check if total quantity exceeds stock
-                if product.stock < item.quantity + quantity:
+                if available < item.quantity + quantity:
                     return None
                 item.quantity += quantity
+                self._item_changed(user_id, "item_updated", item)
                 return cart
 
         # Add new item
@@ -50,19 +63,25 @@ class CartService:
             unit_price=product.price,
         )
         cart.items.append(cart_item)
+        self._item_changed(user_id, "item_added", cart_item)
         return cart
 
     def remove_item(self, user_id: int, product_id: int) -> Optional[Cart]:
         """Remove item from cart."""
         cart = self.get_cart(user_id)
 
-        for i, item in enumerate(cart.items):
-            if item.product_id == product_id:
-                cart.items.pop(i)
-                return cart
+        with self.db.user_lock(user_id):
+            for i, item in enumerate(cart.items):
+                if item.product_id == product_id:
+                    cart.items.pop(i)
+                    self.db.events.append(
+                        "cart", "item_removed", user_id, {"product_id": product_id}
+                    )
+                    return cart
 
         return None  # Item not found
 
+    @traced
     def update_item_quantity(
         self, user_id: int, product_id: int, quantity: int
     ) -> Optional[Cart]:
@@ -71,20 +90,30 @@ class CartService:
             return self.remove_item(user_id, product_id)
 
         product = self.db.products.get(product_id)
-        if not product or product.stock < quantity:
+        if not product or self.db.stock.available(product, exact=False) < quantity:
             return None
 
         cart = self.get_cart(user_id)
 
-        for item in cart.items:
-            if item.product_id == product_id:
-                item.quantity = quantity
-                return cart
+        with self.db.user_lock(user_id):
+            for item in cart.items:
+                if item.product_id == product_id:
+                    item.quantity = quantity
+                    self._item_changed(user_id, "item_updated", item)
+                    return cart
 
         return None  # Item not found
 
     def clear_cart(self, user_id: int) -> Cart:
         """Clear all items from cart."""
         cart = self.get_cart(user_id)
-        cart.items.clear()
+        with self.db.user_lock(user_id):
+            cart.items.clear()
+        self.db.events.append("cart", "cleared", user_id)
         return cart
+
+    def _item_changed(self, user_id: int, action: str, item: CartItem):
+        self.db.events.append("cart", action, user_id, {
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+        })
@@ -5,6 +5,7 @@ Category service - business logic for category management.
 from typing import List, Optional
 
 from app.database.db import Database
+from app.database.prefix_index import category_ref
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
 
@@ -25,6 +26,11 @@ class CategoryService:
             parent_id=category_data.parent_id,
         )
         self.db.categories[category_id] = category
+        self.db.names.add(category_ref(category_id), category.name)
+        self.db.events.append("category", "created", category_id, {
+            "name": category.name,
+            "parent_id": category.parent_id,
+        })
         return category
 
     def get_category(self, category_id: int) -> Optional[Category]:
@@ -57,15 +63,21 @@ class CategoryService:
         if not category:
             return None
 
-        if category_data.name is not None:
+        changes = category_data.model_dump(exclude_none=True)
+        if category_data.name is not None and category_data.name != category.name:
             category.name = category_data.name
+            self.db.names.rename(category_ref(category_id), category.name)
         if category_data.description is not None:
             category.description = category_data.description
         if category_data.parent_id is not None:
             # Prevent circular reference
             if category_data.parent_id != category_id:
                 category.parent_id = category_data.parent_id
+            else:
+                del changes["parent_id"]
 
+        if changes:
+            self.db.events.append("category", "updated", category_id, changes)
         return category
 
     def delete_category(self, category_id: int) -> bool:
@@ -74,6 +86,8 @@ class CategoryService:
             # Update products with this category
             # (in real app would need more sophisticated handling)
             del self.db.categories[category_id]
+            self.db.names.remove(category_ref(category_id))
+            self.db.events.append("category", "deleted", category_id)
             return True
         return False
 
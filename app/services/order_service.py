@@ -2,12 +2,17 @@
 Order service - business logic for order management.
 """
 
-from typing import List, Optional
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import dicttoxml
 
+from app.core.tracing import traced
 from app.database.db import Database
+from app.database.prefix_index import product_ref
 from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderFilter
 
 
 class OrderService:
@@ -16,21 +21,31 @@ class OrderService:
     def __init__(self, db: Database):
         self.db = db
 
+    @traced
     def create_order_from_cart(self, user_id: int) -> Optional[Order]:
         """Create order from user's cart."""
+        with self.db.user_lock(user_id):
+            return self._create_order_from_cart(user_id)
+
+    def _create_order_from_cart(self, user_id: int) -> Optional[Order]:
         # Get cart
         cart = self.db.carts.get(user_id)
         if not cart or not cart.items:
             return None
 
-        # Validate stock and create order items
+        # Reserve stock and create order items
         order_items = []
+        reserved = []
         total = 0.0
 
         for cart_item in cart.items:
             product = self.db.products.get(cart_item.product_id)
-            if not product or product.stock < cart_item.quantity:
-                return None  # Insufficient stock
+            if not product or not self.db.stock.reserve(product, cart_item.quantity):
+                # Insufficient stock - give back what was already reserved
+                for reserved_product, quantity in reserved:
+                    self.db.stock.release(reserved_product, quantity)
+                return None
+            reserved.append((product, cart_item.quantity))
 
             order_item = OrderItem(
                 product_id=cart_item.product_id,
@@ -41,11 +56,8 @@ class OrderService:
             order_items.append(order_item)
             total += order_item.get_total()
 
-            # Decrease stock
-            product.stock -= cart_item.quantity
-
         # Create order
-        order_id = self.db.get_next_order_id()
+        order_id = self.db.get_next_order_id(user_id)
         order = Order(
             id=order_id,
             user_id=user_id,
@@ -53,25 +65,87 @@ class OrderService:
             total=total,
         )
         self.db.orders[order_id] = order
+        self.db.order_index.add(order)
 
         # Clear cart
         cart.items.clear()
 
+        self.db.events.append("order", "created", order_id, {
+            "user_id": user_id,
+            "total": total,
+            "items": [[item.product_id, item.quantity] for item in order_items],
+        })
+        self.db.events.append("cart", "cleared", user_id)
+        for product, _ in reserved:
+            self._stock_changed(product)
         return order
 
+    def process_placed_order(self, order_id: int):
+        """
+        Side effects of a new order, run as a background job.
+
+        Records the order in the sales aggregates, confirms it and renders
+        its XML export. Safe to retry: every step checks whether it was
+        already done, and a cancelled order is left alone.
+        """
+        order = self.db.orders.get(order_id)
+        if not order:
+            return
+        with self.db.user_lock(order.user_id):
+            # Re-read: the order may have been replaced before we got the lock
+            order = self.db.orders[order_id]
+            if order.status == OrderStatus.CANCELLED:
+                return
+            if order_id not in self.db.aggregated_orders:
+                self._record_aggregates(order)
+            if order.status == OrderStatus.PENDING:
+                self.update_order_status(order_id, OrderStatus.CONFIRMED)
+        self.get_order_as_xml(order_id)
+
+    def _record_aggregates(self, order: Order, sign: int = 1):
+        self.db.facts.record_order(order, reverse=sign < 0)
+        self.db.copurchases.record_order(order, delta=sign)
+        self._record_popularity(order, sign)
+        if sign > 0:
+            self.db.aggregated_orders.add(order.id)
+        else:
+            self.db.aggregated_orders.discard(order.id)
+
+    def _record_popularity(self, order: Order, sign: int = 1):
+        """Weight autocomplete suggestions by units sold."""
+        for item in order.items:
+            self.db.names.bump(product_ref(item.product_id), sign * item.quantity)
+            product = self.db.products.get(item.product_id)
+            if product:
+                for ref in self.db.names.find(product.category):
+                    if ref < 0:
+                        self.db.names.bump(ref, sign * item.quantity)
+
     def get_order(self, order_id: int) -> Optional[Order]:
         """Get order by ID."""
         return self.db.orders.get(order_id)
 
     def get_orders_by_user(self, user_id: int) -> List[Order]:
-        """Get all orders for a user."""
+        """Get all orders for a user, newest first."""
         return [
-            order for order in self.db.orders.values() if order.user_id == user_id
+            self.db.orders[order_id]
+            for order_id in self.db.order_index.user_order_ids(user_id)
         ]
 
+    @traced
+    def get_orders_page(
+        self, user_id: int, cursor: Optional[int] = None, limit: int = 20
+    ) -> Tuple[List[Order], Optional[int]]:
+        """Get one page of a user's orders, newest first, plus the next cursor."""
+        order_ids, next_cursor = self.db.order_index.user_order_page(
+            user_id, cursor, limit
+        )
+        return [self.db.orders[order_id] for order_id in order_ids], next_cursor
+
     def get_all_orders(self) -> List[Order]:
-        """Get all orders."""
-        return list(self.db.orders.values())
+        """Get all orders, as of one snapshot."""
+        with self.db.snapshot() as snapshot:
+            return list(snapshot.orders.values())
 
     def update_order_status(
         self, order_id: int, status: OrderStatus
@@ -81,29 +155,62 @@ class OrderService:
         if not order:
             return None
 
-        order.status = status
+        with self.db.user_lock(order.user_id):
+            # Orders are replaced, never changed in place, so snapshots keep theirs
+            current = self.db.orders[order_id]
+            order = self.db.orders[order_id] = replace(current, status=status)
+            self.db.order_index.set_status(order, current.status)
+            self.db.order_exports.pop(order_id, None)
+        self.db.events.append("order", "status", order_id, {"status": status.value})
         return order
 
+    @traced
     def cancel_order(self, order_id: int) -> Optional[Order]:
         """Cancel order and restore stock."""
         order = self.db.orders.get(order_id)
         if not order:
             return None
+        with self.db.user_lock(order.user_id):
+            return self._cancel_order(self.db.orders[order_id])
 
+    def _cancel_order(self, order: Order) -> Optional[Order]:
+        order_id = order.id
         if order.status not in [OrderStatus.PENDING, OrderStatus.CONFIRMED]:
             return None  # Cannot cancel shipped/delivered orders
 
         # Restore stock
+        restored = []
         for item in order.items:
             product = self.db.products.get(item.product_id)
             if product:
-                product.stock += item.quantity
+                self.db.stock.release(product, item.quantity)
+                restored.append(product)
 
-        order.status = OrderStatus.CANCELLED
+        old_status = order.status
+        order = self.db.orders[order_id] = replace(order, status=OrderStatus.CANCELLED)
+        self.db.order_index.set_status(order, old_status)
+        self.db.order_index.cancel(order)
+        self.db.order_exports.pop(order_id, None)
+        if order_id in self.db.aggregated_orders:
+            self._record_aggregates(order, sign=-1)
+        self.db.events.append(
+            "order", "status", order_id, {"status": OrderStatus.CANCELLED.value}
+        )
+        for product in restored:
+            self._stock_changed(product)
         return order
 
+    def _stock_changed(self, product):
+        self.db.events.append("product", "stock", product.id, {
+            "stock": self.db.stock.available(product, exact=False),
+        })
+
     def get_order_as_xml(self, order_id: int) -> Optional[str]:
-        """Get order details in XML format."""
+        """Get order details in XML format, rendered once per status."""
+        export = self.db.order_exports.get(order_id)
+        if export is not None:
+            return export
+
         order = self.db.orders.get(order_id)
         if not order:
             return None
@@ -114,4 +221,112 @@ class OrderService:
             custom_root="order",
             attr_type=False
         )
-        return xml_bytes.decode("utf-8")
+        export = self.db.order_exports[order_id] = xml_bytes.decode("utf-8")
+        return export
+
+    @traced
+    def query_orders(self, order_filter: OrderFilter) -> Tuple[List[Order], int, Dict]:
+        """
+        Filter, sort and aggregate orders.
+
+        Candidates come from the most selective index that applies (user,
+        product, status or created_at range); the remaining predicates are
+        checked per order. Returns (page, total_count, aggregates).
+        """
+        with self.db.snapshot() as snapshot:
+            matches = [
+                order for order in self._candidate_orders(snapshot.orders, order_filter)
+                if self._matches(order, order_filter)
+            ]
+
+        sort_key = {
+            "created_at": lambda order: order.created_at,
+            "total": lambda order: order.total,
+            "id": lambda order: order.id,
+        }[order_filter.sort_by]
+        matches.sort(key=sort_key, reverse=order_filter.descending)
+        page = matches[order_filter.offset:order_filter.offset + order_filter.limit]
+
+        return page, len(matches), self._aggregate(matches, order_filter.group_by)
+
+    def _candidate_orders(self, orders, order_filter: OrderFilter) -> Iterable[Order]:
+        """Pick the smallest index-backed candidate set for the filter."""
+        index = self.db.order_index
+        candidates = []  # (size, ids factory)
+
+        if order_filter.user_id is not None:
+            ids = index.by_user.get(order_filter.user_id, [])
+            candidates.append((len(ids), lambda ids=ids: ids))
+        if order_filter.product_id is not None:
+            ids = index.by_product.get(order_filter.product_id, [])
+            candidates.append((len(ids), lambda ids=ids: ids))
+        if order_filter.statuses:
+            buckets = [index.by_status.get(status, ()) for status in order_filter.statuses]
+            candidates.append((
+                sum(len(bucket) for bucket in buckets),
+                lambda buckets=buckets: [i for bucket in buckets for i in bucket],
+            ))
+        if order_filter.created_from or order_filter.created_to:
+            start, end = order_filter.created_from, order_filter.created_to
+            candidates.append((
+                index.count_created_between(start, end),
+                lambda: index.created_between(start, end),
+            ))
+
+        if not candidates:
+            return orders.values()
+
+        _, ids_factory = min(candidates, key=lambda candidate: candidate[0])
+        return (orders[order_id] for order_id in ids_factory() if order_id in orders)
+
+    @staticmethod
+    def _matches(order: Order, order_filter: OrderFilter) -> bool:
+        if order_filter.user_id is not None and order.user_id != order_filter.user_id:
+            return False
+        if order_filter.statuses and order.status.value not in order_filter.statuses:
+            return False
+        if order_filter.created_from and order.created_at < order_filter.created_from:
+            return False
+        if order_filter.created_to and order.created_at > order_filter.created_to:
+            return False
+        if order_filter.min_total is not None and order.total < order_filter.min_total:
+            return False
+        if order_filter.max_total is not None and order.total > order_filter.max_total:
+            return False
+        if order_filter.product_id is not None and not any(
+            item.product_id == order_filter.product_id for item in order.items
+        ):
+            return False
+        return True
+
+    @staticmethod
+    def _aggregate(orders: List[Order], group_by: Optional[str]) -> Dict:
+        """Count, revenue and average order value, overall and per group."""
+        def summarize(key, count, revenue):
+            return {
+                "key": key,
+                "count": count,
+                "revenue": round(revenue, 2),
+                "average_order_value": round(revenue / count, 2) if count else 0.0,
+            }
+
+        revenue = sum(order.total for order in orders)
+        result = {"summary": summarize(None, len(orders), revenue), "groups": []}
+        if not group_by:
+            return result
+
+        groups = defaultdict(lambda: [0, 0.0])
+        for order in orders:
+            if group_by == "status":
+                key = order.status.value
+            else:
+                key = order.created_at.date().isoformat()
+            group = groups[key]
+            group[0] += 1
+            group[1] += order.total
+
+        result["groups"] = [
+            summarize(key, count, group_revenue)
+            for key, (count, group_revenue) in sorted(groups.items())
+        ]
+        return result
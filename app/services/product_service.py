@@ -2,9 +2,11 @@
 Product service - business logic for product management.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from app.core.tracing import traced
 from app.database.db import Database
+from app.database.prefix_index import product_ref
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate
 
@@ -27,24 +29,43 @@ class ProductService:
             category=product_data.category,
         )
         self.db.products[product_id] = product
+        self.db.names.add(product_ref(product_id), product.name)
+        self.db.search.add(product_id, product.name)
+        if product_data.is_hot:
+            self.db.stock.make_hot(product)
+        self.db.events.append("product", "created", product_id, {
+            "name": product.name,
+            "price": product.price,
+            "stock": product.stock,
+            "category": product.category,
+        })
         return product
 
     def get_product(self, product_id: int) -> Optional[Product]:
         """Get product by ID."""
-        return self.db.products.get(product_id)
+        product = self.db.products.get(product_id)
+        if product and product.is_hot:
+            self.db.stock.refresh(product)
+        return product
 
     def get_all_products(self) -> List[Product]:
         """Get all products."""
-        return list(self.db.products.values())
+        return [self._refresh(product) for product in self.db.products.values()]
 
     def get_products_by_category(self, category: str) -> List[Product]:
         """Get products by category."""
         return [
-            product
+            self._refresh(product)
             for product in self.db.products.values()
             if product.category.lower() == category.lower()
         ]
 
+    def _refresh(self, product: Product) -> Product:
+        """Make product.stock exact for hot products."""
+        if product.is_hot:
+            self.db.stock.refresh(product)
+        return product
+
     def update_product(
         self, product_id: int, product_data: ProductUpdate
     ) -> Optional[Product]:
@@ -53,23 +74,37 @@ class ProductService:
         if not product:
             return None
 
-        if product_data.name is not None:
+        changes = product_data.model_dump(exclude_none=True)
+        if product_data.name is not None and product_data.name != product.name:
             product.name = product_data.name
+            self.db.names.rename(product_ref(product_id), product.name)
+            self.db.search.add(product_id, product.name)
         if product_data.description is not None:
             product.description = product_data.description
         if product_data.price is not None:
             product.price = product_data.price
         if product_data.stock is not None:
-            product.stock = product_data.stock
+            self.db.stock.set(product, product_data.stock)
         if product_data.category is not None:
             product.category = product_data.category
+        if product_data.is_hot is True:
+            self.db.stock.make_hot(product)
+        elif product_data.is_hot is False:
+            self.db.stock.make_cold(product)
 
-        return product
+        if changes:
+            self.db.events.append("product", "updated", product_id, changes)
+        return self._refresh(product)
 
     def delete_product(self, product_id: int) -> bool:
         """Delete product by ID."""
         if product_id in self.db.products:
             del self.db.products[product_id]
+            self.db.stock.forget(product_id)
+            self.db.copurchases.forget(product_id)
+            self.db.names.remove(product_ref(product_id))
+            self.db.search.remove(product_id)
+            self.db.events.append("product", "deleted", product_id)
             return True
         return False
 
@@ -79,9 +114,39 @@ class ProductService:
         if not product:
             return False
 
-        new_stock = product.stock + quantity_change
-        if new_stock < 0:
-            return False
-
-        product.stock = new_stock
+        if quantity_change < 0:
+            if not self.db.stock.reserve(product, -quantity_change):
+                return False
+        else:
+            self.db.stock.release(product, quantity_change)
+        self.db.events.append("product", "stock", product_id, {
+            "stock": self.db.stock.available(product, exact=False),
+        })
         return True
+
+    @traced
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Most popular product and category names starting with prefix."""
+        suggestions = []
+        for ref, score in self.db.names.suggest(prefix, limit):
+            if ref > 0:
+                entity, kind = self.db.products.get(ref), "product"
+            else:
+                entity, kind = self.db.categories.get(-ref), "category"
+            if entity:
+                suggestions.append(
+                    {"kind": kind, "id": entity.id, "name": entity.name, "score": score}
+                )
+        return suggestions
+
+    @traced
+    def search_products(
+        self, query: str, fuzzy: bool = False, limit: int = 20
+    ) -> List[Product]:
+        """Products whose names contain every query word, closest matches first."""
+        products = []
+        for product_id, _ in self.db.search.search(query, fuzzy, limit):
+            product = self.db.products.get(product_id)
+            if product:
+                products.append(self._refresh(product))
+        return products
@@ -0,0 +1,210 @@
+"""
+Product stream service - live price and stock updates for open product pages.
+
+One hub per worker tails the change stream and fans product updates out to
+every connection watching the product. Updates are coalesced twice:
+
+- per tick, a product that changed many times is sent once, with its
+  latest price and stock;
+- per connection, updates the client has not read yet are merged into one
+  pending batch instead of queueing up. Memory per connection is bounded by
+  the number of products it watches, however slow the client is.
+
+A connection that leaves a batch unread for longer than max_stall seconds
+is closed. Clients watching a product that changed too often for the hub
+to keep up (events left the ring buffer) get a fresh snapshot instead.
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.database.db import Database
+from app.database.event_log import Event, Subscription
+
+STREAMED_FIELDS = ("price", "stock")
+
+
+class StreamConnection:
+    """One client watching a set of products."""
+
+    def __init__(self, product_ids: Iterable[int]):
+        self.product_ids: Set[int] = set(product_ids)
+        self.pending: Dict[int, str] = {}
+        self.seq = 0
+        self.closed = False
+        self.last_read = time.monotonic()
+        self._waiter: Optional[asyncio.Future] = None
+
+    def push(self, fragments: Dict[int, str], seq: int, now: Optional[float] = None):
+        if not self.pending:
+            # Start of the stall clock
+            self.last_read = now or time.monotonic()
+        self.pending.update(fragments)
+        self.seq = seq
+        self._wake()
+
+    async def next_batch(self, timeout: float) -> Optional[bytes]:
+        """
+        JSON object of all pending updates, keyed by product id.
+
+        None if nothing arrived within timeout seconds or the connection
+        was closed.
+        """
+        if not self.pending and not self.closed:
+            # A bare future and timer: wait_for would start a task per call
+            loop = asyncio.get_running_loop()
+            self._waiter = loop.create_future()
+            timer = loop.call_later(timeout, self._wake)
+            try:
+                await self._waiter
+            finally:
+                timer.cancel()
+                self._waiter = None
+        if self.closed or not self.pending:
+            return None
+        pending, self.pending = self.pending, {}
+        self.last_read = time.monotonic()
+        return ("{" + ",".join(pending.values()) + "}").encode()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class ProductStreamService:
+    """Fans product price and stock changes out to stream connections."""
+
+    def __init__(self, db: Database, tick: float = 0.1, max_stall: float = 30.0):
+        self.db = db
+        self.tick = tick
+        self.max_stall = max_stall
+        self._watchers: Dict[int, Set[StreamConnection]] = {}
+        self._connections: Set[StreamConnection] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._subscription: Optional[Subscription] = None
+        self.ticks = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def connect(self, product_ids: Iterable[int]) -> StreamConnection:
+        """Watch products; the first batch holds their current state."""
+        connection = StreamConnection(product_ids)
+        connection.push(self._snapshot(connection.product_ids), self.db.events.last_seq)
+        self._connections.add(connection)
+        for product_id in connection.product_ids:
+            self._watchers.setdefault(product_id, set()).add(connection)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._stop()
+            # Subscribe now, so no change after the snapshot above is missed
+            self._subscription = self.db.events.subscribe("products.stream")
+            self._task = loop.create_task(self._run(self._subscription))
+        return connection
+
+    def disconnect(self, connection: StreamConnection):
+        connection.close()
+        self._connections.discard(connection)
+        for product_id in connection.product_ids:
+            watchers = self._watchers.get(product_id)
+            if watchers is not None:
+                watchers.discard(connection)
+                if not watchers:
+                    del self._watchers[product_id]
+        if not self._connections:
+            # Nobody is listening: stop tailing the change stream
+            self._stop()
+
+    def _stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+
+    async def _run(self, subscription: Subscription):
+        while True:
+            missed = subscription.missed
+            events = await subscription.next(timeout=self.max_stall)
+            if not events:
+                self._evict_stalled()
+                continue
+            # Let the rest of a burst arrive, then send it as one batch
+            await asyncio.sleep(self.tick)
+            events += subscription.poll(limit=self.db.events.capacity)
+            self.ticks += 1
+            if subscription.missed > missed:
+                changes = self._snapshot(self._watchers)
+            else:
+                changes = self._changes(events)
+            self._fan_out(changes, subscription.cursor)
+            self._evict_stalled()
+
+    def _changes(self, events: List[Event]) -> Dict[int, str]:
+        """Latest streamed fields per watched product, as JSON fragments."""
+        latest: Dict[int, dict] = {}
+        for event in events:
+            if event.entity != "product" or event.entity_id not in self._watchers:
+                continue
+            if event.action == "deleted":
+                latest[event.entity_id] = {"deleted": True}
+                continue
+            fields = {
+                name: event.data[name] for name in STREAMED_FIELDS if name in event.data
+            }
+            if fields:
+                latest.setdefault(event.entity_id, {}).update(fields)
+        return {
+            product_id: _fragment(product_id, fields)
+            for product_id, fields in latest.items()
+        }
+
+    def _snapshot(self, product_ids: Iterable[int]) -> Dict[int, str]:
+        fragments = {}
+        for product_id in product_ids:
+            product = self.db.products.get(product_id)
+            if product is None:
+                fields = {"deleted": True}
+            else:
+                fields = {
+                    "price": product.price,
+                    "stock": self.db.stock.available(product, exact=False),
+                }
+            fragments[product_id] = _fragment(product_id, fields)
+        return fragments
+
+    def _fan_out(self, changes: Dict[int, str], seq: int):
+        batches: Dict[StreamConnection, Dict[int, str]] = {}
+        for product_id, fragment in changes.items():
+            for connection in self._watchers.get(product_id, ()):
+                batches.setdefault(connection, {})[product_id] = fragment
+        now = time.monotonic()
+        for connection, fragments in batches.items():
+            connection.push(fragments, seq, now)
+        self.batches += len(batches)
+
+    def _evict_stalled(self):
+        deadline = time.monotonic() - self.max_stall
+        for connection in list(self._connections):
+            if connection.pending and connection.last_read < deadline:
+                self.dropped += 1
+                self.disconnect(connection)
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._connections),
+            "watched_products": len(self._watchers),
+            "ticks": self.ticks,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+
+def _fragment(product_id: int, fields: dict) -> str:
+    return f'"{product_id}":' + json.dumps(fields, separators=(",", ":"))
@@ -0,0 +1,78 @@
+"""
+Recommendation service - "frequently bought together" from co-purchases.
+"""
+
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.database.copurchase import count_pairs
+from app.database.db import Database
+from app.models.product import Product
+
+# Below this many orders a process pool costs more than it saves
+PARALLEL_REBUILD_THRESHOLD = 50_000
+
+
+class RecommendationService:
+    """Service for product recommendations based on co-purchases."""
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def get_recommendations(
+        self, product_id: int, limit: int = 10
+    ) -> List[Tuple[Product, int]]:
+        """Products most often bought together with product_id, with counts."""
+        recommendations = []
+        # Ask for a few extra in case some neighbours were deleted
+        for neighbour_id, count in self.db.copurchases.top(product_id, limit + 5):
+            product = self.db.products.get(neighbour_id)
+            if product:
+                recommendations.append((product, count))
+                if len(recommendations) == limit:
+                    break
+        return recommendations
+
+    def rebuild(self, workers: Optional[int] = None) -> int:
+        """
+        Recount co-purchases from all orders in the sales aggregates.
+
+        Counts a snapshot, then replays orders recorded since, so none are
+        lost or counted twice. Large histories are split into chunks counted
+        in worker processes and merged. Returns the number of orders counted.
+        """
+        copurchases = self.db.copurchases
+        copurchases.begin_rebuild()
+        try:
+            with self.db.snapshot() as snapshot:
+                # Orders not aggregated yet are recorded by their placement job
+                baskets = [
+                    [item.product_id for item in order.items]
+                    for order in snapshot.orders.values()
+                    if order.id in snapshot.aggregated_orders
+                ]
+                version = snapshot.copurchases_version
+
+            workers = workers or os.cpu_count() or 1
+            if workers == 1 or len(baskets) < PARALLEL_REBUILD_THRESHOLD:
+                pairs = count_pairs(baskets)
+            else:
+                chunk_size = -(-len(baskets) // workers)
+                chunks = [
+                    baskets[start:start + chunk_size]
+                    for start in range(0, len(baskets), chunk_size)
+                ]
+                pairs = Counter()
+                # Forking a threaded server can copy held locks; spawn instead
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    for partial in pool.map(count_pairs, chunks):
+                        pairs.update(partial)
+
+            copurchases.load(pairs, since_version=version)
+        finally:
+            copurchases.end_rebuild()
+        return len(baskets)
@@ -2,7 +2,8 @@
 Review service - business logic for product reviews.
 """
 
-from typing import List, Optional, Dict
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional
 
 from app.database.db import Database
 from app.models.review import Review
@@ -19,12 +20,18 @@ class ReviewService:
         self, user_id: int, review_data: ReviewCreate, is_verified: bool = False
     ) -> Optional[Review]:
         """Create a new review."""
+        with self.db.user_lock(user_id):
+            return self._create_review(user_id, review_data, is_verified)
+
+    def _create_review(
+        self, user_id: int, review_data: ReviewCreate, is_verified: bool
+    ) -> Optional[Review]:
         # Check if user already reviewed this product
         existing = self.get_user_review_for_product(user_id, review_data.product_id)
         if existing:
             return None  # User already reviewed this product
 
-        review_id = self.db.get_next_review_id()
+        review_id = self.db.get_next_review_id(user_id)
         review = Review(
             id=review_id,
             product_id=review_data.product_id,
@@ -35,6 +42,10 @@ class ReviewService:
             is_verified_purchase=is_verified,
         )
         self.db.reviews[review_id] = review
+        self.db.events.append("review", "created", review_id, {
+            "product_id": review.product_id,
+            "rating": review.rating,
+        })
         return review
 
     def get_review(self, review_id: int) -> Optional[Review]:
@@ -72,55 +83,80 @@ class ReviewService:
         if not review or review.user_id != user_id:
             return None
 
-        if review_data.rating is not None:
-            review.rating = review_data.rating
-        if review_data.title is not None:
-            review.title = review_data.title
-        if review_data.comment is not None:
-            review.comment = review_data.comment
-
+        changes = review_data.model_dump(exclude_none=True)
+        if changes:
+            with self.db.user_lock(user_id):
+                review = self.db.reviews.get(review_id)
+                if review is None:
+                    return None
+                # Replaced, not changed in place, so snapshots keep the old review
+                review = self.db.reviews[review_id] = replace(review, **changes)
+            changes["product_id"] = review.product_id
+            self.db.events.append("review", "updated", review_id, changes)
         return review
 
     def delete_review(self, review_id: int, user_id: int) -> bool:
         """Delete review by ID (only by owner)."""
-        review = self.db.reviews.get(review_id)
-        if review and review.user_id == user_id:
+        with self.db.user_lock(user_id):
+            review = self.db.reviews.get(review_id)
+            if not review or review.user_id != user_id:
+                return False
             del self.db.reviews[review_id]
-            return True
-        return False
+        self.db.events.append(
+            "review", "deleted", review_id, {"product_id": review.product_id}
+        )
+        return True
 
     def get_product_rating_stats(self, product_id: int) -> Dict:
         """Get rating statistics for a product."""
-        reviews = self.get_product_reviews(product_id)
+        return _rating_stats(self.get_product_reviews(product_id))
+
+    def get_rating_stats(self, product_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        Rating statistics for many products, in one pass over the reviews.
+
+        Products without reviews are left out.
+        """
+        wanted = set(product_ids)
+        by_product: Dict[int, List[Review]] = {}
+        with self.db.snapshot() as snapshot:
+            for review in snapshot.reviews.values():
+                if review.product_id in wanted:
+                    by_product.setdefault(review.product_id, []).append(review)
+        return {
+            product_id: _rating_stats(reviews)
+            for product_id, reviews in by_product.items()
+        }
+
+    def check_verified_purchase(self, user_id: int, product_id: int) -> bool:
+        """Check if user has purchased the product (verified purchase)."""
+        return self.db.order_index.has_purchased(user_id, product_id)
 
-        if not reviews:
-            return {
-                "average_rating": 0.0,
-                "review_count": 0,
-                "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
-            }
 
-        rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        total_rating = 0
+def empty_rating_stats() -> Dict:
+    """Rating statistics of a product without reviews."""
+    return {
+        "average_rating": 0.0,
+        "review_count": 0,
+        "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
+    }
 
-        for review in reviews:
-            rating_distribution[review.rating] += 1
-            total_rating += review.rating
 
-        average_rating = round(total_rating / len(reviews), 2)
+def _rating_stats(reviews: List[Review]) -> Dict:
+    if not reviews:
+        return empty_rating_stats()
 
-        return {
-            "average_rating": average_rating,
-            "review_count": len(reviews),
-            "rating_distribution": rating_distribution,
-        }
+    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+    total_rating = 0
 
-    def check_verified_purchase(self, user_id: int, product_id: int) -> bool:
-        """Check if user has purchased the product (verified purchase)."""
-        # Check orders for this user containing this product
-        for order in self.db.orders.values():
-            if order.user_id == user_id:
-                for item in order.items:
-                    if item.product_id == product_id:
-                        return True
-        return False
+    for review in reviews:
+        rating_distribution[review.rating] += 1
+        total_rating += review.rating
+
+    average_rating = round(total_rating / len(reviews), 2)
+
+    return {
+        "average_rating": average_rating,
+        "review_count": len(reviews),
+        "rating_distribution": rating_distribution,
+    }
@@ -2,13 +2,16 @@
 User service - business logic for user management.
 """
 
-import hashlib
+import threading
 from typing import List, Optional
 
+from app.core.security import get_password_hash
 from app.database.db import Database
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+_registration_lock = threading.Lock()
+
 
 class UserService:
     """Service for managing users."""
@@ -16,20 +19,29 @@ class UserService:
     def __init__(self, db: Database):
         self.db = db
 
-    def _hash_password(self, password: str) -> str:
-        """Hash password using SHA256."""
-        return hashlib.sha256(password.encode()).hexdigest()
-
-    def create_user(self, user_data: UserCreate) -> User:
-        """Create a new user."""
-        user_id = self.db.get_next_user_id()
-        user = User(
-            id=user_id,
-            email=user_data.email,
-            full_name=user_data.full_name,
-            hashed_password=self._hash_password(user_data.password),
-        )
-        self.db.users[user_id] = user
+    def create_user(
+        self, user_data: UserCreate, hashed_password: Optional[str] = None
+    ) -> Optional[User]:
+        """
+        Create a new user; None if the email is already registered.
+
+        Pass hashed_password when the (slow) hash was computed beforehand.
+        """
+        if hashed_password is None:
+            hashed_password = get_password_hash(user_data.password)
+        # The email check and the insert must not interleave with another sign-up
+        with _registration_lock:
+            if self.get_user_by_email(user_data.email):
+                return None
+            user_id = self.db.get_next_user_id()
+            user = User(
+                id=user_id,
+                email=user_data.email,
+                full_name=user_data.full_name,
+                hashed_password=hashed_password,
+            )
+            self.db.users[user_id] = user
+        self.db.events.append("user", "created", user_id, {"email": user.email})
         return user
 
     def get_user(self, user_id: int) -> Optional[User]:
@@ -51,16 +63,33 @@ class UserService:
         if user_data.full_name is not None:
             user.full_name = user_data.full_name
         if user_data.password is not None:
-            user.hashed_password = self._hash_password(user_data.password)
+            user.hashed_password = get_password_hash(user_data.password)
         if user_data.is_active is not None:
             user.is_active = user_data.is_active
 
+        # Only which fields changed, never the password itself
+        changes = sorted(user_data.model_dump(exclude_none=True))
+        if changes:
+            self.db.events.append("user", "updated", user_id, {"fields": changes})
         return user
 
+    def upgrade_password_hash(self, user_id: int, new_hash: str, old_hash: str) -> bool:
+        """
+        Replace old_hash with new_hash, computed from the verified password.
+
+        Skipped if the password was changed since old_hash was verified.
+        """
+        user = self.db.users.get(user_id)
+        if not user or user.hashed_password != old_hash:
+            return False
+        user.hashed_password = new_hash
+        return True
+
     def delete_user(self, user_id: int) -> bool:
         """Delete user by ID."""
         if user_id in self.db.users:
             del self.db.users[user_id]
+            self.db.events.append("user", "deleted", user_id)
             return True
         return False
 
@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for the e-commerce application.
+
+Run a benchmark as a module from the project root, e.g.::
+
+    python -m benchmarks.stock_contention
+"""
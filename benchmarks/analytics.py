@@ -0,0 +1,98 @@
+"""
+Sales analytics benchmark - vectorized fact table vs iterating Order objects.
+
+Loads N order items into the columnar fact table and times each report. The
+same daily revenue / units-per-product figures are also computed by looping
+over Order dataclasses, the way it was done before the fact table.
+
+    python -m benchmarks.analytics --items 10000000 --loop-items 1000000
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from app.database.db import Database
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.services.analytics_service import AnalyticsService
+
+START = datetime(2025, 1, 1).timestamp()
+YEAR = 365 * 86_400
+
+
+def _load_facts(db: Database, items: int, users: int, products: int):
+    rng = np.random.default_rng(42)
+    db.facts.append_columns(
+        timestamp=np.sort(START + rng.random(items) * YEAR),
+        order_id=np.arange(items, dtype=np.int64) // 2,
+        user_id=rng.integers(1, users + 1, items),
+        product_id=rng.integers(1, products + 1, items),
+        quantity=rng.integers(1, 4, items),
+        unit_price=rng.integers(5, 500, items).astype(np.float64),
+    )
+    for product_id in range(1, products + 1):
+        db.products[product_id] = Product(
+            product_id, f"Product {product_id}", "", 1.0, 0, f"Category {product_id % 50}"
+        )
+    for user_id in range(1, users + 1):
+        db.users[user_id] = User(
+            user_id, f"user{user_id}@example.com", "", "",
+            created_at=datetime.fromtimestamp(START + (user_id % 52) * 7 * 86_400),
+        )
+
+
+def _python_loop(orders):
+    revenue = defaultdict(float)
+    units = defaultdict(int)
+    for order in orders:
+        day = order.created_at.date()
+        for item in order.items:
+            revenue[day] += item.get_total()
+            units[item.product_id] += item.quantity
+    return revenue, units
+
+
+def _time(label: str, fn):
+    started = time.perf_counter()
+    fn()
+    print(f"{label:<32} {(time.perf_counter() - started) * 1000:10.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=5_000_000)
+    parser.add_argument("--loop-items", type=int, default=500_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    db = Database()
+    _load_facts(db, args.items, args.users, args.products)
+    service = AnalyticsService(db)
+    print(f"{args.items:,} fact rows")
+    _time("daily revenue", service.daily_revenue)
+    _time("units by product", service.units_by_product)
+    _time("top 5 sellers per category", service.top_sellers_by_category)
+    _time("cohort revenue", service.cohort_revenue)
+
+    rng = random.Random(42)
+    orders = [
+        Order(
+            id=i, user_id=1, total=0.0,
+            items=[OrderItem(rng.randrange(args.products), "", 1, 10.0)],
+            created_at=datetime.fromtimestamp(START + rng.random() * YEAR),
+        )
+        for i in range(args.loop_items)
+    ]
+    print(f"{args.loop_items:,} Order objects")
+    _time("python loop (revenue + units)", lambda: _python_loop(orders))
+
+
+if __name__ == "__main__":
+    main()
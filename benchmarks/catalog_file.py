@@ -0,0 +1,86 @@
+"""
+Catalog file benchmark - memory-mapped store vs dict of dataclasses.
+
+Writes a catalog file of N products, then, each in a fresh process, warm-starts
+a product store from it either by materializing every row into a Product
+dict or by mapping the file, and reports startup time, resident memory and
+random-read latency.
+
+    python -m benchmarks.catalog_file --products 1000000
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.database.catalog_file import CatalogFile, write_catalog
+from app.database.product_store import ProductStore
+from app.models.product import Product
+
+CATEGORIES = ["Electronics", "Home", "Garden", "Toys", "Books", "Sports", "Beauty"]
+
+
+def _rss_mib() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _run(mode: str, path: str, reads: int):
+    baseline = _rss_mib()
+    started = time.perf_counter()
+    catalog = CatalogFile(path)
+    if mode == "dict":
+        products = {catalog.ids[row]: catalog.product(row) for row in range(len(catalog))}
+    else:
+        products = ProductStore(catalog)
+    startup = time.perf_counter() - started
+    rss = _rss_mib() - baseline
+
+    rng = random.Random(7)
+    ids = [rng.randrange(1, len(catalog) + 1) for _ in range(reads)]
+    started = time.perf_counter()
+    for product_id in ids:
+        product = products[product_id]
+        product.name, product.price, product.stock, product.category
+    per_read = (time.perf_counter() - started) / reads
+    print(f"{mode:<5} startup={startup:6.2f}s rss=+{rss:7.1f} MiB "
+          f"(+{_rss_mib() - baseline:7.1f} MiB after reads) "
+          f"read={per_read * 1e6:5.2f}us ({len(products):,} products)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--reads", type=int, default=100_000)
+    parser.add_argument("--mode", choices=["dict", "mmap"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _run(args.mode, args.path, args.reads)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catalog.bin")
+        write_catalog(path, (
+            Product(i, f"Product {i}", f"Description of product {i} " * 4, 9.99 + i % 100,
+                    i % 500, CATEGORIES[i % len(CATEGORIES)])
+            for i in range(1, args.products + 1)
+        ))
+        print(f"catalog file: {os.path.getsize(path) / 2**20:,.0f} MiB")
+        for mode in ("dict", "mmap"):
+            subprocess.run([
+                sys.executable, "-m", "benchmarks.catalog_file", "--mode", mode,
+                "--path", path, "--reads", str(args.reads),
+            ], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Catalog snapshot benchmark - publish cost and reader request cost.
+
+Publishes a snapshot of N products, then times GET /products/{id} served by
+a reader process app from the mapped snapshot against the full application
+(in-process ASGI transport, one request at a time).
+
+    python -m benchmarks.catalog_snapshot --products 100000
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+
+from app.cluster import CatalogPublisher, ReaderApp
+from app.database.db import db
+from app.models.product import Product
+from main import app
+
+
+async def _requests_per_second(asgi_app, paths) -> float:
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for path in paths:
+            response = await client.get(path)
+            assert response.status_code == 200
+        return len(paths) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+
+    db.reset()
+    for product_id in range(1, args.products + 1):
+        db.products[product_id] = Product(
+            product_id, f"Product {product_id}", "x" * 200, 9.99, 100, "General"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        publisher = CatalogPublisher(db, directory)
+        for label in ("first publish", "republish"):
+            started = time.perf_counter()
+            publisher.publish()
+            print(f"{label:<16} {args.products:,} products: "
+                  f"{time.perf_counter() - started:.2f}s")
+
+        rng = random.Random(42)
+        paths = [f"/products/{rng.randrange(1, args.products + 1)}" for _ in range(args.requests)]
+        # The reader never forwards here, so it needs no writer socket
+        reader = ReaderApp(directory)
+        for label, asgi_app in (("full app", app), ("snapshot reader", reader)):
+            rate = asyncio.run(_requests_per_second(asgi_app, paths))
+            print(f"{label:<16} {rate:8,.0f} req/s per process")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compression benchmark - bandwidth and CPU per encoding and level.
+
+Renders GET /products/ for a generated catalog and, for each installed
+encoding at several levels, reports the compressed size and compression
+and decompression time. Then times GET /products/ through the whole app
+uncompressed, compressed every time, and served from the compressed cache.
+
+    python -m benchmarks.compression --products 2000 --requests 200
+"""
+
+import argparse
+import asyncio
+import gzip
+import random
+import time
+
+import httpx
+
+from app.database.db import db
+from app.middleware.compression import brotli, zstandard
+from app.schemas.product import ProductCreate
+from app.services.product_service import ProductService
+from main import app, compressor, rate_limiter
+
+WORDS = "soft cotton steel lamp desk chair wireless black white travel mug kit".split()
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 5, 11], "zstd": [1, 3, 9]}
+
+
+def _codecs():
+    codecs = {
+        "gzip": (
+            lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+            gzip.decompress,
+        ),
+    }
+    if brotli is not None:
+        codecs["br"] = (lambda data, level: brotli.compress(data, quality=level), brotli.decompress)
+    if zstandard is not None:
+        codecs["zstd"] = (
+            lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+            zstandard.ZstdDecompressor().decompress,
+        )
+    return codecs
+
+
+def _seed(count: int):
+    service = ProductService(db)
+    rng = random.Random(1)
+    for i in range(count):
+        service.create_product(ProductCreate(
+            name=" ".join(rng.choices(WORDS, k=3)).title(),
+            description=" ".join(rng.choices(WORDS, k=40)),
+            price=round(rng.uniform(1, 500), 2),
+            stock=rng.randint(0, 100),
+            category=rng.choice(["Home", "Office", "Travel", "Kitchen"]),
+        ))
+
+
+def _timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def _requests(count: int, headers: dict) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for _ in range(count):
+            response = await client.get("/products/", headers=headers)
+            assert response.status_code == 200
+        return (time.perf_counter() - start) / count * 1000
+
+
+async def _body() -> bytes:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return (await client.get("/products/", headers={"Accept-Encoding": "identity"})).content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rate_limiter.policies.clear()
+    db.reset()
+    _seed(args.products)
+    body = asyncio.run(_body())
+    print(f"GET /products/ with {args.products} products: {len(body) / 1024:.0f} KiB")
+
+    for encoding, (compress, decompress) in _codecs().items():
+        for level in LEVELS[encoding]:
+            compressed = compress(body, level)
+            compress_ms = _timed(lambda: compress(body, level), 5)
+            decompress_ms = _timed(lambda: decompress(compressed), 20)
+            print(
+                f"{encoding:<4} level {level:<2} {len(compressed) / 1024:7.1f} KiB "
+                f"({len(compressed) / len(body):5.1%})  compress {compress_ms:7.2f} ms "
+                f"({len(body) / compress_ms / 1024:6.1f} MB/s)  decompress {decompress_ms:5.2f} ms"
+            )
+
+    identity = asyncio.run(_requests(args.requests, {"Accept-Encoding": "identity"}))
+    print(f"GET /products/ identity          {identity:7.2f} ms/request")
+    cache_paths = compressor.cache_paths
+    compressor.cache_paths = frozenset()
+    uncached = asyncio.run(_requests(args.requests, {"Accept-Encoding": "gzip"}))
+    print(f"GET /products/ gzip, no cache    {uncached:7.2f} ms/request")
+    compressor.cache_paths = cache_paths
+    cached = asyncio.run(_requests(args.requests, {"Accept-Encoding": "gzip"}))
+    print(f"GET /products/ gzip, cached      {cached:7.2f} ms/request  {compressor.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Co-purchase benchmark - incremental updates, top-k reads and batch rebuilds.
+
+    python -m benchmarks.copurchase --orders 1000000 --workers 8
+"""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from app.database.db import Database
+from app.models.order import Order, OrderItem
+from app.services.recommendation_service import RecommendationService
+
+
+def _baskets(count: int, products: int):
+    rng = random.Random(42)
+    # Skewed popularity: low ids are bought far more often
+    return [
+        [int(products * rng.random() ** 3) + 1 for _ in range(rng.randrange(1, 6))]
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    baskets = _baskets(args.orders, args.products)
+    db = Database()
+
+    started = time.perf_counter()
+    for basket in baskets:
+        db.copurchases.record_order(
+            SimpleNamespace(items=[SimpleNamespace(product_id=pid) for pid in basket])
+        )
+    elapsed = time.perf_counter() - started
+    print(f"incremental: {args.orders / elapsed:,.0f} orders/s, "
+          f"{db.copurchases.pair_count():,} pair entries")
+
+    started = time.perf_counter()
+    reads = 100_000
+    for i in range(reads):
+        db.copurchases.top(i % args.products + 1, 10)
+    print(f"top-10 read: {(time.perf_counter() - started) / reads * 1e6:.2f}us")
+
+    for order_id, basket in enumerate(baskets, start=1):
+        db.orders[order_id] = Order(
+            order_id, 1, [OrderItem(pid, "", 1, 1.0) for pid in basket], 1.0
+        )
+        # As if each order's placement job had recorded it
+        db.aggregated_orders.add(order_id)
+    service = RecommendationService(db)
+    for workers in (1, args.workers):
+        started = time.perf_counter()
+        service.rebuild(workers=workers)
+        print(f"rebuild with {workers} worker(s): {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Change stream benchmark - append and fan-out throughput of the EventLog.
+
+A writer thread appends events while N asyncio subscribers tail the log with
+long polls (Subscription.next), as GET /events and the SSE stream do. Reports
+appends/s and delivered events/s, in memory and with segment files.
+
+    python -m benchmarks.event_log --events 100000 --subscribers 1 10 100 1000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+
+from app.database.event_log import EventLog
+
+
+def _append(log: EventLog, events: int, done: threading.Event):
+    for i in range(events):
+        log.append("product", "stock", i % 1000, {"stock": i})
+    done.set()
+
+
+async def _tail(log: EventLog, name: str, events: int) -> int:
+    subscription = log.subscribe(name, after=0)
+    delivered = 0
+    while subscription.cursor < events:
+        delivered += len(await subscription.next(timeout=1.0))
+    subscription.close()
+    return delivered + subscription.missed
+
+
+async def _run(log: EventLog, events: int, subscribers: int):
+    done = threading.Event()
+    tails = [
+        asyncio.ensure_future(_tail(log, f"sub-{i}", events)) for i in range(subscribers)
+    ]
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    writer = threading.Thread(target=_append, args=(log, events, done))
+    writer.start()
+    await asyncio.get_running_loop().run_in_executor(None, done.wait)
+    append_time = time.perf_counter() - start
+    delivered = sum(await asyncio.gather(*tails))
+    total_time = time.perf_counter() - start
+    writer.join()
+    return append_time, total_time, delivered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+
+    for label in ("memory", "segments"):
+        for subscribers in args.subscribers:
+            with tempfile.TemporaryDirectory() as directory:
+                log = EventLog(
+                    capacity=args.events,
+                    segment_dir=directory if label == "segments" else None,
+                )
+                append_time, total_time, delivered = asyncio.run(
+                    _run(log, args.events, subscribers)
+                )
+                log.close()
+            print(
+                f"{label:<8} subscribers={subscribers:<5} "
+                f"appends/s={args.events / append_time:>10,.0f} "
+                f"delivered/s={delivered / total_time:>12,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
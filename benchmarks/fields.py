@@ -0,0 +1,68 @@
+"""
+Sparse fieldsets benchmark - GET /products/ with and without ?fields=.
+
+Seeds a catalog with long descriptions and compares payload size and
+latency of the full listing against id,name,price through the whole app,
+and the serialization alone.
+
+    python -m benchmarks.fields --products 2000 --requests 100
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.database.db import db
+from app.models.product import Product
+from app.routers.products import _build_product_response, product_fields
+from main import app, rate_limiter
+
+DESCRIPTION = "Hand-finished, sturdy and easy to clean. Ships flat with all fittings. " * 6
+
+
+async def _requests(path: str, count: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for _ in range(count):
+            response = await client.get(path, headers={"Accept-Encoding": "identity"})
+        return len(response.content), (time.perf_counter() - start) / count * 1000
+
+
+def _timed(func, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    rate_limiter.policies.clear()
+    db.reset()
+    for i in range(1, args.products + 1):
+        db.products[i] = Product(i, f"Product {i}", DESCRIPTION, 9.99 + i, 10, "Home")
+    products = list(db.products.values())
+
+    for label, path in [
+        ("full", "/products/"),
+        ("id,name,price", "/products/?fields=id,name,price"),
+    ]:
+        size, latency = asyncio.run(_requests(path, args.requests))
+        print(f"GET {label:<14} {size / 1024:8.1f} KiB {latency:8.2f} ms/request")
+
+    field_set = product_fields.parse("id,name,price")
+    full = _timed(lambda: [_build_product_response(p).model_dump_json() for p in products])
+    sparse = _timed(lambda: product_fields.response(products, field_set))
+    print(f"serialize full (pydantic)        {full:8.2f} ms")
+    print(f"serialize id,name,price          {sparse:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Id allocation benchmark - plain counter vs one lock vs per-thread blocks.
+
+Many threads allocate ids at once, and every run counts duplicates. The
+plain read-then-increment counter the database used before is the
+unsynchronized baseline: CPython 3.11 happens not to switch threads
+between its read and write, but nothing guarantees that (free-threaded
+builds, or any call added between the two).
+
+    python -m benchmarks.ids --threads 1,8 --ids 200000
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from app.database.ids import IdAllocator, SnowflakeIds
+
+
+class PlainCounter:
+    def __init__(self):
+        self._counter = 1
+
+    def next_id(self) -> int:
+        value = self._counter
+        self._counter += 1
+        return value
+
+
+class LockedCounter:
+    def __init__(self):
+        self._counter = 1
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            value = self._counter
+            self._counter += 1
+            return value
+
+
+def _run(allocator, threads: int, ids: int):
+    per_thread = ids // threads
+    barrier = threading.Barrier(threads + 1)
+    results = [None] * threads
+
+    def worker(slot: int):
+        next_id = allocator.next_id
+        barrier.wait()
+        results[slot] = [next_id() for _ in range(per_thread)]
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    allocated = [i for batch in results for i in batch]
+    return elapsed, len(allocated) - len(set(allocated))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default="1,8")
+    parser.add_argument("--ids", type=int, default=200_000)
+    parser.add_argument("--block-size", type=int, default=64)
+    parser.add_argument("--switch-interval", type=float, default=1e-5,
+                        help="sys.setswitchinterval while running, to force interleaving")
+    args = parser.parse_args()
+
+    sys.setswitchinterval(args.switch_interval)
+    for threads in (int(n) for n in args.threads.split(",")):
+        for label, allocator in (
+            ("plain counter", PlainCounter()),
+            ("one lock", LockedCounter()),
+            (f"blocks of {args.block_size}", IdAllocator("bench", args.block_size)),
+            ("snowflake", SnowflakeIds()),
+        ):
+            elapsed, duplicates = _run(allocator, threads, args.ids)
+            print(
+                f"{threads:>2} threads  {label:<14} {args.ids / elapsed / 1e6:6.2f} M ids/s"
+                f"  {elapsed / args.ids * 1e9:6.0f} ns/id  duplicates {duplicates}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Login benchmark - POST /auth/login throughput at different bcrypt costs.
+
+Sends concurrent logins through the app (in-process ASGI transport) with the
+password hashed at each cost, while a probe measures GET /health latency to
+show whether the event loop stays responsive during verification. Rate
+limits are switched off for the run.
+
+    python -m benchmarks.login --logins 64 --concurrency 16 --rounds 4 8 10 12
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.core.security import (
+    calibrate_bcrypt_rounds,
+    configure_password_hashing,
+    get_password_hash,
+)
+from app.database.db import db
+from app.models.user import User
+from main import app, rate_limiter
+
+FORM = {"username": "bench@example.com", "password": "bench-password"}
+
+
+async def _logins(client: httpx.AsyncClient, count: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login():
+        async with semaphore:
+            response = await client.post("/auth/login", data=FORM)
+            assert response.status_code == 200, response.text
+
+    await asyncio.gather(*(login() for _ in range(count)))
+
+
+async def _probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def _run(count: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop, latencies = asyncio.Event(), []
+        probe = asyncio.ensure_future(_probe(client, stop, latencies))
+        start = time.perf_counter()
+        await _logins(client, count, concurrency)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[4, 8, 10, 12])
+    args = parser.parse_args()
+
+    rate_limiter.policies.clear()
+    print(f"calibrated cost for 0.25s: {calibrate_bcrypt_rounds(0.25)}")
+    for rounds in args.rounds:
+        configure_password_hashing(rounds)
+        db.reset()
+        db.users[1] = User(1, FORM["username"], "Bench", get_password_hash(FORM["password"]))
+        elapsed, latencies = asyncio.run(_run(args.logins, args.concurrency))
+        latencies.sort()
+        print(
+            f"cost={rounds:<3} logins/s={args.logins / elapsed:8.1f} "
+            f"health p50={statistics.median(latencies) * 1000:6.1f}ms "
+            f"max={latencies[-1] * 1000:6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Admin order query benchmark - index-backed queries vs full scans.
+
+Builds N synthetic orders straight into a Database (with indexes) and times
+typical operator queries through OrderService.query_orders, compared with a
+plain scan of every order.
+
+    python -m benchmarks.order_query --orders 10000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.database.db import Database
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderFilter
+from app.services.order_service import OrderService
+
+STATUSES = list(OrderStatus)
+STATUS_WEIGHTS = [5, 10, 20, 60, 5]
+
+
+def _populate(db: Database, count: int, users: int, products: int):
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    step = timedelta(days=365) / count
+    for order_id in range(1, count + 1):
+        product_id = rng.randrange(1, products + 1)
+        quantity = rng.randrange(1, 4)
+        price = float(rng.randrange(5, 500))
+        order = Order(
+            id=order_id,
+            user_id=rng.randrange(1, users + 1),
+            items=[OrderItem(product_id, "", quantity, price)],
+            total=price * quantity,
+            status=rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            created_at=start + step * order_id,
+        )
+        db.orders[order_id] = order
+        db.order_index.add(order)
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+
+    db = Database()
+    started = time.perf_counter()
+    _populate(db, args.orders, args.users, args.products)
+    print(f"built {args.orders:,} orders in {time.perf_counter() - started:.1f}s")
+
+    service = OrderService(db)
+    day = datetime(2025, 6, 1)
+    queries = {
+        "pending, one day, by status": OrderFilter(
+            statuses=["pending"], created_from=day, created_to=day + timedelta(days=1),
+            group_by="status",
+        ),
+        "one user": OrderFilter(user_id=7),
+        "one product, min total 100": OrderFilter(product_id=42, min_total=100),
+        "cancelled, revenue by day": OrderFilter(
+            statuses=["cancelled"], limit=0, group_by="day",
+        ),
+    }
+
+    for label, order_filter in queries.items():
+        indexed = _time(lambda: service.query_orders(order_filter))
+        scan = _time(lambda: [
+            order for order in db.orders.values()
+            if service._matches(order, order_filter)
+        ], repeat=1)
+        _, total, _ = service.query_orders(order_filter)
+        print(
+            f"{label:<30} matches={total:>9,}  "
+            f"indexed={indexed * 1000:9.2f}ms  scan={scan * 1000:9.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Product stream benchmark - fan-out of price and stock changes to many clients.
+
+Opens N in-process stream connections, each watching a few random products,
+and has a writer thread change stock at a fixed rate. Every connection is
+drained by its own coroutine, like the SSE response loop. Reports batches
+delivered per second, how many changes each batch coalesced and the loop
+time spent per tick in the hub.
+
+    python -m benchmarks.product_stream --connections 10000 50000 --seconds 5
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+from app.database.db import db
+from app.schemas.product import ProductCreate
+from app.services.product_service import ProductService
+from app.services.product_stream_service import ProductStreamService
+
+
+def _populate(products: int):
+    db.reset()
+    service = ProductService(db)
+    for i in range(products):
+        service.create_product(ProductCreate(
+            name=f"Product {i}", description="", price=10.0, stock=1_000_000,
+            category="General",
+        ))
+
+
+def _write(products: int, rate: int, stop: threading.Event, counter: list):
+    service = ProductService(db)
+    rng = random.Random(1)
+    interval = 1 / rate
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        service.update_stock(rng.randint(1, products), -1)
+        counter[0] += 1
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+async def _drain(connection, delivered: list):
+    while not connection.closed:
+        if await connection.next_batch(timeout=1.0) is not None:
+            delivered[0] += 1
+
+
+async def _run(args, connections: int):
+    hub = ProductStreamService(db, tick=args.tick)
+    rng = random.Random(2)
+    delivered = [0]
+    clients = [
+        hub.connect(rng.sample(range(1, args.products + 1), args.watch))
+        for _ in range(connections)
+    ]
+    drains = [asyncio.ensure_future(_drain(client, delivered)) for client in clients]
+    await asyncio.sleep(0.5)
+    delivered[0] = 0
+    batches_before = hub.batches
+
+    fan_out = 0.0
+    original = hub._fan_out
+
+    def timed_fan_out(changes, seq):
+        nonlocal fan_out
+        start = time.perf_counter()
+        original(changes, seq)
+        fan_out += time.perf_counter() - start
+
+    hub._fan_out = timed_fan_out
+    stop, writes = threading.Event(), [0]
+    writer = threading.Thread(target=_write, args=(args.products, args.rate, stop, writes))
+    ticks_before = hub.ticks
+    writer.start()
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    writer.join()
+    ticks = hub.ticks - ticks_before
+    batches = hub.batches - batches_before
+
+    for client in clients:
+        hub.disconnect(client)
+    await asyncio.gather(*drains)
+    return writes[0], ticks, batches, delivered[0], fan_out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--watch", type=int, default=3, help="Products per connection")
+    parser.add_argument("--rate", type=int, default=2000, help="Stock changes per second")
+    parser.add_argument("--tick", type=float, default=0.1)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    _populate(args.products)
+    for connections in args.connections:
+        writes, ticks, batches, delivered, fan_out = asyncio.run(_run(args, connections))
+        print(
+            f"connections={connections:<6} changes={writes:<6} ticks={ticks:<4} "
+            f"batches/s={delivered / args.seconds:>9,.0f} "
+            f"changes/batch={writes * connections * args.watch / args.products / max(batches, 1):5.1f} "
+            f"fan-out/tick={fan_out / max(ticks, 1) * 1000:6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
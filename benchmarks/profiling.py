@@ -0,0 +1,89 @@
+"""
+Profiling benchmark - request overhead of ProfilingMiddleware.
+
+Calls a small ASGI app directly, without the middleware, with it idle
+(nothing selected for profiling) and with every request profiled, and
+reports microseconds per request. For scale, also times GET /products/{id}
+through the whole application.
+
+    python -m benchmarks.profiling --requests 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.database.db import db
+from app.middleware.profiling import ProfilingMiddleware, SamplingProfiler
+from app.models.product import Product
+from main import app, rate_limiter
+
+
+async def _endpoint(scope, receive, send):
+    # A little work per request, so profiled requests have stacks to sample
+    sum(range(200))
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/products/1",
+    "headers": [(b"host", b"bench"), (b"accept", b"*/*")],
+    "client": ("10.0.0.1", 1234),
+}
+
+
+async def _run(asgi, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await asgi(dict(SCOPE), _receive, _send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def _full_app(requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/products/1")
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    baseline = asyncio.run(_run(_endpoint, args.requests))
+    print(f"no middleware      {baseline:7.2f} us/request")
+    idle = SamplingProfiler(paths=["/debug"], header_secret="secret")
+    per_request = asyncio.run(_run(ProfilingMiddleware(_endpoint, idle), args.requests))
+    print(f"idle profiler      {per_request:7.2f} us/request (+{per_request - baseline:.2f})")
+    busy = SamplingProfiler(sample_rate=1.0)
+    per_request = asyncio.run(_run(ProfilingMiddleware(_endpoint, busy), args.requests))
+    print(
+        f"every request      {per_request:7.2f} us/request (+{per_request - baseline:.2f}) "
+        f"{busy.stats()}"
+    )
+
+    rate_limiter.policies.clear()
+    db.reset()
+    db.products[1] = Product(1, "Bench", "", 9.99, 10, "bench")
+    full = asyncio.run(_full_app(min(args.requests, 5000)))
+    print(f"GET /products/1    {full:7.2f} us/request through the whole app")
+
+
+if __name__ == "__main__":
+    main()
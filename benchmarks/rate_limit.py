@@ -0,0 +1,80 @@
+"""
+Rate limiting benchmark - per-request overhead of RateLimitMiddleware.
+
+Calls a trivial ASGI app directly, without and with the middleware, for
+anonymous (keyed by IP) and authenticated (keyed by JWT subject) requests
+spread over many clients, and reports microseconds per request and the size
+of the bucket table.
+
+    python -m benchmarks.rate_limit --requests 200000 --clients 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.core.security import create_access_token
+from app.middleware.rate_limit import RateLimiter, RateLimitMiddleware
+
+
+async def _endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _scopes(clients: int, authenticated: bool):
+    scopes = []
+    for client in range(clients):
+        headers = [(b"host", b"bench")]
+        if authenticated:
+            token = create_access_token({"sub": str(client)})
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scopes.append({
+            "type": "http",
+            "method": "GET",
+            "path": "/products/",
+            "headers": headers,
+            "client": (f"10.{client >> 16 & 255}.{client >> 8 & 255}.{client & 255}", 1234),
+        })
+    return scopes
+
+
+async def _run(app, scopes, requests: int) -> float:
+    count = len(scopes)
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % count], _receive, _send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--max-keys", type=int, default=10_000)
+    args = parser.parse_args()
+
+    baseline = asyncio.run(_run(_endpoint, _scopes(1, False), args.requests))
+    print(f"no middleware            {baseline:6.2f} us/request")
+    for authenticated in (False, True):
+        scopes = _scopes(args.clients, authenticated)
+        limiter = RateLimiter({"GET /products/": "120/minute"}, max_keys=args.max_keys)
+        app = RateLimitMiddleware(_endpoint, limiter)
+        per_request = asyncio.run(_run(app, scopes, args.requests))
+        label = "jwt subject" if authenticated else "client ip"
+        print(
+            f"rate limited ({label:<11}) {per_request:6.2f} us/request "
+            f"(+{per_request - baseline:.2f}) {limiter.stats()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Revocation benchmark - cost of the revocation check per authenticated request.
+
+Times RevocationList.is_revoked for tokens that aren't revoked (the common
+case) and for revoked ones, with an empty list and with many revoked ids,
+against a plain set lookup, and the whole get_current_user dependency with
+and without revoked tokens on the list.
+
+    python -m benchmarks.revocation --revoked 100000 --checks 200000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from app.core.security import create_access_token, get_password_hash
+from app.database.db import db
+from app.database.revocation import RevocationList
+from app.dependencies import get_current_user
+from app.models.user import User
+
+
+def _per_check(check, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        check(key)
+    return (time.perf_counter() - start) / len(keys) * 1e9
+
+
+async def _dependency(token: str, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await get_current_user(token)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--revoked", type=int, default=100_000)
+    parser.add_argument("--checks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    revoked_ids = [uuid.uuid4().hex for _ in range(args.revoked)]
+    unknown_ids = [uuid.uuid4().hex for _ in range(args.checks)]
+    revoked = RevocationList()
+    start = time.perf_counter()
+    for jti in revoked_ids:
+        revoked.revoke(jti, expires_at=time.time() + 3600)
+    elapsed = time.perf_counter() - start
+    print(f"revoke          {elapsed / args.revoked * 1e6:8.2f} us/id  {revoked.stats()}")
+
+    empty = RevocationList()
+    exact = set(revoked_ids)
+    hits = revoked_ids[: args.checks]
+    print(f"empty list      {_per_check(empty.is_revoked, unknown_ids):8.0f} ns/check")
+    print(f"not revoked     {_per_check(revoked.is_revoked, unknown_ids):8.0f} ns/check")
+    print(f"revoked         {_per_check(revoked.is_revoked, hits):8.0f} ns/check")
+    print(f"plain set       {_per_check(exact.__contains__, unknown_ids):8.0f} ns/check")
+    print(f"false positives {revoked.filter_hits - len(hits)} of {len(unknown_ids)}")
+
+    db.reset()
+    db.users[1] = User(1, "bench@example.com", "Bench", get_password_hash("bench-password"))
+    token = create_access_token({"sub": "1"})
+    for label in ("empty list", f"{args.revoked} revoked"):
+        if label != "empty list":
+            for jti in revoked_ids:
+                db.revoked_tokens.revoke(jti, expires_at=time.time() + 3600)
+        per_request = asyncio.run(_dependency(token, 20_000))
+        print(f"get_current_user ({label}) {per_request:6.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Fuzzy search benchmark - index build time and exact/fuzzy query latency.
+
+Indexes N synthetic product names (random words from a synthetic
+vocabulary plus a model number), then times exact queries and fuzzy queries
+with one or two injected typos.
+
+    python -m benchmarks.search --products 1000000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from app.database.search_index import SearchIndex
+
+# English letter frequencies, so common deletion variants have realistically long postings
+LETTERS = "etaoinshrdlcumwfgypbvkjxqz"
+WEIGHTS = [12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8, 2.8, 2.4,
+           2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2, 0.1, 0.1]
+
+
+def _vocabulary(size: int, rng: random.Random):
+    words = set()
+    while len(words) < size:
+        length = rng.randrange(4, 11)
+        words.add("".join(rng.choices(LETTERS, WEIGHTS, k=length)))
+    return sorted(words)
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    position = rng.randrange(len(word))
+    kind = rng.randrange(3)
+    if kind == 0:
+        return word[:position] + word[position + 1:]
+    if kind == 1:
+        return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+    if position < len(word) - 1:
+        return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word + rng.choice(string.ascii_lowercase)
+
+
+def _report(label: str, index: SearchIndex, queries, fuzzy: bool):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, fuzzy=fuzzy, limit=20)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(
+        f"{label:<14} p50={timings[len(timings) // 2] * 1e3:.2f}ms "
+        f"p99={timings[int(len(timings) * 0.99)] * 1e3:.2f}ms "
+        f"max={timings[-1] * 1e3:.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    words = _vocabulary(args.vocabulary, rng)
+    index = SearchIndex()
+    started = time.perf_counter()
+    for product_id in range(1, args.products + 1):
+        name = " ".join(rng.choice(words) for _ in range(3))
+        index.add(product_id, f"{name} x{product_id % 1000}")
+    print(f"indexed {len(index):,} products in {time.perf_counter() - started:.1f}s")
+
+    pairs = [(rng.choice(words), rng.choice(words)) for _ in range(args.queries)]
+    _report("exact 2-word", index, [f"{a} {b}" for a, b in pairs], fuzzy=False)
+    _report("fuzzy 1 typo", index, [f"{_typo(a, rng)} {b}" for a, b in pairs], fuzzy=True)
+    _report(
+        "fuzzy 2 typos", index,
+        [f"{_typo(a, rng)} {_typo(b, rng)}" for a, b in pairs], fuzzy=True,
+    )
+    _report("fuzzy 1 word", index, [_typo(a, rng) for a, _ in pairs], fuzzy=True)
+
+
+if __name__ == "__main__":
+    main()
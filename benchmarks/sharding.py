@@ -0,0 +1,74 @@
+"""
+Sharding benchmark - checkout throughput with one user lock vs user shards.
+
+Each thread checks out for its own users: add a cart item, then place the
+order. --commit-ms holds the user lock for that long after each order, the
+way a durable write (log flush, replica ack) would; with 0 the writes are
+pure Python and the GIL serializes them whatever the locking.
+
+    python -m benchmarks.sharding --threads 1,2,4,8 --orders 2000 --commit-ms 0.2
+"""
+
+import argparse
+import threading
+import time
+
+from app.database.db import Database, ShardedDatabase
+from app.models.product import Product
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+
+
+def _run(database: Database, threads: int, orders: int, commit: float) -> float:
+    database.products[1] = Product(1, "Lamp", "", 20.0, threads * orders, "Home")
+    carts, order_service = CartService(database), OrderService(database)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(first_user: int):
+        barrier.wait()
+        for i in range(orders):
+            # Consecutive users, so each thread writes to every shard
+            user_id = first_user + i % 64
+            carts.add_item(user_id, 1, 1)
+            with database.user_lock(user_id):
+                order_service.create_order_from_cart(user_id)
+                if commit:
+                    time.sleep(commit)
+
+    workers = [
+        threading.Thread(target=worker, args=(n * 64,)) for n in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert len(database.orders) == threads * orders
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--orders", type=int, default=2000, help="per thread")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--commit-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    commit = args.commit_ms / 1000
+    print(f"commit {args.commit_ms} ms under the user lock")
+    for threads in (int(n) for n in args.threads.split(",")):
+        rates = []
+        for database in (Database(), ShardedDatabase(args.shards)):
+            elapsed = _run(database, threads, args.orders, commit)
+            rates.append(threads * args.orders / elapsed)
+        print(
+            f"{threads:>2} threads  one lock {rates[0]:>9,.0f} orders/s  "
+            f"{args.shards} shards {rates[1]:>9,.0f} orders/s  x{rates[1] / rates[0]:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
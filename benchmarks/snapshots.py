@@ -0,0 +1,120 @@
+"""
+Snapshot benchmark - writer throughput and latency during long table scans.
+
+A writer thread inserts orders and replaces existing ones (status changes)
+while a reader keeps totalling the whole table, three ways:
+
+    dict, live      iterate the plain dict as it changes (the reader may fail
+                    with "dictionary changed size during iteration")
+    dict, list()    copy the values first, as the services used to; the copy
+                    holds the GIL for the whole table
+    snapshot        VersionedTable snapshot: pin O(pages), then scan while the
+                    writer copies the pages it touches
+
+    python -m benchmarks.snapshots --rows 200000 --seconds 3
+"""
+
+import argparse
+import gc
+import statistics
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from app.database.versioned import VersionedTable
+
+
+@dataclass
+class Row:
+    id: int
+    status: str
+    total: float
+
+
+def _scan_live(table) -> float:
+    return sum(row.total for row in table.values() if row.status != "cancelled")
+
+
+def _scan_copy(table) -> float:
+    rows = list(table.values())
+    return sum(row.total for row in rows if row.status != "cancelled")
+
+
+def _scan_snapshot(table) -> float:
+    with table.snapshot() as snapshot:
+        return sum(row.total for row in snapshot.values() if row.status != "cancelled")
+
+
+def _run(table, scan, rows: int, seconds: float) -> dict:
+    for i in range(rows):
+        table[i] = Row(i, "confirmed", 10.0)
+    # Keep collector pauses out of the latencies; they hit every mode alike
+    gc.collect()
+    gc.disable()
+    stop = threading.Event()
+    latencies = []
+    scans = errors = 0
+
+    def writer():
+        next_id, n = rows, 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            if n % 2:
+                key = (n * 7919) % rows
+                table[key] = replace(table[key], status="cancelled")
+            else:
+                table[next_id] = Row(next_id, "pending", 5.0)
+                next_id += 1
+            latencies.append(time.perf_counter() - start)
+            n += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            scan(table)
+            scans += 1
+        except RuntimeError:
+            errors += 1
+    stop.set()
+    thread.join()
+    gc.enable()
+
+    latencies.sort()
+    return {
+        "writes": len(latencies) / seconds,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "scans": scans,
+        "errors": errors,
+        "copied": getattr(table, "pages_copied", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--pages", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows, {args.seconds:g} s per run")
+    for label, make_table, scan in (
+        ("dict, live", dict, _scan_live),
+        ("dict, list()", dict, _scan_copy),
+        ("snapshot", lambda: VersionedTable(args.pages), _scan_snapshot),
+    ):
+        result = _run(make_table(), scan, args.rows, args.seconds)
+        print(
+            f"{label:<13} writes {result['writes']:>9,.0f}/s"
+            f"  p50 {result['p50'] * 1e6:5.1f} us  p99 {result['p99'] * 1e6:6.1f} us"
+            f"  max {result['max'] * 1e3:6.2f} ms"
+            f"  scans {result['scans']:>3}  failed {result['errors']:>3}"
+            f"  pages copied {result['copied']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Stock contention benchmark - single striped lock vs sharded counter.
+
+Many threads reserve and release stock of one product, the way concurrent
+checkouts and cancellations hit a viral SKU.
+
+    python -m benchmarks.stock_contention --threads 8 --ops 50000
+"""
+
+import argparse
+import threading
+import time
+
+from app.database.stock import StockLedger
+from app.models.product import Product
+
+
+def _run(ledger: StockLedger, product: Product, threads: int, ops: int) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(ops):
+            if ledger.reserve(product, 1):
+                ledger.release(product, 1)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    total_ops = args.threads * args.ops * 2
+    for label, hot in (("single lock", False), (f"sharded x{args.shards}", True)):
+        ledger = StockLedger(shards=args.shards)
+        product = Product(
+            id=1, name="Viral", description="", price=1.0,
+            stock=1_000_000, category="General",
+        )
+        if hot:
+            ledger.make_hot(product)
+        elapsed = _run(ledger, product, args.threads, args.ops)
+        assert ledger.available(product) == 1_000_000
+        print(
+            f"{label:<14} {elapsed:8.3f}s  "
+            f"{total_ops / elapsed:>12,.0f} ops/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
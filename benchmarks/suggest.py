@@ -0,0 +1,78 @@
+"""
+Autocomplete benchmark - prefix index memory and query latency.
+
+Loads N synthetic product names into the PrefixIndex, then times suggestion
+queries for random 1-6 character prefixes and incremental add/rename/remove.
+
+    python -m benchmarks.suggest --names 1000000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.database.prefix_index import PrefixIndex
+
+WORDS = (
+    "apple samsung sony classic ultra pro max mini wireless smart organic "
+    "leather cotton steel bamboo portable digital vintage premium compact "
+    "phone laptop charger cable headphones speaker watch camera shoe jacket "
+    "bottle lamp chair desk backpack"
+).split()
+
+
+def _names(count: int, rng: random.Random):
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randrange(2, 5))) + f" {i}"
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    names = _names(args.names, rng)
+
+    index = PrefixIndex()
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.load((ref, name, rng.random() * 1000) for ref, name in enumerate(names, 1))
+    load_time = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"loaded {len(index):,} names in {load_time:.1f}s, "
+          f"index memory ~{current / 2**20:,.0f} MiB")
+
+    prefixes = [
+        names[rng.randrange(len(names))][:rng.randrange(1, 7)]
+        for _ in range(args.queries)
+    ]
+    for label, queries in (("cold", prefixes), ("warm", prefixes)):
+        timings = []
+        for prefix in queries:
+            started = time.perf_counter()
+            index.suggest(prefix, 10)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(
+            f"suggest ({label}): p50={timings[len(timings) // 2] * 1e6:.1f}us "
+            f"p99={timings[int(len(timings) * 0.99)] * 1e6:.1f}us"
+        )
+
+    started = time.perf_counter()
+    updates = 1000
+    for ref in range(len(names) + 1, len(names) + updates + 1):
+        index.add(ref, f"apple new product {ref}")
+        index.rename(ref, f"samsung renamed {ref}")
+        index.remove(ref)
+    per_op = (time.perf_counter() - started) / (updates * 3)
+    print(f"add/rename/remove: {per_op * 1e6:.1f}us per operation")
+
+
+if __name__ == "__main__":
+    main()
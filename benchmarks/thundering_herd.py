@@ -0,0 +1,69 @@
+"""
+Thundering-herd benchmark - single-flight vs independent request handling.
+
+Fires N concurrent identical GET /reviews/product/{id}/rating and
+GET /products/{id} requests at the app (in-process ASGI transport) and reports
+wall time and process CPU time, with coalescing enabled and disabled.
+
+    python -m benchmarks.thundering_herd --requests 2000 --reviews 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.core.singleflight import SingleFlight
+from app.database.db import db
+from app.models.product import Product
+from app.models.review import Review
+from main import app
+
+
+def _populate(reviews: int):
+    db.reset()
+    db.products[1] = Product(1, "Viral Product", "x" * 2000, 9.99, 100, "General")
+    for review_id in range(1, reviews + 1):
+        db.reviews[review_id] = Review(
+            review_id, 1, review_id, review_id % 5 + 1, "Title", "A review comment"
+        )
+
+
+async def _herd(path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        responses = await asyncio.gather(*(client.get(path) for _ in range(requests)))
+    assert all(response.status_code == 200 for response in responses)
+
+
+def _measure(path: str, requests: int):
+    wall, cpu = time.perf_counter(), time.process_time()
+    asyncio.run(_herd(path, requests))
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+async def _no_coalescing(self, key, fn, *args):
+    """Drop-in for SingleFlight.run that always executes."""
+    return await SingleFlight._execute(self, object(), fn, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--reviews", type=int, default=20_000)
+    args = parser.parse_args()
+
+    _populate(args.reviews)
+    coalescing_run = SingleFlight.run
+    for path in ("/reviews/product/1/rating", "/products/1"):
+        for label, run in (("independent", _no_coalescing), ("single-flight", coalescing_run)):
+            SingleFlight.run = run
+            wall, cpu = _measure(path, args.requests)
+            print(f"{path:<28} {label:<14} wall={wall:6.2f}s cpu={cpu:6.2f}s")
+    SingleFlight.run = coalescing_run
+    print(SingleFlight.all_stats())
+
+
+if __name__ == "__main__":
+    main()
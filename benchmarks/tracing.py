@@ -0,0 +1,101 @@
+"""
+Tracing benchmark - cost of @traced and span() with and without a trace.
+
+Times a trivial method undecorated, decorated outside a request trace
+(tracing disabled), and decorated inside a trace, then POST /orders/
+through the whole app with tracing on and off.
+
+    python -m benchmarks.tracing --calls 1000000 --orders 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.core.security import create_access_token, get_password_hash
+from app.core.tracing import end_trace, span, start_trace, traced
+from app.database.db import db
+from app.models.product import Product
+from app.models.user import User
+from main import app, rate_limiter
+
+
+class Plain:
+    def method(self):
+        return 1
+
+
+class Traced:
+    @traced
+    def method(self):
+        return 1
+
+
+def _per_call(func, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def _span_per_call(calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        with span("stage"):
+            pass
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def _timing_middleware(enabled: bool):
+    # The ServerTimingMiddleware instance in the built middleware stack
+    stack = app.middleware_stack
+    while not hasattr(stack, "histograms"):
+        stack = stack.app
+    stack.enabled = enabled
+
+
+async def _orders(count: int) -> float:
+    token = create_access_token({"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/health")  # builds the middleware stack
+        elapsed = 0.0
+        for enabled in (True, False):
+            _timing_middleware(enabled)
+            start = time.perf_counter()
+            for _ in range(count):
+                await client.post("/cart/items", json={"product_id": 1, "quantity": 1}, headers=headers)
+                response = await client.post("/orders/", headers=headers)
+                assert response.status_code == 201, response.text
+            elapsed = (time.perf_counter() - start) / count * 1e6
+            print(f"POST /cart/items + /orders/ tracing={'on ' if enabled else 'off'} {elapsed:8.1f} us")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--orders", type=int, default=2000)
+    args = parser.parse_args()
+
+    plain, decorated = Plain(), Traced()
+    print(f"undecorated          {_per_call(plain.method, args.calls):7.0f} ns/call")
+    print(f"@traced, no trace    {_per_call(decorated.method, args.calls):7.0f} ns/call")
+    print(f"span(), no trace     {_span_per_call(args.calls):7.0f} ns/call")
+    trace, token = start_trace()
+    print(f"@traced, in trace    {_per_call(decorated.method, args.calls):7.0f} ns/call")
+    print(f"span(), in trace     {_span_per_call(args.calls):7.0f} ns/call")
+    end_trace(token)
+
+    rate_limiter.policies.clear()
+    db.reset()
+    db.users[1] = User(1, "bench@example.com", "Bench", get_password_hash("bench-password"))
+    db.products[1] = Product(1, "Bench", "", 9.99, 10 * args.orders, "bench")
+    asyncio.run(_orders(args.orders))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Wire format benchmark - msgpack against JSON for products, carts and orders.
+
+Builds the payloads from the dataclass models and compares encoded size,
+encode time (JSON through the Pydantic response schemas, as FastAPI does,
+and msgpack straight from the models) and decode time. Then times GET
+/products/ through the whole app with each Accept header.
+
+    python -m benchmarks.wire --products 1000 --requests 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import httpx
+
+from app.core.wire import packb, unpackb
+from app.database.db import db
+from app.models.cart import Cart, CartItem
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.product import Product
+from app.routers.cart import _build_cart_response
+from app.routers.orders import _build_order_response
+from app.routers.products import _build_product_response, product_fields
+from main import app, rate_limiter
+
+DESCRIPTION = "Hand-finished, sturdy and easy to clean. Ships flat with all fittings."
+
+
+def _timed(func, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _payloads(count: int):
+    """(name, models, response schema builder, msgpack encoder) per payload."""
+    products = [
+        Product(i, f"Product {i}", DESCRIPTION, 9.99 + i, 10, "Home")
+        for i in range(1, count + 1)
+    ]
+    line_items = [(p.id, p.name, 1 + p.id % 3, p.price) for p in products[:10]]
+    carts = [
+        Cart(user_id, [CartItem(pid, qty, name, price) for pid, name, qty, price in line_items])
+        for user_id in range(count)
+    ]
+    orders = [
+        Order(
+            id=i,
+            user_id=i,
+            items=[OrderItem(pid, name, qty, price) for pid, name, qty, price in line_items],
+            total=sum(qty * price for _, _, qty, price in line_items),
+            status=OrderStatus.CONFIRMED,
+            created_at=datetime(2024, 5, 1, 12, 30),
+        )
+        for i in range(count)
+    ]
+    product_row = product_fields.row_function(product_fields.field_names)
+    return [
+        ("products", products, _build_product_response,
+         lambda: packb([product_row(p) for p in products])),
+        ("carts", carts, _build_cart_response,
+         lambda: packb([c.to_dict() for c in carts])),
+        ("orders", orders, _build_order_response,
+         lambda: packb([o.to_dict() for o in orders])),
+    ]
+
+
+async def _requests(path: str, accept: str, count: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"Accept": accept, "Accept-Encoding": "identity"}
+        start = time.perf_counter()
+        for _ in range(count):
+            response = await client.get(path, headers=headers)
+        return len(response.content), (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.products} objects each")
+    print(f"{'payload':<9} {'json KiB':>9} {'msgpack KiB':>12} "
+          f"{'json enc':>9} {'mp enc':>8} {'json dec':>9} {'mp dec':>8}  (ms)")
+    for name, models, build, pack in _payloads(args.products):
+        # FastAPI builds the response schemas, then dumps them to JSON
+        encode_json = lambda: ("[" + ",".join(
+            build(model).model_dump_json() for model in models
+        ) + "]").encode()
+        json_body = encode_json()
+        msgpack_body = pack()
+        assert unpackb(msgpack_body) == json.loads(json_body)
+
+        json_encode = _timed(encode_json)
+        msgpack_encode = _timed(pack)
+        json_decode = _timed(lambda: json.loads(json_body))
+        msgpack_decode = _timed(lambda: unpackb(msgpack_body))
+        print(f"{name:<9} {len(json_body) / 1024:9.1f} {len(msgpack_body) / 1024:12.1f} "
+              f"{json_encode:9.2f} {msgpack_encode:8.2f} {json_decode:9.2f} {msgpack_decode:8.2f}")
+
+    rate_limiter.policies.clear()
+    db.reset()
+    for i in range(1, args.products + 1):
+        db.products[i] = Product(i, f"Product {i}", DESCRIPTION, 9.99 + i, 10, "Home")
+    for accept in ("application/json", "application/msgpack"):
+        size, latency = asyncio.run(_requests("/products/", accept, args.requests))
+        print(f"GET /products/ {accept:<20} {size / 1024:8.1f} KiB {latency:8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
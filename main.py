@@ -8,20 +8,65 @@ A simple e-commerce platform with modules for:
 - Order management (with XML export)
 """
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.cluster import CatalogPublisher, WriterMiddleware
+from app.core.config import settings
+from app.core.jobs import JobQueue
+from app.core.security import configure_password_hashing
+from app.core.singleflight import SingleFlight
+from app.core.tracing import StageHistograms
+from app.database.db import db
+from app.middleware import (
+    CompressionMiddleware,
+    IdempotencyMiddleware,
+    IdempotencyStore,
+    ProfilingMiddleware,
+    ServerTimingMiddleware,
+    RateLimiter,
+    RateLimitMiddleware,
+    ResponseCompressor,
+)
+from app.routers.debug import profiler
+from app.routers.products import product_stream
 from app.routers import (
     auth_router,
     users_router,
     products_router,
     cart_router,
     orders_router,
+    categories_router,
+    reviews_router,
+    admin_router,
+    reports_router,
+    events_router,
+    debug_router,
 )
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Tune password hashing, load the catalog file, and run job workers while serving."""
+    rounds = configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+    logger.info("Hashing passwords with bcrypt cost %d", rounds)
+    if settings.CATALOG_FILE:
+        db.load_catalog(settings.CATALOG_FILE)
+        logger.info("Serving %d products from %s", len(db.products), settings.CATALOG_FILE)
+    await JobQueue.start_all(settings.JOB_WORKERS)
+    yield
+    await JobQueue.drain_all(settings.JOB_DRAIN_TIMEOUT)
+
+
 app = FastAPI(
     title="E-commerce API",
     description="A simple e-commerce platform API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Include routers
@@ -30,6 +75,52 @@ app.include_router(users_router)
 app.include_router(products_router)
 app.include_router(cart_router)
 app.include_router(orders_router)
+app.include_router(categories_router)
+app.include_router(reviews_router)
+app.include_router(admin_router)
+app.include_router(reports_router)
+app.include_router(events_router)
+app.include_router(debug_router)
+
+idempotency_store = IdempotencyStore(
+    max_keys=settings.IDEMPOTENCY_MAX_KEYS, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths=["/orders/", "/cart/items", "/reviews/"],
+)
+
+if settings.CLUSTER_ROLE == "writer":
+    # Reader processes serve the catalog from snapshots this process publishes
+    catalog_publisher = CatalogPublisher(
+        db, settings.CLUSTER_DIR, settings.CLUSTER_PUBLISH_INTERVAL
+    )
+    catalog_publisher.start()
+    app.add_middleware(WriterMiddleware, publisher=catalog_publisher)
+
+stage_timings = StageHistograms()
+app.add_middleware(
+    ServerTimingMiddleware,
+    histograms=stage_timings,
+    enabled=settings.TRACING_ENABLED,
+    profiler=profiler,
+    public=settings.SERVER_TIMING_PUBLIC,
+)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+compressor = ResponseCompressor(
+    levels=settings.COMPRESSION_LEVELS,
+    min_size=settings.COMPRESSION_MIN_SIZE,
+    thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+    cache_paths=settings.COMPRESSION_CACHE_PATHS,
+    cache_max_bytes=settings.COMPRESSION_CACHE_BYTES,
+)
+app.add_middleware(CompressionMiddleware, compressor=compressor)
+
+# Added last so it runs first, before any other work is done for the request
+rate_limiter = RateLimiter(settings.RATE_LIMITS, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
 
 
 @app.get("/", tags=["root"])
@@ -46,3 +137,19 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", tags=["health"])
+async def metrics():
+    """Internal counters of the request-handling subsystems."""
+    return {
+        "singleflight": SingleFlight.all_stats(),
+        "jobs": JobQueue.all_stats(),
+        "events": db.events.stats(),
+        "product_stream": product_stream.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "revocation": db.revoked_tokens.stats(),
+        "profiler": profiler.stats(),
+        "stages": stage_timings.stats(),
+        "compression": compressor.stats(),
+    }
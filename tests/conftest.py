@@ -5,16 +5,33 @@ Pytest configuration and fixtures for e-commerce tests.
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app
+from main import (
+    app,
+    compressor,
+    idempotency_store,
+    profiler,
+    rate_limiter,
+    stage_timings,
+)
+from app.core.config import settings
 from app.database.db import db
-from app.core.security import get_password_hash
+from app.core.security import configure_password_hashing, get_password_hash
 from app.models.user import User
 
+# Cheapest bcrypt cost, also when a test runs the app lifespan
+settings.PASSWORD_HASH_ROUNDS = 4
+configure_password_hashing(settings.PASSWORD_HASH_ROUNDS)
+
 
 @pytest.fixture(autouse=True)
 def reset_database():
     """Reset database before each test."""
     db.reset()
+    idempotency_store.clear()
+    rate_limiter.clear()
+    profiler.clear()
+    stage_timings.clear()
+    compressor.clear()
     yield
     db.reset()
 
@@ -49,3 +66,10 @@ def auth_client(client):
     client.headers["Authorization"] = f"Bearer {token}"
     client.test_user_id = user_id
     return client
+
+
+@pytest.fixture
+def admin_client(auth_client, monkeypatch):
+    """Authenticated test client whose user is listed in ADMIN_EMAILS."""
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["testuser@example.com"])
+    return auth_client
@@ -0,0 +1,107 @@
+"""
+Unit tests for admin endpoints.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+
+class TestAdminOrders:
+    """Tests for the admin order query endpoint."""
+
+    def _place_orders(self, client: TestClient, quantities) -> list:
+        """Helper to place one order per quantity and return their IDs."""
+        product_id = client.post("/products/", json={
+            "name": "Test Product",
+            "description": "A test product",
+            "price": 10.00,
+            "stock": 1000,
+            "category": "General",
+        }).json()["id"]
+
+        order_ids = []
+        for quantity in quantities:
+            client.post("/cart/items", json={
+                "product_id": product_id,
+                "quantity": quantity,
+            })
+            order_ids.append(client.post("/orders/").json()["id"])
+        return order_ids
+
+    def test_requires_admin(self, auth_client: TestClient):
+        """Test that regular users cannot query orders."""
+        response = auth_client.get("/admin/orders")
+
+        assert response.status_code == 403
+
+    def test_filter_by_status_and_total(self, admin_client: TestClient):
+        """Test combining status and total filters."""
+        order_ids = self._place_orders(admin_client, [1, 3, 5])
+        admin_client.post(f"/orders/{order_ids[2]}/cancel")
+
+        response = admin_client.get(
+            "/admin/orders?status=confirmed&min_total=20&sort_by=total"
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] == 1
+        assert [order["id"] for order in data["orders"]] == [order_ids[1]]
+        assert data["summary"]["revenue"] == 30.0
+
+    def test_group_by_status(self, admin_client: TestClient):
+        """Test aggregates grouped by status."""
+        order_ids = self._place_orders(admin_client, [1, 2, 3])
+        admin_client.post(f"/orders/{order_ids[0]}/cancel")
+
+        response = admin_client.get("/admin/orders?group_by=status&limit=0")
+
+        data = response.json()
+        assert data["orders"] == []
+        assert data["summary"] == {
+            "key": None, "count": 3, "revenue": 60.0, "average_order_value": 20.0,
+        }
+        groups = {group["key"]: group for group in data["groups"]}
+        assert groups["cancelled"]["count"] == 1
+        assert groups["confirmed"]["revenue"] == 50.0
+        assert groups["confirmed"]["average_order_value"] == 25.0
+
+    def test_filter_by_aware_created_range(self, admin_client: TestClient):
+        """Test created_from/created_to given with a UTC offset."""
+        order_ids = self._place_orders(admin_client, [1, 2])
+
+        response = admin_client.get(
+            "/admin/orders?created_from=2020-01-01T00:00:00Z"
+            "&created_to=2999-01-01T02:00:00%2B02:00"
+        )
+
+        assert response.status_code == 200
+        assert sorted(order["id"] for order in response.json()["orders"]) == sorted(order_ids)
+
+        response = admin_client.get("/admin/orders?created_to=2020-01-01T00:00:00Z")
+        assert response.json()["total_count"] == 0
+
+    def test_aware_bounds_compare_in_local_time(self, admin_client: TestClient, monkeypatch):
+        """Test that an aware bound is matched against local created_at values."""
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            [order_id] = self._place_orders(admin_client, [1])
+            since = (datetime.now(timezone.utc) - timedelta(minutes=5)).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            )
+
+            response = admin_client.get(f"/admin/orders?created_from={since}")
+
+            assert [order["id"] for order in response.json()["orders"]] == [order_id]
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+    def test_invalid_status(self, admin_client: TestClient):
+        """Test rejecting unknown statuses."""
+        response = admin_client.get("/admin/orders?status=lost")
+
+        assert response.status_code == 400
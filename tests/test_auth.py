@@ -0,0 +1,199 @@
+"""
+Unit tests for authentication and password hashing.
+"""
+
+import asyncio
+import hashlib
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.security import (
+    calibrate_bcrypt_rounds,
+    configure_password_hashing,
+    create_access_token,
+    get_password_hash,
+    verify_password,
+)
+from app.database.db import db
+from app.database.revocation import BloomFilter, RevocationList
+from app.models.user import User
+from app.routers.auth import auth_jobs
+from main import app
+
+
+def _login(client: TestClient, email: str, password: str):
+    return client.post("/auth/login", data={"username": email, "password": password})
+
+
+class TestPasswordHashing:
+    """Tests for hashing, cost calibration and hash upgrades."""
+
+    def test_users_created_via_users_api_can_log_in(self, client: TestClient):
+        """Test that /users/ and /auth/register store the same kind of hash."""
+        client.post("/users/", json={
+            "email": "ann@example.com",
+            "full_name": "Ann",
+            "password": "secret123",
+        })
+
+        assert _login(client, "ann@example.com", "secret123").status_code == 200
+        assert _login(client, "ann@example.com", "wrong-one").status_code == 401
+
+    def test_legacy_sha256_hash_is_upgraded_on_login(self, client: TestClient):
+        """Test that an unsalted SHA-256 hash verifies once and is replaced."""
+        legacy = hashlib.sha256(b"secret123").hexdigest()
+        db.users[1] = User(1, "bob@example.com", "Bob", legacy)
+
+        assert _login(client, "bob@example.com", "secret123").status_code == 200
+        assert db.users[1].hashed_password.startswith("$2b$04$")
+        assert _login(client, "bob@example.com", "secret123").status_code == 200
+
+    def test_concurrent_sign_ups_with_one_email(self):
+        """Test that only one of many simultaneous sign-ups gets the email."""
+        async def sign_up_all():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                body = {"email": "fay@example.com", "full_name": "Fay", "password": "secret123"}
+                return await asyncio.gather(
+                    *(client.post("/auth/register", json=body) for _ in range(5)),
+                    *(client.post("/users/", json=body) for _ in range(5)),
+                )
+
+        responses = asyncio.run(sign_up_all())
+
+        assert sorted(response.status_code for response in responses) == [201] + [400] * 9
+        assert [user.email for user in db.users.values()] == ["fay@example.com"]
+
+    def test_rehash_job_never_carries_the_password(self, client: TestClient, monkeypatch):
+        """Test that the upgrade job gets the new hash, not the password."""
+        submitted = []
+        monkeypatch.setattr(auth_jobs, "submit", lambda *args: submitted.append(args))
+        legacy = hashlib.sha256(b"secret123").hexdigest()
+        db.users[1] = User(1, "eve@example.com", "Eve", legacy)
+
+        assert _login(client, "eve@example.com", "secret123").status_code == 200
+
+        [(kind, user_id, new_hash, old_hash)] = submitted
+        assert (kind, user_id, old_hash) == ("password.rehash", 1, legacy)
+        assert verify_password("secret123", new_hash)
+        assert "secret123" not in submitted[0]
+
+    def test_cheaper_bcrypt_hash_is_upgraded_on_login(self, client: TestClient):
+        """Test that raising the cost rehashes existing passwords on login."""
+        db.users[1] = User(1, "cy@example.com", "Cy", get_password_hash("secret123"))
+        try:
+            configure_password_hashing(5)
+            assert _login(client, "cy@example.com", "secret123").status_code == 200
+            assert db.users[1].hashed_password.startswith("$2b$05$")
+        finally:
+            configure_password_hashing(4)
+
+        # A costlier hash than configured is left alone
+        assert verify_password("secret123", db.users[1].hashed_password)
+        _login(client, "cy@example.com", "secret123")
+        assert db.users[1].hashed_password.startswith("$2b$05$")
+
+    def test_calibration_stays_within_bounds(self):
+        """Test that calibration clamps the cost to the allowed range."""
+        assert calibrate_bcrypt_rounds(1e-9, min_rounds=4, max_rounds=12) == 4
+        assert calibrate_bcrypt_rounds(1e9, min_rounds=4, max_rounds=12) == 12
+
+
+class TestRefreshTokens:
+    """Tests for refresh, logout and token revocation."""
+
+    def _tokens(self, client: TestClient) -> dict:
+        db.users[1] = User(1, "dee@example.com", "Dee", get_password_hash("secret123"))
+        response = _login(client, "dee@example.com", "secret123")
+        assert response.status_code == 200
+        return response.json()
+
+    def test_refresh_rotates_tokens(self, client: TestClient):
+        """Test that a refresh token works once and returns a new pair."""
+        tokens = self._tokens(client)
+
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 200
+        rotated = response.json()
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+        assert me.json()["email"] == "dee@example.com"
+
+        reused = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert reused.status_code == 401
+        again = client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+        assert again.status_code == 200
+
+    def test_token_types_are_not_interchangeable(self, client: TestClient):
+        """Test that refresh tokens don't authenticate requests and vice versa."""
+        tokens = self._tokens(client)
+
+        me = client.get("/auth/me", headers={"Authorization": f"Bearer {tokens['refresh_token']}"})
+        assert me.status_code == 401
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+        assert response.status_code == 401
+
+    def test_logout_revokes_tokens(self, client: TestClient):
+        """Test that logout denies the access and refresh tokens."""
+        tokens = self._tokens(client)
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        response = client.post(
+            "/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers
+        )
+        assert response.status_code == 204
+        assert client.get("/auth/me", headers=headers).status_code == 401
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == 401
+        assert client.get("/metrics").json()["revocation"]["revoked"] == 2
+
+    def test_admin_revokes_compromised_token(self, admin_client: TestClient):
+        """Test that admins can revoke another user's token."""
+        stolen = create_access_token({"sub": str(admin_client.test_user_id)})
+        headers = {"Authorization": f"Bearer {stolen}"}
+        assert admin_client.get("/auth/me", headers=headers).status_code == 200
+
+        response = admin_client.post("/admin/tokens/revoke", json={"token": stolen})
+        assert response.status_code == 204
+        assert admin_client.get("/auth/me", headers=headers).status_code == 401
+        assert admin_client.get("/auth/me").status_code == 200
+        response = admin_client.post("/admin/tokens/revoke", json={"token": "garbage"})
+        assert response.status_code == 400
+
+
+class TestRevocationList:
+    """Tests for the Bloom filter backed revocation list."""
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Test membership and a false positive rate near the target."""
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"in-{i}")
+
+        assert all(f"in-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"out-{i}" in bloom for i in range(10_000))
+        assert false_positives < 300
+
+    def test_expired_entries_are_pruned(self):
+        """Test that pruning forgets expired ids and keeps the rest."""
+        revoked = RevocationList(capacity=4, prune_interval=60)
+        revoked.revoke("old", expires_at=110, now=100)
+        revoked.revoke("new", expires_at=500, now=100)
+        revoked.revoke("stale", expires_at=90, now=100)
+
+        assert revoked.is_revoked("old") and revoked.is_revoked("new")
+        assert not revoked.is_revoked("stale")
+        assert revoked.prune(now=200) == 1
+        assert not revoked.is_revoked("old")
+        assert revoked.is_revoked("new")
+
+    def test_filter_grows_with_entries(self):
+        """Test that the filter is rebuilt larger instead of saturating."""
+        revoked = RevocationList(capacity=8, prune_interval=60)
+        for i in range(100):
+            revoked.revoke(f"jti-{i}", expires_at=1000, now=0)
+
+        assert len(revoked) == 100
+        assert revoked.stats()["filter_capacity"] >= 100
+        assert all(revoked.is_revoked(f"jti-{i}") for i in range(100))
+        assert not revoked.is_revoked("jti-100")
@@ -0,0 +1,122 @@
+"""
+Unit tests for the memory-mapped catalog file and product store.
+"""
+
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.database.catalog_file import CatalogFile, write_catalog
+from app.database.db import db
+from app.database.product_store import MappedProduct, ProductStore
+from app.models.product import Product
+from main import app
+
+
+def _products():
+    return [
+        Product(3, "Zwiebel Schäler", "Peels onions", 4.5, 10, "Kitchen",
+                created_at=datetime(2024, 5, 1, 12, 30, 0, 123456)),
+        Product(1, "Desk Lamp", "Bright", 20.0, 5, "Home", is_hot=True),
+        Product(2, "Chair", "", 55.0, 0, "Home"),
+    ]
+
+
+class TestCatalogFile:
+    """Tests for the columnar file format."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that every field survives writing and mapping."""
+        path = str(tmp_path / "catalog.bin")
+        products = _products()
+        write_catalog(path, products)
+        catalog = CatalogFile(path)
+
+        assert len(catalog) == 3
+        assert catalog.position(2) == 1
+        assert catalog.position(4) is None
+        assert catalog.categories == ["Home", "Kitchen"]
+        assert [catalog.product(row) for row in range(3)] == sorted(
+            products, key=lambda product: product.id
+        )
+
+
+class TestProductStore:
+    """Tests for lazy reads and copy-on-write updates."""
+
+    def _store(self, tmp_path) -> ProductStore:
+        path = str(tmp_path / "catalog.bin")
+        write_catalog(path, _products())
+        return ProductStore(CatalogFile(path))
+
+    def test_lookups_are_lazy_views(self, tmp_path):
+        """Test that lookups return views with the stored field values."""
+        store = self._store(tmp_path)
+        product = store[3]
+
+        assert isinstance(product, MappedProduct)
+        assert product.name == "Zwiebel Schäler"
+        assert product.created_at == datetime(2024, 5, 1, 12, 30, 0, 123456)
+        assert store.get(99) is None
+        assert list(store) == [1, 2, 3]
+        assert len(store) == 3
+
+    def test_updates_are_copy_on_write(self, tmp_path):
+        """Test that modified views are kept and shared by later lookups."""
+        store = self._store(tmp_path)
+        product = store[1]
+        product.stock -= 2
+        del product
+
+        assert store[1].stock == 3
+        assert store[1] is store[1]
+        assert CatalogFile(store._file.path).stocks[0] == 5
+
+    def test_insert_and_delete(self, tmp_path):
+        """Test the overlay for new products and tombstones for deletions."""
+        store = self._store(tmp_path)
+        store[4] = Product(4, "Rug", "Soft", 80.0, 2, "Home")
+        del store[2]
+
+        assert list(store) == [1, 3, 4]
+        assert len(store) == 3
+        assert 2 not in store
+        assert store[4].name == "Rug"
+
+
+class TestLoadedCatalog:
+    """Tests for serving the API from a loaded catalog file."""
+
+    def test_api_reads_and_updates_mapped_products(self, client: TestClient, tmp_path):
+        """Test product endpoints against a memory-mapped catalog."""
+        path = str(tmp_path / "catalog.bin")
+        write_catalog(path, _products())
+        db.load_catalog(path)
+
+        assert client.get("/products/3").json()["name"] == "Zwiebel Schäler"
+        assert len(client.get("/products/?category=home").json()) == 2
+        assert client.get("/products/search?q=lamp").json()[0]["id"] == 1
+
+        client.put("/products/2", json={"price": 60.0})
+        created = client.post("/products/", json={
+            "name": "Rug",
+            "description": "Soft",
+            "price": 80.0,
+            "stock": 2,
+            "category": "Home",
+        })
+
+        assert created.json()["id"] == 4
+        assert client.get("/products/2").json()["price"] == 60.0
+        assert [p["id"] for p in client.get("/products/").json()] == [1, 2, 3, 4]
+
+    def test_catalog_file_setting_loads_at_startup(self, tmp_path, monkeypatch):
+        """Test that CATALOG_FILE is mapped when the app starts."""
+        path = str(tmp_path / "catalog.bin")
+        write_catalog(path, _products())
+        monkeypatch.setattr(settings, "CATALOG_FILE", path)
+
+        with TestClient(app) as client:
+            assert isinstance(db.products, ProductStore)
+            assert client.get("/products/1").json()["name"] == "Desk Lamp"
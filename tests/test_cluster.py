@@ -0,0 +1,134 @@
+"""
+Unit tests for catalog snapshots and the multi-process reader app.
+"""
+
+import json
+
+import httpx
+import msgpack
+from fastapi.testclient import TestClient
+
+from app.cluster import CatalogPublisher, ReaderApp, render_catalog
+from app.database.db import db
+from app.database.snapshot import SnapshotReader, SnapshotWriter
+from app.models.product import Product
+from main import app
+
+
+class TestSnapshot:
+    """Tests for the memory-mapped snapshot format."""
+
+    def test_publish_and_read(self, tmp_path):
+        """Test that readers see records of the newest generation."""
+        writer = SnapshotWriter(str(tmp_path))
+        reader = SnapshotReader(str(tmp_path))
+        assert reader.current() is None
+
+        writer.publish({"products": [(7, b"seven"), (2, b"two")], "empty": []})
+        snapshot = reader.current()
+
+        assert bytes(snapshot.get("products", 2)) == b"two"
+        assert bytes(snapshot.get("products", 7)) == b"seven"
+        assert snapshot.get("products", 3) is None
+        assert snapshot.get("empty", 1) is None
+        assert snapshot.get("missing", 1) is None
+
+        writer.publish({"products": [(2, b"TWO")]})
+        assert reader.current().generation == 2
+        assert bytes(reader.current().get("products", 2)) == b"TWO"
+        # The superseded mapping stays readable for requests still using it
+        assert bytes(snapshot.get("products", 7)) == b"seven"
+
+    def test_old_generations_are_pruned(self, tmp_path):
+        """Test that only the newest generations are kept on disk."""
+        writer = SnapshotWriter(str(tmp_path))
+        for _ in range(5):
+            writer.publish({"products": [(1, b"x")]})
+
+        files = sorted(path.name for path in tmp_path.iterdir())
+        assert files == ["catalog-4.bin", "catalog-5.bin", "current"]
+        assert SnapshotWriter(str(tmp_path)).generation == 5
+
+
+class TestRenderCatalog:
+    """Tests for serializing the catalog into snapshot sections."""
+
+    def test_hot_product_stock_is_current(self):
+        """Test that hot products are rendered with their counter's stock."""
+        product = Product(1, "Lamp", "", 20.0, 100, "Home")
+        db.products[1] = product
+        db.stock.make_hot(product)
+        cache = {}
+        render_catalog(db, cache)
+
+        assert db.stock.reserve(product, 30)
+        sections = render_catalog(db, cache)
+
+        assert json.loads(dict(sections["products"])[1])["stock"] == 70
+
+
+class TestCatalogPublisher:
+    """Tests for republishing the catalog after writes."""
+
+    def test_failed_publish_is_retried(self, tmp_path, monkeypatch):
+        """Test that a failing publish stays dirty and backs off."""
+        publisher = CatalogPublisher(db, str(tmp_path), interval=0.05)
+        publish = publisher.writer.publish
+
+        def fail(sections):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(publisher.writer, "publish", fail)
+
+        assert publisher._publish_pending() == 0.1
+        assert publisher._publish_pending() == 0.2
+        assert publisher._dirty.is_set()
+
+        monkeypatch.setattr(publisher.writer, "publish", publish)
+        assert publisher._publish_pending() == 0.05
+        assert not publisher._dirty.is_set()
+        assert publisher.writer.generation == 1
+
+
+class TestReaderApp:
+    """Tests for serving the catalog from snapshots and forwarding the rest."""
+
+    def test_reads_from_snapshot_and_forwards_writes(self, tmp_path):
+        """Test the reader answers catalog GETs locally and forwards the rest."""
+        publisher = CatalogPublisher(db, str(tmp_path))
+        publisher.publish()
+        reader = TestClient(ReaderApp(str(tmp_path), httpx.ASGITransport(app=app)))
+
+        created = reader.post("/products/", json={
+            "name": "Lamp",
+            "description": "Desk lamp",
+            "price": 20.00,
+            "stock": 3,
+            "category": "Home",
+        })
+        assert created.status_code == 201
+        product_id = created.json()["id"]
+
+        # Not in the snapshot yet: forwarded to the writer
+        fresh = reader.get(f"/products/{product_id}")
+        assert fresh.status_code == 200
+        assert "x-catalog-generation" not in fresh.headers
+
+        generation = publisher.publish()
+        cached = reader.get(f"/products/{product_id}")
+        assert cached.headers["x-catalog-generation"] == str(generation)
+        assert cached.json() == fresh.json()
+
+        packed = reader.get(f"/products/{product_id}", headers={"Accept": "application/msgpack"})
+        assert packed.headers["content-type"] == "application/msgpack"
+        assert "x-catalog-generation" in packed.headers
+        assert msgpack.unpackb(packed.content) == fresh.json()
+
+        listing = reader.get("/products/")
+        rating = reader.get(f"/reviews/product/{product_id}/rating")
+        assert [p["name"] for p in listing.json()] == ["Lamp"]
+        assert rating.json()["review_count"] == 0
+        assert "x-catalog-generation" in rating.headers
+
+        assert reader.get("/products/999").status_code == 404
+        assert reader.get("/orders/").status_code == 401
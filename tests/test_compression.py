@@ -0,0 +1,129 @@
+"""
+Unit tests for response compression.
+"""
+
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, ResponseCompressor, negotiate
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def _create_products(client: TestClient, count: int):
+    for i in range(count):
+        client.post("/products/", json={
+            "name": f"Product {i}",
+            "description": "A fairly long and repetitive product description. " * 4,
+            "price": 10.0 + i,
+            "stock": 10,
+            "category": "General",
+        })
+
+
+async def _streaming(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream")],
+    })
+    for _ in range(3):
+        await send({"type": "http.response.body", "body": b"data: x\n\n" * 500, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _large_json(scope, receive, send):
+    body = b"[" + b",".join(b'{"id": 1}' for _ in range(5000)) + b"]"
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _get(app, headers: dict) -> httpx.Response:
+    async def get():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/", headers=headers)
+
+    return asyncio.run(get())
+
+
+class TestNegotiation:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_negotiate(self):
+        """Test server preference, q-values and wildcards."""
+        available = ["gzip", "br"]
+        assert negotiate("gzip, deflate, br", available) == "br"
+        assert negotiate("br;q=0, gzip;q=0.5", available) == "gzip"
+        assert negotiate("*", available) == "br"
+        assert negotiate("*, br;q=0", available) == "gzip"
+        assert negotiate("identity", available) is None
+        assert negotiate("deflate", available) is None
+
+
+class TestCompressionMiddleware:
+    """Tests for compressing responses."""
+
+    def test_large_listing_is_compressed(self, client: TestClient):
+        """Test gzip for a large listing and identity without Accept-Encoding."""
+        _create_products(client, 20)
+
+        response = client.get("/products/", headers=GZIP)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept, Accept-Encoding"
+        assert len(response.json()) == 20
+
+        plain = client.get("/products/", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+        assert plain.json() == response.json()
+
+    def test_small_responses_are_not_compressed(self, client: TestClient):
+        """Test that bodies under the size threshold are sent as is."""
+        response = client.get("/health", headers=GZIP)
+        assert "Content-Encoding" not in response.headers
+
+    def test_catalog_compression_is_cached(self, client: TestClient):
+        """Test that an unchanged listing is compressed once, and again after a change."""
+        _create_products(client, 20)
+
+        first = client.get("/products/", headers=GZIP)
+        second = client.get("/products/", headers=GZIP)
+        assert first.content == second.content
+        assert client.get("/metrics").json()["compression"]["cache_hits"] == 1
+
+        client.put("/products/1", json={"price": 99.0})
+        assert client.get("/products/", headers=GZIP).json()[0]["price"] == 99.0
+        stats = client.get("/metrics").json()["compression"]
+        assert stats["cache_hits"] == 1
+        assert stats["cache_entries"] == 2
+
+    def test_streamed_responses_pass_through(self):
+        """Test that server-sent events and other streams are not buffered."""
+        app = CompressionMiddleware(_streaming, ResponseCompressor(min_size=10))
+        response = _get(app, GZIP)
+        assert "Content-Encoding" not in response.headers
+        assert response.text.count("data: x") == 1500
+
+    def test_large_bodies_are_compressed_in_threadpool(self, monkeypatch):
+        """Test the offload to the threadpool above the thread threshold."""
+        offloaded = []
+
+        async def run_in_threadpool(func, *args):
+            offloaded.append(len(args[0]))
+            return func(*args)
+
+        monkeypatch.setattr(compression, "run_in_threadpool", run_in_threadpool)
+        app = CompressionMiddleware(_large_json, ResponseCompressor(thread_threshold=40_000))
+        response = _get(app, GZIP)
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert int(response.headers["Content-Length"]) < 1000
+        assert len(response.json()) == 5000
+        assert offloaded and offloaded[0] > 40_000
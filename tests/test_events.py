@@ -0,0 +1,122 @@
+"""
+Unit tests for the change stream.
+"""
+
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.database.db import db
+from app.database.event_log import EventLog
+from app.routers.events import event_stream
+
+
+class TestEventLog:
+    """Tests for the EventLog ring buffer and segments."""
+
+    def test_cursor_skips_events_evicted_from_ring(self):
+        """Test that a slow subscriber counts the events it missed."""
+        log = EventLog(capacity=4)
+        subscription = log.subscribe("slow")
+        for product_id in range(1, 7):
+            log.append("product", "updated", product_id)
+
+        events = subscription.poll()
+
+        assert [event.seq for event in events] == [3, 4, 5, 6]
+        assert subscription.missed == 2
+        assert subscription.lag == 0
+        assert log.stats()["subscribers"] == {"slow": 0}
+
+    def test_segments_serve_old_events_and_survive_restart(self, tmp_path):
+        """Test catching up from segment files and resuming sequence numbers."""
+        log = EventLog(capacity=2, segment_dir=str(tmp_path), segment_events=3)
+        for product_id in range(1, 6):
+            log.append("product", "stock", product_id, {"stock": product_id})
+
+        assert [event.entity_id for event in log.read(0, limit=4)] == [1, 2, 3, 4]
+        log.close()
+
+        restarted = EventLog(capacity=2, segment_dir=str(tmp_path), segment_events=3)
+        restarted.append("product", "deleted", 1)
+
+        assert restarted.last_seq == 6
+        assert [event.type for event in restarted.read(4)] == ["product.stock", "product.deleted"]
+        assert len(list(tmp_path.iterdir())) == 3
+
+    def test_waiters_are_woken_from_other_threads(self):
+        """Test that an append from a worker thread ends a long poll."""
+        log = EventLog()
+
+        async def scenario():
+            subscription = log.subscribe("tail")
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, threading.Thread(
+                target=log.append, args=("order", "created", 1)
+            ).start)
+            return await subscription.next(timeout=5)
+
+        events = asyncio.run(scenario())
+
+        assert [event.type for event in events] == ["order.created"]
+
+
+class TestEventEndpoints:
+    """Tests for the events API."""
+
+    def test_mutations_are_streamed_in_order(self, admin_client: TestClient):
+        """Test that service mutations show up as sequenced events."""
+        product_id = admin_client.post("/products/", json={
+            "name": "Lamp",
+            "description": "Desk lamp",
+            "price": 20.00,
+            "stock": 5,
+            "category": "Home",
+        }).json()["id"]
+        admin_client.put(f"/products/{product_id}", json={"price": 18.00})
+        admin_client.post("/cart/items", json={"product_id": product_id, "quantity": 2})
+        admin_client.post("/orders/")
+
+        response = admin_client.get("/events/?after=0")
+        events = response.json()
+
+        assert [event["type"] for event in events] == [
+            "product.created",
+            "product.updated",
+            "cart.item_added",
+            "order.created",
+            "cart.cleared",
+            "product.stock",
+            "order.status",
+        ]
+        assert [event["seq"] for event in events] == list(range(1, 8))
+        assert events[1]["data"] == {"price": 18.0}
+        assert events[5]["data"] == {"stock": 3}
+        assert events[6]["data"] == {"status": "confirmed"}
+        assert response.headers["X-Next-Cursor"] == str(events[-1]["seq"])
+
+        caught_up = admin_client.get(f"/events/?after={events[-1]['seq']}&timeout=0.01")
+        assert caught_up.json() == []
+        assert caught_up.headers["X-Next-Cursor"] == str(events[-1]["seq"])
+
+    def test_requires_admin(self, auth_client: TestClient):
+        """Test that regular users cannot read the change stream."""
+        assert auth_client.get("/events/").status_code == 403
+
+    def test_event_stream_messages(self):
+        """Test the server-sent event encoding of the stream."""
+        db.events.append("category", "created", 7, {"name": "Garden"})
+
+        async def first_message():
+            stream = event_stream(0, keepalive=0.01)
+            try:
+                return await stream.__anext__()
+            finally:
+                await stream.aclose()
+
+        header, data = asyncio.run(first_message()).decode().split("data: ")
+
+        assert header == "id: 1\nevent: category.created\n"
+        assert json.loads(data)["data"] == {"name": "Garden"}
@@ -0,0 +1,109 @@
+"""
+Unit tests for sparse fieldsets (?fields=).
+"""
+
+from dataclasses import dataclass
+
+from fastapi.testclient import TestClient
+
+from app.core.fields import FieldSelector
+from app.schemas.user import UserResponse
+
+
+def _create_products(client: TestClient, count: int):
+    for i in range(count):
+        client.post("/products/", json={
+            "name": f"Product {i}",
+            "description": "Long description " * 20,
+            "price": 10.0 + i,
+            "stock": 5,
+            "category": "General",
+        })
+
+
+class TestFieldSelector:
+    """Tests for compiling field-set serializers."""
+
+    def test_serializers_are_cached_per_field_set(self):
+        """Test that field order is normalized and each set compiles once."""
+        selector = FieldSelector(UserResponse)
+        first = selector.parse("id, full_name")
+        assert first == ("full_name", "id")
+        assert selector.row_function(first) is selector.row_function(selector.parse("full_name,id"))
+        assert selector.parse("") is None
+
+    def test_unrequested_fields_are_not_read(self):
+        """Test that the row function only touches the requested attributes."""
+
+        @dataclass
+        class Tripwire:
+            id: int
+
+            @property
+            def email(self):
+                raise AssertionError("email was read")
+
+        selector = FieldSelector(UserResponse)
+        assert selector.row_function(("id",))(Tripwire(3)) == {"id": 3}
+
+
+class TestFieldsParameter:
+    """Tests for ?fields= on list endpoints."""
+
+    def test_products_fields(self, client: TestClient):
+        """Test that only the requested product fields are returned."""
+        _create_products(client, 3)
+
+        response = client.get("/products/?fields=price,id,name")
+
+        assert response.status_code == 200
+        assert response.json()[0] == {"id": 1, "name": "Product 0", "price": 10.0}
+        assert len(response.json()) == 3
+
+    def test_all_fields_match_the_full_response(self, client: TestClient):
+        """Test that selecting every field gives the same JSON as no selection."""
+        _create_products(client, 2)
+        every_field = "id,name,description,price,stock,category,created_at,is_hot"
+
+        assert client.get(f"/products/?fields={every_field}").json() == client.get("/products/").json()
+
+    def test_unknown_field_is_rejected(self, client: TestClient):
+        """Test 400 with the available fields for an unknown field."""
+        response = client.get("/products/?fields=id,secret")
+
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+
+    def test_orders_fields(self, auth_client: TestClient):
+        """Test computed order fields and the paging header."""
+        _create_products(auth_client, 1)
+        for _ in range(2):
+            auth_client.post("/cart/items", json={"product_id": 1, "quantity": 1})
+            auth_client.post("/orders/")
+
+        response = auth_client.get("/orders/?limit=1&fields=status,items")
+
+        assert response.json() == [{
+            "items": [{
+                "product_id": 1,
+                "product_name": "Product 0",
+                "quantity": 1,
+                "unit_price": 10.0,
+                "total_price": 10.0,
+            }],
+            "status": "confirmed",
+        }]
+        assert "X-Next-Cursor" in response.headers
+
+    def test_reviews_and_users_fields(self, auth_client: TestClient):
+        """Test fields on product reviews and the user list."""
+        _create_products(auth_client, 1)
+        auth_client.post("/reviews/", json={
+            "product_id": 1, "rating": 4, "title": "Good", "comment": "Does what it says.",
+        })
+
+        reviews = auth_client.get("/reviews/product/1?fields=rating,title").json()
+        users = auth_client.get("/users/?fields=email").json()
+
+        assert reviews == [{"rating": 4, "title": "Good"}]
+        assert users == [{"email": "testuser@example.com"}]
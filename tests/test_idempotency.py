@@ -0,0 +1,124 @@
+"""
+Unit tests for Idempotency-Key handling.
+"""
+
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.database.db import db
+from app.middleware.idempotency import IdempotencyMiddleware, IdempotencyStore
+from main import app
+
+
+def _cart_with_product(client: TestClient) -> int:
+    product_id = client.post("/products/", json={
+        "name": "Kettle",
+        "description": "Electric kettle",
+        "price": 30.00,
+        "stock": 10,
+        "category": "Kitchen",
+    }).json()["id"]
+    client.post("/cart/items", json={"product_id": product_id, "quantity": 1})
+    return product_id
+
+
+class TestIdempotency:
+    """Tests for replaying POSTs sent with an Idempotency-Key."""
+
+    def test_retried_order_is_replayed(self, auth_client: TestClient):
+        """Test that a retry returns the original order without a second one."""
+        _cart_with_product(auth_client)
+        headers = {"Idempotency-Key": "order-1"}
+
+        first = auth_client.post("/orders/", headers=headers)
+        retry = auth_client.post("/orders/", headers=headers)
+
+        assert first.status_code == 201
+        assert retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert len(db.orders) == 1
+
+    def test_key_reused_for_different_request(self, auth_client: TestClient):
+        """Test that a key cannot be reused with a different body."""
+        product_id = _cart_with_product(auth_client)
+        headers = {"Idempotency-Key": "add-1"}
+
+        first = auth_client.post(
+            "/cart/items", json={"product_id": product_id, "quantity": 1}, headers=headers
+        )
+        retry = auth_client.post(
+            "/cart/items", json={"product_id": product_id, "quantity": 1}, headers=headers
+        )
+        other = auth_client.post(
+            "/cart/items", json={"product_id": product_id, "quantity": 3}, headers=headers
+        )
+
+        assert first.json()["items"][0]["quantity"] == 2
+        assert retry.json() == first.json()
+        assert other.status_code == 422
+
+    def test_concurrent_retries_execute_once(self):
+        """Test that retries arriving mid-flight wait for the first request."""
+        calls = []
+
+        async def slow_endpoint(scope, receive, send):
+            calls.append(scope["path"])
+            await asyncio.sleep(0.05)
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": str(len(calls)).encode()})
+
+        middleware = IdempotencyMiddleware(slow_endpoint, IdempotencyStore(), ["/orders/"])
+        headers = {
+            "Authorization": f"Bearer {create_access_token({'sub': '1'})}",
+            "Idempotency-Key": "order-2",
+        }
+
+        async def burst():
+            transport = httpx.ASGITransport(app=middleware)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(
+                    *(client.post("/orders/", headers=headers) for _ in range(10))
+                )
+
+        responses = asyncio.run(burst())
+
+        assert calls == ["/orders/"]
+        assert [response.text for response in responses] == ["1"] * 10
+        assert sum("idempotent-replayed" in response.headers for response in responses) == 9
+
+    def test_keys_are_scoped_and_optional(self, auth_client: TestClient):
+        """Test that requests without a key or a user are not deduplicated."""
+        _cart_with_product(auth_client)
+
+        assert auth_client.post("/orders/").status_code == 201
+        assert auth_client.post("/orders/").status_code == 400
+        anonymous = TestClient(app).post("/orders/", headers={"Idempotency-Key": "x"})
+        assert anonymous.status_code == 401
+
+
+class TestIdempotencyStore:
+    """Tests for the bounded key store."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that completed entries are evicted oldest first."""
+        store = IdempotencyStore(max_keys=2, ttl=60)
+        for key in ("a", "b"):
+            store.begin(key, "fp").done.set()
+        store.get("a")
+        store.begin("c", "fp")
+
+        assert store.get("b") is None
+        assert store.get("a") is not None
+        assert len(store) == 2
+
+    def test_entries_expire(self):
+        """Test that completed entries expire after the ttl."""
+        store = IdempotencyStore(ttl=0)
+        store.begin("a", "fp").done.set()
+
+        assert store.get("a") is None
@@ -0,0 +1,130 @@
+"""
+Unit tests for id allocation.
+"""
+
+import sys
+import threading
+
+from app.database.db import Database
+from app.database.ids import EPOCH_MS, IdAllocator, IdStore, SnowflakeIds
+
+
+def _hammer(next_id, threads: int = 16, per_thread: int = 5000):
+    """Ids allocated by many threads at once, all started together."""
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+
+    def worker(slot: int):
+        barrier.wait()
+        results[slot] = [next_id() for _ in range(per_thread)]
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    # Switch threads as often as possible so allocations interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    return results
+
+
+class TestIdAllocator:
+    """Tests for block-per-thread sequential ids."""
+
+    def test_one_thread_numbers_consecutively(self):
+        """Test that a single thread gets 1, 2, 3... across blocks."""
+        allocator = IdAllocator("order", block_size=4)
+
+        assert [allocator.next_id() for _ in range(10)] == list(range(1, 11))
+        assert allocator.blocks == 3
+
+    def test_threads_get_disjoint_blocks(self):
+        """Test that each thread numbers from its own block."""
+        allocator = IdAllocator("order", block_size=100)
+        allocator.next_id()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(allocator.next_id()))
+        thread.start()
+        thread.join()
+
+        assert other == [101]
+        assert allocator.next_id() == 2
+
+    def test_stress_unique(self):
+        """Test that ids from many threads with tiny blocks never collide."""
+        allocator = IdAllocator("order", block_size=3)
+
+        ids = [i for batch in _hammer(allocator.next_id) for i in batch]
+
+        assert len(ids) == len(set(ids)) == 16 * 5000
+        assert all(batch == sorted(batch) for batch in _hammer(allocator.next_id, 4, 100))
+
+    def test_database_ids_unique_under_threads(self):
+        """Test the database allocators under concurrent inserts."""
+        database = Database()
+
+        ids = [i for batch in _hammer(database.get_next_order_id, 8, 2000) for i in batch]
+
+        assert len(set(ids)) == 8 * 2000
+
+    def test_high_water_mark_survives_restart(self, tmp_path):
+        """Test that a restarted allocator never reissues ids."""
+        path = str(tmp_path / "ids.json")
+        allocator = IdAllocator("order", block_size=10, store=IdStore(path), reserve=50)
+        issued = [allocator.next_id() for _ in range(75)]
+        # Marks are written a reserve at a time, not per block
+        assert IdStore(path).get("order") == 121
+
+        restarted = IdAllocator("order", block_size=10, store=IdStore(path), reserve=50)
+
+        assert restarted.next_id() == 121 > max(issued)
+
+    def test_advance_to_and_reset(self):
+        """Test skipping ids taken elsewhere, including in open blocks."""
+        allocator = IdAllocator("product", block_size=10)
+        allocator.next_id()
+
+        allocator.advance_to(500)
+        assert allocator.next_id() == 500
+
+        allocator.reset()
+        assert allocator.next_id() == 1
+
+
+class TestSnowflakeIds:
+    """Tests for time-ordered ids."""
+
+    def test_ids_sort_by_time(self):
+        """Test ordering within and across milliseconds."""
+        now = [EPOCH_MS / 1000 + 10]
+        ids = SnowflakeIds(worker_id=3, clock=lambda: now[0])
+
+        first, second = ids.next_id(), ids.next_id()
+        now[0] += 0.002
+        third = ids.next_id()
+
+        assert first < second < third
+        assert second - first == 1
+        assert (first >> 12) & 0x3FF == 3
+        assert SnowflakeIds.created_at(first).timestamp() == EPOCH_MS / 1000 + 10
+
+    def test_clock_going_back_and_sequence_overflow(self):
+        """Test that ids keep increasing when the clock stalls or goes back."""
+        now = [EPOCH_MS / 1000 + 10]
+        ids = SnowflakeIds(clock=lambda: now[0])
+        previous = ids.next_id()
+        now[0] -= 1
+        for _ in range(5000):
+            current = ids.next_id()
+            assert current > previous
+            previous = current
+
+    def test_stress_unique(self):
+        """Test that concurrent threads never get the same id."""
+        ids = [i for batch in _hammer(SnowflakeIds().next_id) for i in batch]
+
+        assert len(set(ids)) == 16 * 5000
@@ -0,0 +1,158 @@
+"""
+Unit tests for the background job queue and order processing jobs.
+"""
+
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.jobs import JobQueue
+from app.database.db import db
+from app.routers.orders import order_service
+
+
+class TestJobQueue:
+    """Tests for the JobQueue utility."""
+
+    def test_workers_run_jobs_out_of_band(self):
+        """Test that submitted jobs run on the workers and drain completes them."""
+        queue = JobQueue("test.basic")
+        done = []
+        queue.register("record", done.append)
+
+        async def scenario():
+            await queue.start(workers=2)
+            for value in range(5):
+                queue.submit("record", value)
+            queued = list(done)
+            await queue.drain(timeout=1)
+            return queued
+
+        assert asyncio.run(scenario()) == []
+        assert sorted(done) == [0, 1, 2, 3, 4]
+        assert queue.stats()["completed"] == 5
+        assert queue.stats()["workers"] == 0
+
+    def test_retries_then_dead_letters(self):
+        """Test that failing jobs are retried with backoff, then dead-lettered."""
+        queue = JobQueue("test.failing", max_attempts=3, retry_delay=0.01)
+        attempts = []
+
+        def flaky(value):
+            attempts.append(value)
+            if value == "broken" or len(attempts) < 2:
+                raise RuntimeError(value)
+
+        queue.register("flaky", flaky)
+
+        async def scenario():
+            await queue.start(workers=1)
+            queue.submit("flaky", "ok")
+            queue.submit("flaky", "broken")
+            await queue.drain(timeout=1)
+
+        asyncio.run(scenario())
+
+        assert attempts.count("ok") == 2
+        assert attempts.count("broken") == 3
+        assert [job.args for job in queue.dead_letters] == [("broken",)]
+        assert queue.stats()["retried"] == 3
+        assert queue.stats()["dead_lettered"] == 1
+
+    def test_runs_inline_without_workers(self):
+        """Test that jobs run immediately when the queue was never started."""
+        queue = JobQueue("test.inline")
+        done = []
+        queue.register("record", done.append)
+
+        queue.submit("record", 1)
+
+        assert done == [1]
+
+    def test_blocking_handlers_run_in_thread_pool(self):
+        """Test that handlers registered as blocking run off the event loop."""
+        queue = JobQueue("test.blocking")
+        threads = []
+        queue.register("record", lambda: threads.append(threading.get_ident()), blocking=True)
+
+        async def scenario():
+            await queue.start(workers=1)
+            queue.submit("record")
+            await queue.drain(timeout=1)
+
+        asyncio.run(scenario())
+        queue.submit("record")
+
+        assert threads[0] != threading.get_ident()
+        assert threads[1] == threading.get_ident()
+
+    def test_drain_timeout_dead_letters_remaining_jobs(self):
+        """Test that jobs still queued at the drain deadline are dead-lettered."""
+        queue = JobQueue("test.slow")
+
+        async def slow(value):
+            await asyncio.sleep(0.2)
+
+        queue.register("slow", slow)
+
+        async def scenario():
+            await queue.start(workers=1)
+            for value in range(3):
+                queue.submit("slow", value)
+            await asyncio.sleep(0)
+            await queue.drain(timeout=0.05)
+
+        asyncio.run(scenario())
+
+        assert [job.args for job in queue.dead_letters] == [(1,), (2,)]
+
+
+class TestOrderJobs:
+    """Tests for order side effects handled by the job queue."""
+
+    def test_order_is_confirmed_in_background(self, auth_client: TestClient):
+        """Test that a new order is confirmed, aggregated and exported out of band."""
+        product_id = auth_client.post("/products/", json={
+            "name": "Teapot",
+            "description": "Ceramic teapot",
+            "price": 15.00,
+            "stock": 5,
+            "category": "Kitchen",
+        }).json()["id"]
+        auth_client.post("/cart/items", json={"product_id": product_id, "quantity": 2})
+
+        with auth_client:
+            created = auth_client.post("/orders/")
+            order_id = created.json()["id"]
+            deadline = time.monotonic() + 5
+            while auth_client.get(f"/orders/{order_id}").json()["status"] != "confirmed":
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            metrics = auth_client.get("/metrics").json()["jobs"]["orders"]
+
+        assert created.json()["status"] == "pending"
+        assert order_id in db.aggregated_orders
+        assert "<status>confirmed</status>" in db.order_exports[order_id]
+        assert metrics["workers"] > 0
+        assert metrics["completed"] >= 1
+
+    def test_cancel_before_processing_skips_aggregates(self, auth_client: TestClient):
+        """Test that cancelling an unprocessed order leaves the aggregates alone."""
+        product_id = auth_client.post("/products/", json={
+            "name": "Mug",
+            "description": "Coffee mug",
+            "price": 5.00,
+            "stock": 5,
+            "category": "Kitchen",
+        }).json()["id"]
+        auth_client.post("/cart/items", json={"product_id": product_id, "quantity": 1})
+
+        created = order_service.create_order_from_cart(auth_client.test_user_id)
+        order_service.cancel_order(created.id)
+        order_service.process_placed_order(created.id)
+
+        assert created.id not in db.aggregated_orders
+        assert db.facts.columns()["quantity"].sum() == 0
+        assert db.orders[created.id].status.value == "cancelled"
@@ -130,3 +130,25 @@ class TestOrders:
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
+
+    def test_get_my_orders_paginated(self, auth_client: TestClient):
+        """Test paging through orders newest first with a cursor."""
+        product_id = self._setup_cart_with_items(auth_client)
+        order_ids = [auth_client.post("/orders/").json()["id"]]
+        for _ in range(4):
+            auth_client.post("/cart/items", json={
+                "product_id": product_id,
+                "quantity": 1,
+            })
+            order_ids.append(auth_client.post("/orders/").json()["id"])
+
+        first_page = auth_client.get("/orders/?limit=2")
+        cursor = first_page.headers["X-Next-Cursor"]
+        second_page = auth_client.get(f"/orders/?limit=2&cursor={cursor}")
+        cursor = second_page.headers["X-Next-Cursor"]
+        last_page = auth_client.get(f"/orders/?limit=2&cursor={cursor}")
+
+        seen = [order["id"] for page in (first_page, second_page, last_page)
+                for order in page.json()]
+        assert seen == order_ids[::-1]
+        assert "X-Next-Cursor" not in last_page.headers
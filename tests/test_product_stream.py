@@ -0,0 +1,133 @@
+"""
+Unit tests for live product updates.
+"""
+
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from app.database.db import db
+from app.routers.products import product_updates
+from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+from app.services.product_service import ProductService
+from app.services.product_stream_service import ProductStreamService
+
+product_service = ProductService(db)
+
+
+def _product(name: str = "Lamp", stock: int = 5) -> int:
+    return product_service.create_product(ProductCreate(
+        name=name, description="", price=20.0, stock=stock, category="Home",
+    )).id
+
+
+def _decode(batch: bytes) -> dict:
+    return json.loads(batch)
+
+
+class TestProductStreamService:
+    """Tests for the fan-out hub."""
+
+    def test_bursts_are_coalesced_per_tick(self):
+        """Test that many changes in one tick arrive as one batch per client."""
+        lamp, chair = _product(), _product("Chair")
+        hub = ProductStreamService(db, tick=0.02)
+
+        async def scenario():
+            watcher = hub.connect([lamp])
+            other = hub.connect([chair])
+            snapshot = await watcher.next_batch(timeout=1)
+            for price in (19.0, 18.0, 17.0):
+                product_service.update_product(lamp, ProductUpdate(price=price))
+            product_service.update_stock(lamp, -2)
+            update = await watcher.next_batch(timeout=1)
+            idle = await other.next_batch(timeout=1)
+            hub.disconnect(watcher)
+            hub.disconnect(other)
+            return snapshot, update, idle
+
+        snapshot, update, idle = asyncio.run(scenario())
+
+        assert _decode(snapshot) == {str(lamp): {"price": 20.0, "stock": 5}}
+        assert _decode(update) == {str(lamp): {"price": 17.0, "stock": 3}}
+        assert _decode(idle) == {str(chair): {"price": 20.0, "stock": 5}}
+        assert hub.stats()["ticks"] == 1
+        assert hub.stats()["connections"] == 0
+
+    def test_checkout_and_deletion_are_streamed(self):
+        """Test that stock taken by checkout and deleted products are pushed."""
+        lamp = _product()
+        CartService(db).add_item(7, lamp, 2)
+        hub = ProductStreamService(db, tick=0.01)
+
+        async def scenario():
+            watcher = hub.connect([lamp, 99])
+            await watcher.next_batch(timeout=1)
+            OrderService(db).create_order_from_cart(7)
+            checkout = await watcher.next_batch(timeout=1)
+            product_service.delete_product(lamp)
+            deleted = await watcher.next_batch(timeout=1)
+            hub.disconnect(watcher)
+            return checkout, deleted
+
+        checkout, deleted = asyncio.run(scenario())
+
+        assert _decode(checkout) == {str(lamp): {"stock": 3}}
+        assert _decode(deleted) == {str(lamp): {"deleted": True}}
+
+    def test_slow_consumers_are_merged_then_dropped(self):
+        """Test that unread updates merge into one batch and stalled clients are closed."""
+        lamp = _product(stock=10)
+        hub = ProductStreamService(db, tick=0.01, max_stall=0.2)
+
+        async def scenario():
+            slow = hub.connect([lamp])
+            fast = hub.connect([lamp])
+            await slow.next_batch(timeout=1)
+            await fast.next_batch(timeout=1)
+            for _ in range(3):
+                product_service.update_stock(lamp, -1)
+                await fast.next_batch(timeout=1)
+            merged = dict(slow.pending)
+            await asyncio.sleep(0.3)
+            product_service.update_stock(lamp, -1)
+            await fast.next_batch(timeout=1)
+            closed = slow.closed
+            hub.disconnect(fast)
+            return merged, closed
+
+        merged, closed = asyncio.run(scenario())
+
+        assert merged == {lamp: f'"{lamp}":{{"stock":7}}'}
+        assert closed
+        assert hub.stats()["dropped"] == 1
+
+
+class TestProductStreamEndpoint:
+    """Tests for GET /products/stream."""
+
+    def test_rejects_bad_ids(self, client: TestClient):
+        """Test validation of the ids parameter."""
+        too_many = ",".join(str(i) for i in range(101))
+
+        assert client.get("/products/stream?ids=1,x").status_code == 400
+        assert client.get(f"/products/stream?ids={too_many}").status_code == 400
+
+    def test_first_event_is_a_snapshot(self):
+        """Test the server-sent event framing of the stream."""
+        lamp = _product()
+
+        async def first_message():
+            stream = product_updates({lamp})
+            try:
+                return await stream.__anext__()
+            finally:
+                await stream.aclose()
+
+        header, data = asyncio.run(first_message()).decode().split("data: ")
+
+        assert header == "id: 1\nevent: update\n"
+        assert json.loads(data) == {str(lamp): {"price": 20.0, "stock": 5}}
@@ -0,0 +1,84 @@
+"""
+Unit tests for the request profiler.
+"""
+
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.profiling import ProfilingMiddleware, SamplingProfiler
+
+
+def _spin(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _app(profiler: SamplingProfiler) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/spin/{millis}")
+    async def spin(millis: int):
+        _spin(millis / 1000)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return app
+
+
+class TestSamplingProfiler:
+    """Tests for sampling and aggregating request stacks."""
+
+    def test_stacks_are_collapsed_per_route(self):
+        """Test that samples land under the route template, down to the hot function."""
+        profiler = SamplingProfiler(sample_rate=1.0, interval=0.001)
+        client = TestClient(_app(profiler))
+        for millis in (30, 40):
+            assert client.get(f"/spin/{millis}").status_code == 200
+
+        lines = profiler.collapsed().splitlines()
+        assert lines
+        assert all(line.startswith("GET /spin/{millis};") for line in lines)
+        assert any("_spin (" in line for line in lines)
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.stats()["samples"]
+        assert profiler.collapsed(route="GET /other") == ""
+
+    def test_requests_are_selected(self):
+        """Test the path, header and session triggers, and that nothing is profiled by default."""
+        idle = SamplingProfiler()
+        TestClient(_app(idle)).get("/spin/1")
+        assert idle.stats()["profiled_requests"] == 0
+        assert idle._thread is None
+
+        profiler = SamplingProfiler(paths=["/spin/2"], header_secret="s3cret")
+        client = TestClient(_app(profiler))
+        client.get("/spin/1")
+        client.get("/spin/1", headers={"X-Profile": "wrong"})
+        assert profiler.stats()["profiled_requests"] == 0
+        client.get("/spin/2")
+        client.get("/spin/1", headers={"X-Profile": "s3cret"})
+        profiler.session(60)
+        client.get("/spin/1")
+        assert profiler.stats()["profiled_requests"] == 3
+
+        profiler.clear()
+        assert not profiler.session_active
+
+
+class TestProfileEndpoint:
+    """Tests for GET /debug/profile."""
+
+    def test_profile_is_admin_only(self, auth_client: TestClient):
+        """Test that regular users can't read profiles."""
+        assert auth_client.get("/debug/profile").status_code == 403
+
+    def test_profile_session(self, admin_client: TestClient):
+        """Test an on-demand session returning collapsed stacks as text."""
+        response = admin_client.get("/debug/profile", params={"seconds": 0.01})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert admin_client.delete("/debug/profile").status_code == 204
+        assert admin_client.get("/metrics").json()["profiler"]["session_active"] is False
@@ -0,0 +1,95 @@
+"""
+Unit tests for rate limiting.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.middleware.rate_limit import RateLimiter, RateLimitMiddleware, RatePolicy
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+class TestRateLimiter:
+    """Tests for the token bucket table."""
+
+    def test_parse_policies(self):
+        """Test the "<requests>/<period>" policy syntax."""
+        assert RatePolicy.parse("a", "10/minute").rate == pytest.approx(10 / 60)
+        assert RatePolicy.parse("b", "3/0.5").period == 0.5
+        with pytest.raises(ValueError):
+            RatePolicy.parse("c", "0/second")
+
+    def test_buckets_refill_over_time(self):
+        """Test bursts up to the limit and continuous refill."""
+        limiter = RateLimiter({"*": "2/second"})
+        policy = limiter.policy_for("GET", "/anything")
+
+        assert [limiter.hit(policy, "ip:1", now=0)[0] for _ in range(3)] == [True, True, False]
+        assert limiter.hit(policy, "ip:1", now=0.5) == (True, 0.0)
+        assert limiter.hit(policy, "ip:2", now=0.5) == (True, 1.0)
+
+    def test_table_is_bounded(self):
+        """Test eviction of refilled buckets and of the oldest beyond max_keys."""
+        limiter = RateLimiter({"*": "1/second"}, max_keys=3)
+        policy = limiter.policy_for("GET", "/")
+        for client in range(5):
+            limiter.hit(policy, f"ip:{client}", now=0)
+
+        assert len(limiter) == 3
+        limiter.hit(policy, "ip:new", now=10)
+        assert len(limiter) == 1
+        assert limiter.stats()["evicted"] == 5
+
+
+class TestRateLimitMiddleware:
+    """Tests for rate limiting HTTP requests."""
+
+    def test_login_attempts_are_limited(self, client: TestClient):
+        """Test that repeated logins from one address get 429 with headers."""
+        form = {"username": "nobody@example.com", "password": "wrong-password"}
+        responses = [client.post("/auth/login", data=form) for _ in range(11)]
+
+        assert [response.status_code for response in responses] == [401] * 10 + [429]
+        assert responses[0].headers["RateLimit-Limit"] == "10"
+        assert responses[0].headers["RateLimit-Remaining"] == "9"
+        assert responses[0].headers["RateLimit-Policy"] == "10;w=60"
+        assert int(responses[-1].headers["Retry-After"]) > 0
+        assert "RateLimit-Limit" not in client.get("/health").headers
+
+    def test_users_get_their_own_buckets(self):
+        """Test keying by token subject, falling back to the client address."""
+        limiter = RateLimiter({"*": "2/minute"})
+        app = RateLimitMiddleware(_ok, limiter)
+        tokens = [create_access_token({"sub": str(user_id)}) for user_id in (1, 2)]
+
+        async def burst():
+            transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                statuses = {}
+                for name, headers in [
+                    ("user1", {"Authorization": f"Bearer {tokens[0]}"}),
+                    ("user2", {"Authorization": f"Bearer {tokens[1]}"}),
+                    ("anonymous", {}),
+                    ("forged", {"Authorization": "Bearer not-a-token"}),
+                ]:
+                    statuses[name] = [
+                        (await http.get("/", headers=headers)).status_code for _ in range(2)
+                    ]
+                return statuses
+
+        statuses = asyncio.run(burst())
+
+        assert statuses == {
+            "user1": [200, 200],
+            "user2": [200, 200],
+            "anonymous": [200, 200],
+            "forged": [429, 429],
+        }
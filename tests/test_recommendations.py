@@ -0,0 +1,158 @@
+"""
+Unit tests for "frequently bought together" recommendations.
+"""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.database.copurchase import CoPurchaseIndex, count_pairs
+from app.database.db import Database
+from app.models.product import Product
+from app.services import recommendation_service
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+from app.services.recommendation_service import RecommendationService
+
+
+def _order(*product_ids):
+    return SimpleNamespace(items=[SimpleNamespace(product_id=pid) for pid in product_ids])
+
+
+class TestCoPurchaseIndex:
+    """Tests for the co-purchase index."""
+
+    def test_top_neighbours(self):
+        """Test neighbours ranked by co-purchase count."""
+        index = CoPurchaseIndex(top_k=2)
+        index.record_order(_order(1, 2, 3))
+        index.record_order(_order(1, 3))
+        index.record_order(_order(1, 4))
+        index.record_order(_order(1, 4))
+        index.record_order(_order(1, 4))
+
+        assert index.top(1, 5) == [(4, 3), (3, 2)]
+
+    def test_cancellation_restores_outsider(self):
+        """Test that a decremented member can be replaced in the top-k."""
+        index = CoPurchaseIndex(top_k=1)
+        index.record_order(_order(1, 2))
+        index.record_order(_order(1, 2))
+        index.record_order(_order(1, 3))
+
+        index.record_order(_order(1, 2), delta=-1)
+        index.record_order(_order(1, 2), delta=-1)
+
+        assert index.top(1, 1) == [(3, 1)]
+
+    def test_pruning_bounds_neighbours(self):
+        """Test that long-tail pairs are pruned."""
+        index = CoPurchaseIndex(top_k=3, max_neighbours=8)
+        for _ in range(5):
+            index.record_order(_order(1, 2))
+        for neighbour in range(100, 200):
+            index.record_order(_order(1, neighbour))
+
+        assert len(index._counts[1]) <= 8
+        assert index.top(1, 1) == [(2, 5)]
+
+    def test_load_matches_incremental(self):
+        """Test that a batch rebuild gives the same ranking."""
+        baskets = [[1, 2, 3], [1, 3], [2, 3], [1, 2, 3]]
+        incremental = CoPurchaseIndex()
+        for basket in baskets:
+            incremental.record_order(_order(*basket))
+        rebuilt = CoPurchaseIndex()
+        rebuilt.load(count_pairs(baskets))
+
+        for product_id in (1, 2, 3):
+            assert rebuilt.top(product_id, 5) == incremental.top(product_id, 5)
+
+
+class TestRebuild:
+    """Tests for recounting co-purchases from a snapshot."""
+
+    def test_journal_replays_orders_after_the_snapshot(self):
+        """Test that load() applies only orders newer than since_version."""
+        index = CoPurchaseIndex()
+        index.record_order(_order(1, 2))
+        index.begin_rebuild()
+        version = index.version
+        index.record_order(_order(1, 2))
+        index.record_order(_order(1, 3))
+
+        index.load(count_pairs([[1, 2]]), since_version=version)
+        index.end_rebuild()
+
+        assert index.top(1, 5) == [(2, 2), (3, 1)]
+        assert index._journal == []
+
+    def test_rebuild_counts_each_order_once(self, monkeypatch):
+        """Test pending orders and orders recorded mid-rebuild."""
+        database = Database()
+        database.products[1] = Product(1, "Phone", "", 10.0, 100, "General")
+        database.products[2] = Product(2, "Case", "", 5.0, 100, "General")
+        carts, orders = CartService(database), OrderService(database)
+
+        def place(user_id: int):
+            carts.add_item(user_id, 1, 1)
+            carts.add_item(user_id, 2, 1)
+            return orders.create_order_from_cart(user_id)
+
+        orders.process_placed_order(place(1).id)
+        pending, late = place(2), place(3)
+
+        def count_then_process(baskets):
+            # Another thread aggregates an order while the rebuild counts
+            orders.process_placed_order(late.id)
+            return count_pairs(baskets)
+
+        monkeypatch.setattr(recommendation_service, "count_pairs", count_then_process)
+        assert RecommendationService(database).rebuild(workers=1) == 1
+        assert database.copurchases.top(1, 5) == [(2, 2)]
+
+        # The pending order's own job records it, exactly once
+        orders.process_placed_order(pending.id)
+        assert database.copurchases.top(1, 5) == [(2, 3)]
+
+
+class TestRecommendationsEndpoint:
+    """Tests for the recommendations endpoint."""
+
+    def _create_product(self, client: TestClient, name: str) -> int:
+        response = client.post("/products/", json={
+            "name": name,
+            "description": f"{name} description",
+            "price": 10.00,
+            "stock": 100,
+            "category": "General",
+        })
+        return response.json()["id"]
+
+    def test_recommendations(self, auth_client: TestClient):
+        """Test recommendations from orders and cancellations."""
+        phone, case, charger = (
+            self._create_product(auth_client, name)
+            for name in ("Phone", "Case", "Charger")
+        )
+        for items in ([phone, case], [phone, case, charger], [phone, charger]):
+            for product_id in items:
+                auth_client.post("/cart/items", json={
+                    "product_id": product_id,
+                    "quantity": 1,
+                })
+            order_id = auth_client.post("/orders/").json()["id"]
+        auth_client.post(f"/orders/{order_id}/cancel")
+
+        response = auth_client.get(f"/products/{phone}/recommendations")
+
+        assert response.status_code == 200
+        assert [(r["product_id"], r["times_bought_together"]) for r in response.json()] == [
+            (case, 2), (charger, 1),
+        ]
+
+    def test_recommendations_product_not_found(self, client: TestClient):
+        """Test recommendations for a non-existent product."""
+        response = client.get("/products/999/recommendations")
+
+        assert response.status_code == 404
@@ -0,0 +1,103 @@
+"""
+Unit tests for sales reports.
+"""
+
+import time
+from datetime import date, datetime, timezone
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.services.analytics_service import _local_days
+
+
+class TestReports:
+    """Tests for report endpoints."""
+
+    def _create_product(self, client: TestClient, name: str, category: str) -> int:
+        """Helper to create a product and return its ID."""
+        response = client.post("/products/", json={
+            "name": name,
+            "description": f"{name} description",
+            "price": 10.00,
+            "stock": 100,
+            "category": category,
+        })
+        return response.json()["id"]
+
+    def _order(self, client: TestClient, items) -> int:
+        """Helper to order {product_id: quantity} and return the order ID."""
+        for product_id, quantity in items.items():
+            client.post("/cart/items", json={
+                "product_id": product_id,
+                "quantity": quantity,
+            })
+        return client.post("/orders/").json()["id"]
+
+    def test_local_days_follow_dst(self, monkeypatch):
+        """Test that each timestamp uses its own date's UTC offset."""
+        monkeypatch.setenv("TZ", "Europe/Warsaw")
+        time.tzset()
+        try:
+            # 23:30 local in winter (UTC+1), 00:30 the next day in summer (UTC+2)
+            winter = datetime(2024, 1, 1, 22, 30, tzinfo=timezone.utc).timestamp()
+            summer = datetime(2024, 7, 1, 22, 30, tzinfo=timezone.utc).timestamp()
+
+            days = _local_days(np.array([winter, summer]))
+
+            epoch = date(1970, 1, 1)
+            assert [epoch.toordinal() + int(day) for day in days] == [
+                date(2024, 1, 1).toordinal(), date(2024, 7, 2).toordinal(),
+            ]
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+    def test_requires_admin(self, auth_client: TestClient):
+        """Test that regular users cannot read reports."""
+        response = auth_client.get("/reports/daily-revenue")
+
+        assert response.status_code == 403
+
+    def test_daily_revenue_nets_cancellations(self, admin_client: TestClient):
+        """Test that cancelled orders are subtracted from revenue."""
+        phone = self._create_product(admin_client, "Phone", "Electronics")
+        self._order(admin_client, {phone: 3})
+        cancelled = self._order(admin_client, {phone: 2})
+        admin_client.post(f"/orders/{cancelled}/cancel")
+
+        response = admin_client.get("/reports/daily-revenue")
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"day": date.today().isoformat(), "revenue": 30.0, "units": 3}
+        ]
+
+    def test_product_sales_and_top_sellers(self, admin_client: TestClient):
+        """Test per-product units and top sellers per category."""
+        phone = self._create_product(admin_client, "Phone", "Electronics")
+        laptop = self._create_product(admin_client, "Laptop", "Electronics")
+        book = self._create_product(admin_client, "Book", "Books")
+        self._order(admin_client, {phone: 1, laptop: 4, book: 2})
+        self._order(admin_client, {phone: 2})
+
+        sales = admin_client.get("/reports/product-sales").json()
+        top = admin_client.get("/reports/top-sellers?per_category=1").json()
+
+        assert [row["product_id"] for row in sales] == [laptop, phone, book]
+        assert top["categories"]["Electronics"] == [
+            {"product_id": laptop, "units": 4, "revenue": 40.0}
+        ]
+        assert top["categories"]["Books"][0]["product_id"] == book
+
+    def test_cohorts(self, admin_client: TestClient):
+        """Test revenue by signup week."""
+        phone = self._create_product(admin_client, "Phone", "Electronics")
+        self._order(admin_client, {phone: 5})
+
+        response = admin_client.get("/reports/cohorts")
+
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["weeks_since_signup"] == 0
+        assert data[0]["revenue"] == 50.0
@@ -0,0 +1,69 @@
+"""
+Unit tests for product reviews.
+"""
+
+from fastapi.testclient import TestClient
+
+
+class TestReviews:
+    """Tests for review endpoints."""
+
+    def _create_product(self, client: TestClient) -> int:
+        """Helper to create a product and return its ID."""
+        response = client.post("/products/", json={
+            "name": "Test Product",
+            "description": "A test product",
+            "price": 25.00,
+            "stock": 100,
+            "category": "General",
+        })
+        return response.json()["id"]
+
+    def _review(self, client: TestClient, product_id: int, rating: int = 5):
+        return client.post("/reviews/", json={
+            "product_id": product_id,
+            "rating": rating,
+            "title": "Great",
+            "comment": "Works exactly as described.",
+        })
+
+    def test_create_review(self, auth_client: TestClient):
+        """Test creating a review without a purchase."""
+        product_id = self._create_product(auth_client)
+
+        response = self._review(auth_client, product_id)
+
+        assert response.status_code == 201
+        assert response.json()["is_verified_purchase"] is False
+
+    def test_verified_purchase(self, auth_client: TestClient):
+        """Test that a review after ordering is a verified purchase."""
+        product_id = self._create_product(auth_client)
+        auth_client.post("/cart/items", json={"product_id": product_id, "quantity": 1})
+        auth_client.post("/orders/")
+
+        response = self._review(auth_client, product_id)
+
+        assert response.json()["is_verified_purchase"] is True
+
+    def test_duplicate_review(self, auth_client: TestClient):
+        """Test that a user can review a product only once."""
+        product_id = self._create_product(auth_client)
+        self._review(auth_client, product_id)
+
+        response = self._review(auth_client, product_id)
+
+        assert response.status_code == 400
+
+    def test_product_rating(self, auth_client: TestClient):
+        """Test rating statistics for a product."""
+        product_id = self._create_product(auth_client)
+        self._review(auth_client, product_id, rating=4)
+
+        response = auth_client.get(f"/reviews/product/{product_id}/rating")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["average_rating"] == 4.0
+        assert data["review_count"] == 1
+        assert data["rating_distribution"]["4"] == 1
@@ -0,0 +1,121 @@
+"""
+Unit tests for product search, including a typo recall test set.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.database.search_index import SearchIndex, bounded_edit_distance
+
+CATALOG = [
+    "Apple iPhone 15 Pro",
+    "Samsung Galaxy S24 Ultra",
+    "Sony WH-1000XM5 Wireless Headphones",
+    "Logitech MX Master 3S Mouse",
+    "Dell XPS 13 Laptop",
+    "Kindle Paperwhite E-reader",
+    "Nintendo Switch OLED Console",
+    "Dyson V15 Cordless Vacuum",
+    "Instant Pot Pressure Cooker",
+    "Nespresso Vertuo Coffee Machine",
+    "Bose SoundLink Bluetooth Speaker",
+    "Canon EOS R50 Mirrorless Camera",
+    "Garmin Forerunner Running Watch",
+    "Lego Millennium Falcon Set",
+    "Philips Hue Smart Bulb",
+    "Yeti Rambler Insulated Tumbler",
+    "Patagonia Fleece Jacket",
+    "Nike Pegasus Running Shoes",
+    "KitchenAid Stand Mixer",
+    "Anker Portable Charger",
+]
+
+# (misspelled query, expected catalog entry)
+TYPO_QUERIES = [
+    ("iphnoe", "Apple iPhone 15 Pro"),
+    ("samsnug galaxy", "Samsung Galaxy S24 Ultra"),
+    ("wireles hedphones", "Sony WH-1000XM5 Wireless Headphones"),
+    ("logitec mouse", "Logitech MX Master 3S Mouse"),
+    ("laptpo", "Dell XPS 13 Laptop"),
+    ("kindel paperwite", "Kindle Paperwhite E-reader"),
+    ("nintedno switch", "Nintendo Switch OLED Console"),
+    ("cordles vacum", "Dyson V15 Cordless Vacuum"),
+    ("presure cooker", "Instant Pot Pressure Cooker"),
+    ("nespreso cofee", "Nespresso Vertuo Coffee Machine"),
+    ("bluetoth speakr", "Bose SoundLink Bluetooth Speaker"),
+    ("mirrorles camra", "Canon EOS R50 Mirrorless Camera"),
+    ("garmn forerunner", "Garmin Forerunner Running Watch"),
+    ("millenium falcon", "Lego Millennium Falcon Set"),
+    ("philps hue", "Philips Hue Smart Bulb"),
+    ("insulted tumbler", "Yeti Rambler Insulated Tumbler"),
+    ("patagoina fleece", "Patagonia Fleece Jacket"),
+    ("runing shoes", "Nike Pegasus Running Shoes"),
+    ("kitchenaid stnad mixer", "KitchenAid Stand Mixer"),
+    ("portible charger", "Anker Portable Charger"),
+]
+
+
+class TestSearchIndex:
+    """Tests for the token and deletion-variant (typo) search index."""
+
+    def _index(self) -> SearchIndex:
+        index = SearchIndex()
+        for product_id, name in enumerate(CATALOG, start=1):
+            index.add(product_id, name)
+        return index
+
+    def test_edit_distance_is_bounded(self):
+        """Test the bounded edit distance, including transpositions."""
+        assert bounded_edit_distance("iphnoe", "iphone", 1) == 1
+        assert bounded_edit_distance("kitten", "sitting", 3) == 3
+        assert bounded_edit_distance("kitten", "sitting", 2) is None
+        assert bounded_edit_distance("abc", "abcdef", 2) is None
+
+    def test_exact_search_requires_all_words(self):
+        """Test that exact search matches whole words only."""
+        index = self._index()
+
+        assert index.search("running") == [(13, 0), (18, 0)]
+        assert index.search("running shoes") == [(18, 0)]
+        assert index.search("runing shoes") == []
+
+    def test_typo_recall(self):
+        """Test recall@3 of fuzzy search over the typo query set."""
+        index = self._index()
+        hits = 0
+        for query, expected in TYPO_QUERIES:
+            top = [CATALOG[pid - 1] for pid, _ in index.search(query, fuzzy=True, limit=3)]
+            hits += expected in top
+
+        assert hits / len(TYPO_QUERIES) >= 0.95
+
+    def test_rename_and_remove(self):
+        """Test that the index follows renames and deletions."""
+        index = self._index()
+        index.add(1, "Apple iPad Air")
+        index.remove(2)
+
+        assert index.search("iphone") == []
+        assert index.search("ipda", fuzzy=True) == [(1, 1)]
+        assert index.search("galaxy") == []
+
+
+class TestSearchEndpoint:
+    """Tests for GET /products/search."""
+
+    def test_fuzzy_search(self, client: TestClient):
+        """Test searching products with and without typo tolerance."""
+        for name in ("Wireless Headphones", "Wired Headphones"):
+            client.post("/products/", json={
+                "name": name,
+                "description": name,
+                "price": 50.00,
+                "stock": 10,
+                "category": "Audio",
+            })
+
+        exact = client.get("/products/search?q=hedphones")
+        fuzzy = client.get("/products/search?q=wireles%20hedphones&fuzzy=true")
+
+        assert exact.status_code == 200
+        assert exact.json() == []
+        assert [p["name"] for p in fuzzy.json()] == ["Wireless Headphones"]
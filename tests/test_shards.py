@@ -0,0 +1,87 @@
+"""
+Unit tests for the user-sharded database.
+"""
+
+import threading
+
+from app.database.db import ShardedDatabase
+from app.database.shards import SHARD_ID_BITS
+from app.models.product import Product
+from app.schemas.review import ReviewCreate
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+from app.services.review_service import ReviewService
+
+
+def _sharded_db(shards: int = 4, stock: int = 100) -> ShardedDatabase:
+    database = ShardedDatabase(shards)
+    database.products[1] = Product(1, "Lamp", "", 20.0, stock, "Home")
+    return database
+
+
+class TestShardedDatabase:
+    """Tests for partitioning carts, orders and reviews by user."""
+
+    def test_orders_live_in_the_users_shard(self):
+        """Test shard-prefixed order ids and lookups through the views."""
+        database = _sharded_db()
+        carts, orders = CartService(database), OrderService(database)
+
+        placed = {}
+        for user_id in (1, 2, 5):
+            carts.add_item(user_id, 1, 2)
+            placed[user_id] = orders.create_order_from_cart(user_id)
+
+        assert placed[1].id == (1 << SHARD_ID_BITS) | 1
+        assert placed[5].id == (1 << SHARD_ID_BITS) | 2
+        assert placed[2].id == (2 << SHARD_ID_BITS) | 1
+        assert set(database.shards[1].orders) == {placed[1].id, placed[5].id}
+        assert orders.get_order(placed[2].id) is placed[2]
+        assert orders.get_order(123 << SHARD_ID_BITS) is None
+        assert len(database.orders) == 3
+        assert orders.get_orders_page(5)[0] == [placed[5]]
+        assert orders.cancel_order(placed[5].id).status.value == "cancelled"
+        assert database.stock.available(database.products[1]) == 96
+
+    def test_reviews_are_sharded(self):
+        """Test that reviews across shards are found by product and id."""
+        database = _sharded_db()
+        reviews = ReviewService(database)
+        review_data = ReviewCreate(product_id=1, rating=5, title="Great", comment="Nice and bright.")
+
+        created = [reviews.create_review(user_id, review_data) for user_id in (1, 2, 3)]
+
+        assert reviews.create_review(2, review_data) is None
+        assert [r.id >> SHARD_ID_BITS for r in created] == [1, 2, 3]
+        assert reviews.get_product_rating_stats(1)["review_count"] == 3
+        assert reviews.delete_review(created[1].id, 2) is True
+        assert reviews.get_review(created[1].id) is None
+
+    def test_single_shard_numbers_like_the_plain_database(self):
+        """Test that shard 0 ids start at 1 again after reset."""
+        database = _sharded_db(shards=1)
+        database.get_next_order_id(7)
+        database.reset()
+
+        assert database.get_next_order_id(7) == 1
+
+    def test_concurrent_checkouts(self):
+        """Test that concurrent writers in different shards lose nothing."""
+        database = _sharded_db(stock=10_000)
+        carts, orders = CartService(database), OrderService(database)
+
+        def shopper(user_id: int):
+            for _ in range(50):
+                carts.add_item(user_id, 1, 1)
+                orders.create_order_from_cart(user_id)
+
+        threads = [threading.Thread(target=shopper, args=(user_id,)) for user_id in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(database.orders) == 400
+        assert len(set(database.orders)) == 400
+        assert database.stock.available(database.products[1]) == 10_000 - 400
+        assert sum(len(ids) for ids in database.order_index.by_user.values()) == 400
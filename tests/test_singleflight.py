@@ -0,0 +1,85 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for the SingleFlight utility."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run the function once."""
+        flight = SingleFlight("test.shared")
+        release = threading.Event()
+        executions = []
+
+        def compute(value):
+            executions.append(value)
+            release.wait(5)
+            return value * 2
+
+        async def herd():
+            calls = [asyncio.ensure_future(flight.run("key", compute, 21)) for _ in range(50)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(herd())
+
+        assert results == [42] * 50
+        assert executions == [21]
+        assert flight.stats() == {
+            "calls": 50, "executions": 1, "coalesced": 49, "in_flight": 0,
+        }
+
+    def test_sequential_calls_execute_again(self):
+        """Test that results are not cached once the call has finished."""
+        flight = SingleFlight("test.sequential")
+
+        async def twice():
+            await flight.run("key", lambda: 1)
+            await flight.run("key", lambda: 2)
+
+        asyncio.run(twice())
+
+        assert flight.executions == 2
+
+    def test_errors_propagate_to_all_callers(self):
+        """Test that every coalesced caller sees the exception."""
+        flight = SingleFlight("test.errors")
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError("boom")
+
+        async def herd():
+            calls = [asyncio.ensure_future(flight.run("key", fail)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results = asyncio.run(herd())
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.executions == 1
+
+    def test_stats_registry(self):
+        """Test that named instances show up in the registry."""
+        flight = SingleFlight("test.registry")
+
+        assert SingleFlight.all_stats()["test.registry"] == flight.stats()
+
+
+@pytest.mark.parametrize("path", ["/products/999", "/reviews/product/999/rating"])
+def test_coalesced_endpoints_not_found(client, path):
+    """Test that coalesced endpoints still return 404."""
+    response = client.get(path)
+
+    assert response.status_code == 404
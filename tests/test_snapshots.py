@@ -0,0 +1,148 @@
+"""
+Unit tests for copy-on-write tables and database snapshots.
+"""
+
+import gc
+import threading
+
+import pytest
+
+from app.database.db import Database, ShardedDatabase
+from app.database.versioned import VersionedTable
+from app.models.order import OrderStatus
+from app.models.product import Product
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+
+
+def _place_orders(database: Database, users=(1, 2, 3)):
+    database.products[1] = Product(1, "Lamp", "", 20.0, 100, "Home")
+    carts, orders = CartService(database), OrderService(database)
+    placed = []
+    for user_id in users:
+        carts.add_item(user_id, 1, 1)
+        placed.append(orders.create_order_from_cart(user_id))
+    return orders, placed
+
+
+class TestVersionedTable:
+    """Tests for copy-on-write pages."""
+
+    def test_snapshot_ignores_later_writes(self):
+        """Test that inserts, replacements and deletes don't reach a snapshot."""
+        table = VersionedTable(pages=4)
+        for key in range(10):
+            table[key] = f"v{key}"
+
+        with table.snapshot() as snapshot:
+            table[3] = "changed"
+            table[42] = "new"
+            del table[5]
+
+            assert snapshot[3] == "v3"
+            assert 42 not in snapshot and snapshot.get(5) == "v5"
+            assert len(snapshot) == 10
+            assert sorted(snapshot.values()) == sorted(f"v{key}" for key in range(10))
+
+        assert table[3] == "changed" and 5 not in table and len(table) == 10
+
+    def test_pages_copied_only_while_pinned(self):
+        """Test that writes copy a shared page once, and none without snapshots."""
+        table = VersionedTable(pages=4)
+        for key in range(8):
+            table[key] = key
+        assert table.pages_copied == 0
+
+        snapshot = table.snapshot()
+        table[0] = 100
+        table[4] = 104  # Same page as key 0, already copied
+        assert table.pages_copied == 1
+
+        snapshot.close()
+        table[1] = 101
+        assert table.pages_copied == 1
+        assert table.stats()["live_snapshots"] == 0
+
+    def test_dropped_snapshot_is_released(self):
+        """Test that an unclosed snapshot unpins its pages when collected."""
+        table = VersionedTable(pages=4)
+        table[1] = 1
+        table.snapshot()
+        gc.collect()
+
+        table[1] = 2
+        assert table.pages_copied == 0
+
+    def test_clear_keeps_snapshot(self):
+        """Test that clearing the table leaves a live snapshot intact."""
+        table = VersionedTable(pages=4)
+        table.update({key: key for key in range(5)})
+
+        with table.snapshot() as snapshot:
+            table.clear()
+            table[1] = "after"
+
+            assert dict(snapshot) == {key: key for key in range(5)}
+        assert dict(table) == {1: "after"}
+
+    def test_iterating_while_writing(self):
+        """Test that scanning the live table never sees it change size."""
+        table = VersionedTable(pages=8)
+        table.update({key: key for key in range(1000)})
+        stop = threading.Event()
+
+        def writer():
+            key = 1000
+            while not stop.is_set():
+                table[key] = key
+                del table[key - 1000]
+                key += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(50):
+                assert 1000 <= sum(1 for _ in table.values()) <= 1001
+                with table.snapshot() as snapshot:
+                    assert sum(1 for _ in snapshot.values()) == len(snapshot)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_pages_must_be_power_of_two(self):
+        with pytest.raises(ValueError):
+            VersionedTable(pages=6)
+
+
+class TestDatabaseSnapshot:
+    """Tests for consistent reads across the database."""
+
+    def test_snapshot_sees_status_before_cancel(self):
+        """Test that order records are replaced, not changed in place."""
+        database = Database()
+        orders, placed = _place_orders(database)
+
+        with database.snapshot() as snapshot:
+            orders.cancel_order(placed[0].id)
+
+            assert snapshot.orders[placed[0].id].status == OrderStatus.PENDING
+            assert database.orders[placed[0].id].status == OrderStatus.CANCELLED
+
+    def test_sharded_snapshot(self):
+        """Test one snapshot across every shard."""
+        database = ShardedDatabase(4)
+        orders, placed = _place_orders(database, users=(1, 2, 3, 5))
+
+        with database.snapshot() as snapshot:
+            _place_orders(database, users=(6,))
+            orders.cancel_order(placed[1].id)
+
+            assert len(snapshot.orders) == 4
+            assert {order.id for order in snapshot.orders.values()} == {
+                order.id for order in placed
+            }
+            assert snapshot.orders[placed[1].id].status == OrderStatus.PENDING
+
+        assert all(
+            shard.orders.stats()["live_snapshots"] == 0 for shard in database.shards
+        )
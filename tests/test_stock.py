@@ -0,0 +1,189 @@
+"""
+Unit tests for stock accounting and hot (sharded) products.
+"""
+
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.stock import CounterRetired, ShardedCounter, StockLedger
+from app.models.product import Product
+
+
+class _StaleOnce(dict):
+    """Hot table whose first lookup returns a counter that was made cold."""
+
+    def __init__(self, product_id: int, counter: ShardedCounter):
+        super().__init__()
+        self._stale = {product_id: counter}
+
+    def get(self, key, default=None):
+        return self._stale.pop(key, None) or super().get(key, default)
+
+
+class TestShardedCounter:
+    """Tests for the sharded stock counter."""
+
+    def test_set_and_value(self):
+        """Test that the total is exact after spreading across shards."""
+        counter = ShardedCounter(103, shards=8)
+
+        assert counter.value() == 103
+        assert counter.approximate_value() == 103
+
+    def test_take_borrows_from_other_shards(self):
+        """Test taking more than one shard holds."""
+        counter = ShardedCounter(16, shards=8)
+
+        assert counter.try_take(10) is True
+        assert counter.value() == 6
+        assert counter.try_take(7) is False
+        assert counter.value() == 6
+
+    def test_concurrent_takes_never_oversell(self):
+        """Test that concurrent decrements never go below zero."""
+        counter = ShardedCounter(1000, shards=4)
+        taken = []
+
+        def worker():
+            count = 0
+            while counter.try_take(3):
+                count += 3
+            taken.append(count)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(taken) == 999
+        assert counter.value() == 1
+
+
+class TestStockLedger:
+    """Tests for switching products between hot and cold stock."""
+
+    def test_reserve_on_a_counter_retired_meanwhile(self):
+        """Test that an update racing with make_cold lands in product.stock."""
+        ledger = StockLedger(shards=4)
+        product = Product(1, "Lamp", "", 20.0, 100, "Home")
+        ledger.make_hot(product)
+        stale = ledger._hot[product.id]
+        ledger.make_cold(product)
+
+        with pytest.raises(CounterRetired):
+            stale.try_take(30)
+        # As if reserve() had looked the counter up just before make_cold
+        ledger._hot = _StaleOnce(product.id, stale)
+
+        assert ledger.reserve(product, 30) is True
+        ledger.release(product, 5)
+        assert product.stock == 75
+
+    def test_toggling_hot_never_loses_updates(self):
+        """Test reserves and releases while the product flips hot and cold."""
+        ledger = StockLedger(shards=4)
+        product = Product(1, "Lamp", "", 20.0, 10_000, "Home")
+        stop = threading.Event()
+        taken = []
+
+        def shopper():
+            count = 0
+            for _ in range(2000):
+                if ledger.reserve(product, 2):
+                    count += 2
+                    if count % 10 == 0:
+                        ledger.release(product, 1)
+                        count -= 1
+            taken.append(count)
+
+        def toggler():
+            while not stop.is_set():
+                ledger.make_hot(product)
+                ledger.make_cold(product)
+
+        threads = [threading.Thread(target=shopper) for _ in range(4)]
+        switcher = threading.Thread(target=toggler)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            switcher.start()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            stop.set()
+            switcher.join()
+            sys.setswitchinterval(interval)
+
+        assert ledger.available(product) + sum(taken) == 10_000
+
+
+class TestHotProducts:
+    """Tests for products flagged as hot."""
+
+    def _create_hot_product(self, client: TestClient) -> int:
+        response = client.post("/products/", json={
+            "name": "Viral Product",
+            "description": "Everyone wants one",
+            "price": 10.00,
+            "stock": 50,
+            "category": "General",
+            "is_hot": True,
+        })
+        return response.json()["id"]
+
+    def test_create_hot_product(self, client: TestClient):
+        """Test creating a product with sharded stock."""
+        product_id = self._create_hot_product(client)
+
+        response = client.get(f"/products/{product_id}")
+
+        assert response.status_code == 200
+        assert response.json()["is_hot"] is True
+        assert response.json()["stock"] == 50
+
+    def test_order_and_cancel_hot_product(self, auth_client: TestClient):
+        """Test checkout and cancellation against sharded stock."""
+        product_id = self._create_hot_product(auth_client)
+        auth_client.post("/cart/items", json={"product_id": product_id, "quantity": 7})
+
+        order_id = auth_client.post("/orders/").json()["id"]
+        assert auth_client.get(f"/products/{product_id}").json()["stock"] == 43
+
+        auth_client.post(f"/orders/{order_id}/cancel")
+        assert auth_client.get(f"/products/{product_id}").json()["stock"] == 50
+
+    def test_order_fails_without_partial_reservation(self, auth_client: TestClient):
+        """Test that a failed checkout releases stock it already reserved."""
+        product_id = self._create_hot_product(auth_client)
+        other_response = auth_client.post("/products/", json={
+            "name": "Scarce Product",
+            "description": "Only a few",
+            "price": 5.00,
+            "stock": 5,
+            "category": "General",
+        })
+        other_id = other_response.json()["id"]
+        auth_client.post("/cart/items", json={"product_id": product_id, "quantity": 10})
+        auth_client.post("/cart/items", json={"product_id": other_id, "quantity": 5})
+        auth_client.put(f"/products/{other_id}", json={"stock": 1})
+
+        response = auth_client.post("/orders/")
+
+        assert response.status_code == 400
+        assert auth_client.get(f"/products/{product_id}").json()["stock"] == 50
+
+    def test_toggle_hot_keeps_stock(self, client: TestClient):
+        """Test switching a product between hot and regular stock."""
+        product_id = self._create_hot_product(client)
+
+        response = client.put(f"/products/{product_id}", json={"is_hot": False, "stock": 12})
+
+        assert response.status_code == 200
+        assert response.json()["is_hot"] is False
+        assert response.json()["stock"] == 12
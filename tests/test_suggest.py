@@ -0,0 +1,92 @@
+"""
+Unit tests for name autocomplete.
+"""
+
+from fastapi.testclient import TestClient
+
+from app.database.prefix_index import PrefixIndex, SCAN_LIMIT
+
+
+class TestPrefixIndex:
+    """Tests for the prefix index."""
+
+    def test_prefix_match_by_score(self):
+        """Test that matches are ranked by popularity."""
+        index = PrefixIndex()
+        index.add(1, "iPhone 15", score=5)
+        index.add(2, "iPad Air", score=9)
+        index.add(3, "Kindle", score=100)
+
+        assert index.suggest("ip", 10) == [(2, 9), (1, 5)]
+        assert index.suggest("IPH", 10) == [(1, 5)]
+
+    def test_rename_and_remove(self):
+        """Test that renamed and removed entries stop matching."""
+        index = PrefixIndex()
+        index.add(1, "Old Name")
+        index.add(2, "Other")
+        index.rename(1, "New Name")
+        index.remove(2)
+
+        assert index.suggest("old") == []
+        assert index.suggest("o") == []
+        assert index.suggest("new") == [(1, 0.0)]
+        assert len(index) == 1
+
+    def test_cached_prefix_follows_bumps(self):
+        """Test that cached top lists reflect popularity changes."""
+        index = PrefixIndex()
+        for ref in range(1, SCAN_LIMIT * 2):
+            index.add(ref, f"item {ref}")
+        assert index.suggest("item", 1) == [(1, 0.0)]
+
+        index.bump(300, 10)
+        assert index.suggest("item", 1) == [(300, 10.0)]
+
+        index.bump(300, -10)
+        index.remove(1)
+        assert index.suggest("item", 1) == [(2, 0.0)]
+
+
+class TestSuggestEndpoint:
+    """Tests for GET /products/suggest."""
+
+    def test_suggest_products_and_categories(self, auth_client: TestClient):
+        """Test suggestions weighted by units sold."""
+        auth_client.post("/categories/", json={
+            "name": "Phones", "description": "Mobile phones",
+        })
+        phone_ids = []
+        for name in ("Phone Case", "Phone Charger"):
+            phone_ids.append(auth_client.post("/products/", json={
+                "name": name,
+                "description": name,
+                "price": 5.00,
+                "stock": 100,
+                "category": "Phones",
+            }).json()["id"])
+        auth_client.post("/cart/items", json={"product_id": phone_ids[1], "quantity": 3})
+        auth_client.post("/orders/")
+
+        response = auth_client.get("/products/suggest?prefix=pho&limit=3")
+
+        assert response.status_code == 200
+        assert [(s["kind"], s["name"], s["score"]) for s in response.json()] == [
+            ("category", "Phones", 3.0),
+            ("product", "Phone Charger", 3.0),
+            ("product", "Phone Case", 0.0),
+        ]
+
+    def test_suggest_follows_rename(self, client: TestClient):
+        """Test that renaming a product updates suggestions."""
+        product_id = client.post("/products/", json={
+            "name": "Widget",
+            "description": "A widget",
+            "price": 1.00,
+            "stock": 1,
+            "category": "General",
+        }).json()["id"]
+        client.put(f"/products/{product_id}", json={"name": "Gadget"})
+
+        assert client.get("/products/suggest?prefix=wid").json() == []
+        assert client.get("/products/suggest?prefix=gad").json()[0]["id"] == product_id
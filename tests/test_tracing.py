@@ -0,0 +1,108 @@
+"""
+Unit tests for request stage tracing.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from main import profiler
+
+from app.core.tracing import (
+    StageHistograms,
+    Trace,
+    current_trace,
+    end_trace,
+    span,
+    start_trace,
+    traced,
+)
+
+
+class Greeter:
+    @traced
+    def hello(self):
+        return "hello"
+
+    @traced(name="greeting.async")
+    async def hello_async(self):
+        return "hello"
+
+
+class TestTracing:
+    """Tests for spans, the traced decorator and histograms."""
+
+    def test_spans_only_record_inside_a_trace(self):
+        """Test that stages are summed per trace and ignored without one."""
+        greeter = Greeter()
+        assert greeter.hello() == "hello"
+        with span("ignored"):
+            pass
+        assert current_trace() is None
+
+        trace, token = start_trace()
+        try:
+            greeter.hello()
+            greeter.hello()
+            assert asyncio.run(greeter.hello_async()) == "hello"
+            with span("custom"):
+                pass
+        finally:
+            end_trace(token)
+
+        assert current_trace() is None
+        assert set(trace.stages) == {"Greeter.hello", "greeting.async", "custom"}
+        assert "Greeter.hello;dur=" in trace.server_timing()
+
+    def test_histograms(self):
+        """Test bucketing and percentile estimates."""
+        histograms = StageHistograms(buckets_ms=(1, 10, 100))
+        for seconds in (0.0005, 0.0005, 0.005, 0.05, 1.0):
+            trace = Trace()
+            trace.add("stage", seconds)
+            histograms.record(trace)
+
+        stats = histograms.stats()["stage"]
+        assert stats["count"] == 5
+        assert stats["buckets"] == {"le_1": 2, "le_10": 1, "le_100": 1, "inf": 1}
+        assert stats["p50_ms"] == 10
+        assert stats["p90_ms"] is None
+
+
+class TestServerTiming:
+    """Tests for the Server-Timing header and /metrics stages."""
+
+    def test_order_creation_is_broken_down(self, auth_client: TestClient, monkeypatch):
+        """Test that auth, service and serialization stages are reported."""
+        monkeypatch.setattr(profiler, "header_secret", b"s3cret")
+        auth_client.headers["X-Profile"] = "s3cret"
+        product = auth_client.post("/products/", json={
+            "name": "Lamp", "description": "", "price": 10.0, "stock": 5, "category": "Home",
+        }).json()
+        auth_client.post("/cart/items", json={"product_id": product["id"], "quantity": 1})
+
+        response = auth_client.post("/orders/")
+
+        assert response.status_code == 201
+        stages = {
+            entry.split(";")[0].strip(): float(entry.split("dur=")[1])
+            for entry in response.headers["Server-Timing"].split(",")
+        }
+        assert {"auth", "OrderService.create_order_from_cart", "serialize", "total"} <= set(stages)
+        assert stages["total"] >= stages["OrderService.create_order_from_cart"]
+
+        metrics = auth_client.get("/metrics").json()["stages"]
+        assert metrics["OrderService.create_order_from_cart"]["count"] == 1
+        assert metrics["total"]["count"] >= 4
+
+    def test_header_needs_profile_secret(self, client: TestClient, monkeypatch):
+        """Test that anonymous clients get no timings but are still measured."""
+        monkeypatch.setattr(profiler, "header_secret", b"s3cret")
+
+        assert "Server-Timing" not in client.get("/products/").headers
+        wrong = client.get("/products/", headers={"X-Profile": "guess"})
+        assert "Server-Timing" not in wrong.headers
+        right = client.get("/products/", headers={"X-Profile": "s3cret"})
+        assert "total;dur=" in right.headers["Server-Timing"]
+
+        assert client.get("/metrics").json()["stages"]["total"]["count"] >= 3
@@ -0,0 +1,121 @@
+"""
+Unit tests for the MessagePack wire format.
+"""
+
+import msgpack
+from fastapi.testclient import TestClient
+
+from app.core.wire import accepts_msgpack
+
+MSGPACK_HEADERS = {"Accept": "application/msgpack"}
+
+
+def _product(i: int) -> dict:
+    return {
+        "name": f"Product {i}",
+        "description": "A product",
+        "price": 10.0 + i,
+        "stock": 5,
+        "category": "General",
+    }
+
+
+class TestNegotiation:
+    """Tests for choosing msgpack from the Accept header."""
+
+    def test_accept_header(self):
+        """Test that msgpack is used only when preferred over JSON."""
+        assert accepts_msgpack(b"application/msgpack")
+        assert accepts_msgpack(b"application/x-msgpack, application/json;q=0.5")
+        assert not accepts_msgpack(b"application/json, application/msgpack;q=0.9")
+        assert not accepts_msgpack(b"application/msgpack;q=0")
+        assert not accepts_msgpack(b"*/*")
+        assert not accepts_msgpack(b"")
+
+
+class TestMsgPackResponses:
+    """Tests for msgpack response bodies."""
+
+    def test_product_list_matches_json(self, client: TestClient):
+        """Test that the packed list has the same content as the JSON one."""
+        for i in range(3):
+            client.post("/products/", json=_product(i))
+
+        response = client.get("/products/", headers=MSGPACK_HEADERS)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+        assert "Accept" in response.headers["vary"]
+        json_response = client.get("/products/")
+        assert msgpack.unpackb(response.content) == json_response.json()
+        # Caches must not serve one variant to clients of the other
+        assert "Accept" in json_response.headers["vary"]
+
+    def test_fields_and_single_object(self, client: TestClient):
+        """Test sparse fieldsets and a repacked single-object response."""
+        client.post("/products/", json=_product(0))
+
+        listing = client.get("/products/?fields=id,price", headers=MSGPACK_HEADERS)
+        single = client.get("/products/1", headers=MSGPACK_HEADERS)
+
+        assert msgpack.unpackb(listing.content) == [{"id": 1, "price": 10.0}]
+        assert single.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(single.content) == client.get("/products/1").json()
+
+    def test_orders_keep_paging_header(self, auth_client: TestClient):
+        """Test that the order list keeps X-Next-Cursor in msgpack."""
+        auth_client.post("/products/", json=_product(0))
+        for _ in range(2):
+            auth_client.post("/cart/items", json={"product_id": 1, "quantity": 1})
+            auth_client.post("/orders/")
+
+        response = auth_client.get("/orders/?limit=1", headers=MSGPACK_HEADERS)
+
+        orders = msgpack.unpackb(response.content)
+        assert len(orders) == 1
+        assert orders[0]["items"][0]["product_name"] == "Product 0"
+        assert "X-Next-Cursor" in response.headers
+
+    def test_cart_and_order_from_models(self, auth_client: TestClient):
+        """Test that objects packed from the models match their JSON."""
+        auth_client.post("/products/", json=_product(0))
+        auth_client.post("/cart/items", json={"product_id": 1, "quantity": 2})
+
+        cart = auth_client.get("/cart/", headers=MSGPACK_HEADERS)
+        assert msgpack.unpackb(cart.content) == auth_client.get("/cart/").json()
+
+        order_id = auth_client.post("/orders/").json()["id"]
+        order = auth_client.get(f"/orders/{order_id}", headers=MSGPACK_HEADERS)
+        assert msgpack.unpackb(order.content) == auth_client.get(f"/orders/{order_id}").json()
+
+    def test_errors_stay_json(self, client: TestClient):
+        """Test that error responses are JSON for msgpack clients too."""
+        response = client.get("/products/999", headers=MSGPACK_HEADERS)
+
+        assert response.status_code == 404
+        assert response.json()["detail"]
+
+
+class TestMsgPackRequests:
+    """Tests for msgpack request bodies."""
+
+    def test_create_product(self, client: TestClient):
+        """Test that a packed body is validated like JSON."""
+        response = client.post(
+            "/products/",
+            content=msgpack.packb(_product(0)),
+            headers={"Content-Type": "application/msgpack"},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["name"] == "Product 0"
+
+    def test_invalid_body(self, client: TestClient):
+        """Test 422 for a packed body failing validation."""
+        response = client.post(
+            "/products/",
+            content=msgpack.packb({"name": "No price"}),
+            headers={"Content-Type": "application/msgpack"},
+        )
+
+        assert response.status_code == 422